@@ -10,6 +10,10 @@ import tempfile
 from pathlib import Path
 from typing import List
 
+# Characters encoded and written per write() call; bounds the transient
+# bytes copy for large contents instead of encoding everything at once
+WRITE_CHUNK_CHARS = 64 * 1024
+
 
 class FileManager:
     """
@@ -102,9 +106,10 @@ class FileManager:
         )
 
         try:
-            # Write content to temp file
+            # Write content to temp file in chunks
             with os.fdopen(temp_fd, 'w', encoding=encoding) as temp_file:
-                temp_file.write(content)
+                for start in range(0, len(content), WRITE_CHUNK_CHARS):
+                    temp_file.write(content[start:start + WRITE_CHUNK_CHARS])
                 # Force flush to disk (critical for atomic writes)
                 temp_file.flush()
                 os.fsync(temp_file.fileno())
@@ -11,7 +11,7 @@ All file operations and tool executions must validate through these guardrails.
 
 import re
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, List, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -51,6 +51,9 @@ DENYLIST_PATTERNS = [
     r"\.dylib$",
 ]
 
+# Compiled once; checked for every validated path
+_DENYLIST_RES = [(pattern, re.compile(pattern, re.IGNORECASE)) for pattern in DENYLIST_PATTERNS]
+
 # Tool output size limits (characters)
 TERMINAL_OUTPUT_MAX_CHARS = 10_000
 LOG_OUTPUT_MAX_CHARS = 5_000
@@ -93,12 +96,50 @@ def validate_path(path: Path, project_root: Path, allow_read_only: bool = False)
         >>> validate_path(Path("../etc/passwd"), project_root)
         PathViolationError: Path attempts to escape project root
     """
+    return _validate_against_root(path, project_root, project_root.resolve(), allow_read_only)
+
+
+def validate_paths(
+    paths: Iterable[Union[str, Path]],
+    project_root: Path,
+    allow_read_only: bool = False
+) -> List[Path]:
+    """
+    Validate several paths against one project root.
+
+    Same checks as validate_path, but the project root is resolved once
+    for the whole batch instead of once per path.
+
+    Args:
+        paths: Paths to validate (each relative or absolute).
+        project_root: Absolute project root directory.
+        allow_read_only: If True, allow read access to git internals.
+
+    Returns:
+        Resolved absolute Paths, in input order.
+
+    Raises:
+        PathViolationError: If any path violates boundaries or is denylisted.
+    """
+    resolved_root = project_root.resolve()
+    return [
+        _validate_against_root(Path(path), project_root, resolved_root, allow_read_only)
+        for path in paths
+    ]
+
+
+def _validate_against_root(
+    path: Path,
+    project_root: Path,
+    resolved_root: Path,
+    allow_read_only: bool
+) -> Path:
+    """Shared body of validate_path/validate_paths (root already resolved)."""
     # Resolve to absolute path and canonicalize
     if not path.is_absolute():
         path = project_root / path
 
     resolved_path = path.resolve()
-    resolved_root = project_root.resolve()
 
     # Check 1: Ensure path is within project root
     try:
@@ -128,8 +169,8 @@ def _check_denylist(path: Path, allow_read_only: bool = False) -> None:
     """
     path_str = str(path)
 
-    for pattern in DENYLIST_PATTERNS:
-        if re.search(pattern, path_str, re.IGNORECASE):
+    for pattern, pattern_re in _DENYLIST_RES:
+        if pattern_re.search(path_str):
             # Special case: allow .git/ reads for repository info
             if allow_read_only and ".git" in pattern:
                 logger.debug(f"Allowing read-only access to: {path}")
@@ -278,7 +319,7 @@ def validate_file_operation(
     operation: str,
     file_path: Path,
     project_root: Path
-) -> None:
+) -> Path:
     """
     Validate file operation is allowed.
 
@@ -287,16 +328,22 @@ def validate_file_operation(
         file_path: Target file path.
         project_root: Project root directory.
 
+    Returns:
+        Resolved absolute Path (from validate_path), so callers need not
+        resolve the path again.
+
     Raises:
         PathViolationError: If operation violates guardrails.
     """
     # Read operations can access .git/ (read-only)
     allow_read_only = (operation == "read")
 
-    validate_path(file_path, project_root, allow_read_only=allow_read_only)
+    resolved_path = validate_path(file_path, project_root, allow_read_only=allow_read_only)
 
     logger.debug(f"File operation validated: {operation} {file_path}")
 
+    return resolved_path
+
 
 def is_file_binary(file_path: Path, sample_size: int = 8192) -> bool:
     """
@@ -339,6 +386,7 @@ def is_file_binary(file_path: Path, sample_size: int = 8192) -> bool:
 __all__ = [
     "PathViolationError",
     "validate_path",
+    "validate_paths",
     "is_path_safe",
     "validate_file_operation",
     "truncate_output",
@@ -0,0 +1,395 @@
+"""
+Provider Rate Limiting for Pulse IDE Tier 3 Tools.
+
+Sliding-window limiter that honours both requests-per-minute (RPM) and
+tokens-per-minute (TPM). A single large request can exceed a provider's TPM
+budget while RPM is still fine, so counting requests alone is not enough to
+avoid 429 responses and the retry stalls that follow.
+
+An additive-increase/multiplicative-decrease (AIMD) concurrency controller
+sits alongside the limiter: it caps how many calls to a provider are in
+flight at once, growing the cap after each successful call and halving it
+on 429/502/503 errors or when streamed calls are slow to produce their
+first token. Whole-call duration is not used as a signal, since it mostly
+reflects how long the response is.
+
+One limiter and one controller are shared per provider across the whole process. Tier 3 tools
+run in worker threads and in separate event loops (the tool registry uses
+asyncio.run per call), so state is guarded by a threading.Lock and waiting
+is done with asyncio.sleep rather than loop-bound primitives.
+
+Example:
+    >>> from src.core.rate_limiter import estimate_tokens, get_rate_limiter
+    >>> limiter = get_rate_limiter("openai")
+    >>> await limiter.wait_if_throttled(estimate_tokens(prompt) + 4000)
+    >>> response = await llm.ainvoke(prompt)
+"""
+
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default (RPM, TPM) budgets per provider, at or below the entry-tier (tier 1
+# or free) limits each provider publishes, so a new account does not run
+# into 429s. Accounts on higher tiers can raise them with the "rate_limits"
+# preference, e.g. {"openai": {"rpm": 500, "tpm": 2000000}}.
+PROVIDER_LIMITS: Dict[str, Tuple[int, int]] = {
+    "openai": (60, 200_000),
+    "anthropic": (50, 30_000),
+    "google": (10, 250_000),
+}
+
+# Fallback for unknown providers (matches the old CrewAI max_rpm=10)
+DEFAULT_LIMITS: Tuple[int, int] = (10, 30_000)
+
+# AIMD concurrency bounds and time-to-first-token target
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 8
+INITIAL_CONCURRENCY = 4
+TARGET_LATENCY_SECONDS = 10.0
+
+# HTTP status codes treated as provider overload
+_OVERLOAD_STATUS_CODES = (429, 502, 503)
+
+# Poll interval while waiting for a concurrency slot
+_SLOT_POLL_SECONDS = 0.05
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token).
+
+    Args:
+        text: Prompt text.
+
+    Returns:
+        Estimated token count (at least 1).
+    """
+    return len(text) // 4 + 1
+
+
+class RateLimiter:
+    """
+    Thread-safe RPM + TPM sliding-window rate limiter.
+
+    Each admitted request is recorded as (timestamp, tokens). A request is
+    admitted when, within the trailing window, both the request count is
+    below rpm and the token sum plus the new request's tokens is within tpm.
+    A request larger than tpm is admitted once the window is empty, so it
+    cannot wait forever.
+    """
+
+    def __init__(self, rpm: int, tpm: int, window_seconds: float = 60.0):
+        """
+        Initialize the limiter.
+
+        Args:
+            rpm: Maximum requests per window.
+            tpm: Maximum tokens per window.
+            window_seconds: Window length (60s for per-minute limits).
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._requests: Deque[Tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+
+    def _evict(self, now: float) -> None:
+        """Drop records older than the window (lock must be held)."""
+        cutoff = now - self.window_seconds
+        while self._requests and self._requests[0][0] <= cutoff:
+            _, tokens = self._requests.popleft()
+            self._tokens_in_window -= tokens
+
+    def try_acquire(self, estimated_tokens: int) -> float:
+        """
+        Admit a request if both budgets allow it.
+
+        Args:
+            estimated_tokens: Estimated prompt + completion tokens.
+
+        Returns:
+            0.0 if admitted (and recorded), otherwise seconds to wait
+            before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+
+            within_rpm = len(self._requests) < self.rpm
+            within_tpm = (
+                self._tokens_in_window + estimated_tokens <= self.tpm
+                or not self._requests
+            )
+            if within_rpm and within_tpm:
+                self._requests.append((now, estimated_tokens))
+                self._tokens_in_window += estimated_tokens
+                return 0.0
+
+            # Wait until the oldest record leaves the window
+            return max(self._requests[0][0] + self.window_seconds - now, 0.001)
+
+    async def wait_if_throttled(self, estimated_tokens: int) -> None:
+        """
+        Wait until the request fits in both RPM and TPM budgets.
+
+        Args:
+            estimated_tokens: Estimated prompt + completion tokens.
+        """
+        while True:
+            delay = self.try_acquire(estimated_tokens)
+            if delay == 0.0:
+                return
+            logger.info(f"Rate limit reached, waiting {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self, estimated_tokens: int) -> None:
+        """
+        Blocking variant of wait_if_throttled for synchronous callers.
+
+        Used from CrewAI hooks, which are plain functions. Only sleeps when
+        the budget is exhausted.
+
+        Args:
+            estimated_tokens: Estimated prompt + completion tokens.
+        """
+        while True:
+            delay = self.try_acquire(estimated_tokens)
+            if delay == 0.0:
+                return
+            logger.info(f"Rate limit reached, waiting {delay:.2f}s")
+            time.sleep(delay)
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """
+    Check whether an exception signals provider overload (429/502/503).
+
+    Args:
+        exc: Exception raised by an LLM client.
+
+    Returns:
+        True for rate-limit / overload errors.
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status in _OVERLOAD_STATUS_CODES:
+        return True
+    message = str(exc).lower()
+    return "429" in message or "rate limit" in message
+
+
+class ConcurrencyController:
+    """
+    AIMD admission controller for concurrent LLM calls.
+
+    After each call the limit grows by 0.5, and halves when the call failed
+    with an overload error or the smoothed time to first token is over
+    target. Calls that report no first-token time (non-streaming calls)
+    only adjust the limit on overload. The limit is clamped to
+    [MIN_CONCURRENCY, MAX_CONCURRENCY].
+
+    Slots are tracked under a threading.Lock and waited for by polling,
+    so one controller can be shared across event loops.
+    """
+
+    def __init__(
+        self,
+        initial: float = INITIAL_CONCURRENCY,
+        target_latency: float = TARGET_LATENCY_SECONDS,
+        name: str = "default",
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            initial: Starting concurrency limit.
+            target_latency: Time to first token (seconds) above which the
+                limit is cut.
+            name: Label used in log messages.
+        """
+        self.limit = float(initial)
+        self.target_latency = target_latency
+        self.name = name
+        self.in_flight = 0
+        self.avg_latency: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def try_enter(self) -> bool:
+        """
+        Take a slot if one is free.
+
+        Returns:
+            True if a slot was taken.
+        """
+        with self._lock:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def exit(self, latency: Optional[float], overloaded: bool = False) -> None:
+        """
+        Release a slot and adjust the limit.
+
+        Args:
+            latency: Time to first token of the finished call in seconds,
+                or None if the call did not report one.
+            overloaded: True if the call failed with an overload error.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if latency is not None:
+                if self.avg_latency is None:
+                    self.avg_latency = latency
+                else:
+                    self.avg_latency = 0.7 * self.avg_latency + 0.3 * latency
+
+            slow = latency is not None and self.avg_latency > self.target_latency
+            previous = self.limit
+            if overloaded or slow:
+                self.limit = max(MIN_CONCURRENCY, self.limit * 0.5)
+            else:
+                self.limit = min(MAX_CONCURRENCY, self.limit + 0.5)
+
+            if int(self.limit) != int(previous):
+                logger.info(
+                    f"Concurrency for {self.name}: {int(previous)} -> {int(self.limit)} "
+                    f"(avg time to first token {self.avg_latency or 0.0:.1f}s, overloaded={overloaded})"
+                )
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[Callable[[float], None]]:
+        """
+        Hold a concurrency slot for the duration of one LLM call.
+
+        Yields a callable that streaming callers use to report the time to
+        first token (seconds from sending the request to the first chunk);
+        only that measurement feeds the latency target. Overload errors
+        raised inside the block shrink the limit before being re-raised.
+        """
+        while not self.try_enter():
+            await asyncio.sleep(_SLOT_POLL_SECONDS)
+
+        first_token: List[float] = []
+
+        def record_first_token(latency: float) -> None:
+            if not first_token:
+                first_token.append(latency)
+
+        overloaded = False
+        try:
+            yield record_first_token
+        except Exception as e:
+            overloaded = is_overload_error(e)
+            raise
+        finally:
+            self.exit(first_token[0] if first_token else None, overloaded)
+
+
+# ============================================================================
+# PER-PROVIDER REGISTRY
+# ============================================================================
+
+_limiters: Dict[str, RateLimiter] = {}
+_controllers: Dict[str, ConcurrencyController] = {}
+_limit_overrides: Dict[str, Tuple[int, int]] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limits_for(provider: str) -> Tuple[int, int]:
+    """Configured (RPM, TPM) for a provider (_limiters_lock must be held)."""
+    return _limit_overrides.get(provider) or PROVIDER_LIMITS.get(provider, DEFAULT_LIMITS)
+
+
+def configure_rate_limits(overrides: Optional[Dict[str, Any]]) -> None:
+    """
+    Apply per-provider RPM/TPM overrides from settings.
+
+    Providers missing from overrides fall back to PROVIDER_LIMITS, and
+    either value may be omitted to keep its default. Limiters that already
+    exist pick up the new budgets immediately. Invalid entries are ignored.
+
+    Args:
+        overrides: The "rate_limits" preference, mapping provider name to
+            {"rpm": int, "tpm": int}, or None.
+    """
+    parsed: Dict[str, Tuple[int, int]] = {}
+    for provider, limits in (overrides or {}).items():
+        if not isinstance(limits, dict):
+            logger.warning(f"Ignoring rate limit override for {provider}: expected a dict")
+            continue
+        default_rpm, default_tpm = PROVIDER_LIMITS.get(provider, DEFAULT_LIMITS)
+        try:
+            rpm = int(limits.get("rpm", default_rpm))
+            tpm = int(limits.get("tpm", default_tpm))
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring rate limit override for {provider}: {limits!r}")
+            continue
+        if rpm > 0 and tpm > 0:
+            parsed[provider] = (rpm, tpm)
+
+    with _limiters_lock:
+        _limit_overrides.clear()
+        _limit_overrides.update(parsed)
+        for provider, limiter in _limiters.items():
+            rpm, tpm = _limits_for(provider)
+            with limiter._lock:
+                limiter.rpm, limiter.tpm = rpm, tpm
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """
+    Get the process-wide limiter for a provider.
+
+    Args:
+        provider: Provider name ("openai", "anthropic", "google").
+
+    Returns:
+        Shared RateLimiter instance.
+    """
+    with _limiters_lock:
+        limiter: Optional[RateLimiter] = _limiters.get(provider)
+        if limiter is None:
+            rpm, tpm = _limits_for(provider)
+            limiter = RateLimiter(rpm=rpm, tpm=tpm)
+            _limiters[provider] = limiter
+        return limiter
+
+
+def get_concurrency_controller(provider: str) -> ConcurrencyController:
+    """
+    Get the process-wide AIMD concurrency controller for a provider.
+
+    Args:
+        provider: Provider name ("openai", "anthropic", "google").
+
+    Returns:
+        Shared ConcurrencyController instance.
+    """
+    with _limiters_lock:
+        controller = _controllers.get(provider)
+        if controller is None:
+            controller = ConcurrencyController(name=provider)
+            _controllers[provider] = controller
+        return controller
+
+
+__all__ = [
+    "RateLimiter",
+    "ConcurrencyController",
+    "get_rate_limiter",
+    "get_concurrency_controller",
+    "configure_rate_limits",
+    "is_overload_error",
+    "estimate_tokens",
+    "PROVIDER_LIMITS",
+]
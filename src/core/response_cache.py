@@ -0,0 +1,333 @@
+"""
+Response Cache for Pulse IDE Tier 3 Tools.
+
+Caches results of expensive multi-LLM tool runs (e.g. implement_feature)
+so that repeated or trivially reworded requests against the same workspace
+context are answered without re-running the agents.
+
+Keys are BLAKE2b digests of a normalized prompt (whitespace folded; case
+is kept, since identifiers and file names are case-sensitive) plus any
+other inputs that affect the result (workspace context, model names,
+pipeline toggles, file modification times). Values are stored as
+serialized JSON, so every hit returns an independent copy. orjson is used
+for serialization when installed (results carry whole generated files),
+with the stdlib json module as fallback.
+
+Two tiers are provided: ResponseCache (process-wide, in memory) and
+DiskResponseCache (one JSON file per key, survives restarts; used under
+.pulse/crew_cache/ in the workspace).
+
+Example:
+    >>> from src.core.response_cache import get_response_cache, make_cache_key
+    >>> cache = get_response_cache()
+    >>> key = make_cache_key("Add a timer", "Project Root: /ws", "gpt-4o")
+    >>> cache.set(key, {"summary": "done"})
+    >>> cache.get(key, ttl=3600)
+    {'summary': 'done'}
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Default time-to-live for cached entries (seconds)
+DEFAULT_TTL_SECONDS = 3600
+
+# Maximum number of entries kept in memory (least recently used are evicted)
+DEFAULT_MAX_ENTRIES = 64
+
+# Maximum number of entry files kept on disk (oldest are deleted on write)
+DEFAULT_DISK_MAX_ENTRIES = 256
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+# ============================================================================
+# KEY HELPERS
+# ============================================================================
+
+def _dumps(value: Any) -> Union[bytes, str]:
+    """Serialize a value to JSON (bytes with orjson, str without)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value)
+    return json.dumps(value)
+
+
+def _loads(payload: Union[bytes, str]) -> Any:
+    """Deserialize a payload produced by _dumps()."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    Normalize a user prompt so trivially different spacing shares a key.
+
+    Collapses runs of whitespace and strips surrounding whitespace. Case
+    and punctuation are kept: "Rename Count to count" and "rename count
+    to Count" ask for different patches.
+
+    Args:
+        text: Raw prompt text.
+
+    Returns:
+        Normalized prompt string.
+    """
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def make_cache_key(prompt: str, *parts: str) -> str:
+    """
+    Build a cache key from a prompt and any additional result-affecting inputs.
+
+    Args:
+        prompt: User prompt (normalized before hashing).
+        *parts: Additional strings (context, model names, ...).
+
+    Returns:
+        Hex BLAKE2b (256-bit) digest.
+    """
+    digest = hashlib.blake2b(normalize_prompt(prompt).encode("utf-8"), digest_size=32)
+    for part in parts:
+        digest.update(b"\x00")
+        digest.update(part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ============================================================================
+# THREAD-SAFE CACHE CLASS
+# ============================================================================
+
+class ResponseCache:
+    """
+    Thread-safe, bounded, in-memory LRU cache with per-lookup TTL.
+
+    Tier 3 tools run in worker threads and in separate event loops, so all
+    access is guarded by a threading.Lock.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction.
+        """
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Union[bytes, str]]]" = OrderedDict()
+
+    def get(self, key: str, ttl: float = DEFAULT_TTL_SECONDS) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key from make_cache_key().
+            ttl: Maximum entry age in seconds; older entries are dropped.
+
+        Returns:
+            A fresh copy of the cached value, or None on miss/expiry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, payload = entry
+            if time.monotonic() - stored_at > ttl:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+        return _loads(payload)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable value.
+
+        Args:
+            key: Cache key from make_cache_key().
+            value: Value to cache (must be JSON-serializable).
+        """
+        try:
+            payload = _dumps(value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Skipping cache store, value not serializable: {e}")
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# ============================================================================
+# PERSISTENT (ON-DISK) CACHE
+# ============================================================================
+
+class DiskResponseCache:
+    """
+    Persistent cache storing one JSON file per key.
+
+    Entry age is the file's mtime, so no index is needed. Writes go to a
+    temporary file in the same directory and are moved into place with
+    os.replace, so readers never see a partially written entry. Read and
+    write errors are logged and treated as misses. Each write prunes the
+    directory to max_entries files, oldest first, so entries that are
+    never looked up again do not accumulate.
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = DEFAULT_DISK_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the entries (created on first write).
+            max_entries: Maximum number of entry files kept on disk.
+        """
+        self.cache_dir = Path(cache_dir)
+        self._max_entries = max_entries
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str, ttl: float = DEFAULT_TTL_SECONDS) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key from make_cache_key().
+            ttl: Maximum entry age in seconds; older entries are deleted.
+
+        Returns:
+            The cached value, or None on miss/expiry/read error.
+        """
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > ttl:
+                path.unlink(missing_ok=True)
+                return None
+            return _loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path.name}: {e}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable value atomically.
+
+        Args:
+            key: Cache key from make_cache_key().
+            value: Value to cache (must be JSON-serializable).
+        """
+        try:
+            payload = _dumps(value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Skipping cache store, value not serializable: {e}")
+            return
+
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+
+        tmp_path = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=self.cache_dir, suffix=".tmp", delete=False
+            ) as tmp:
+                # Assigned before writing so a failed write is cleaned up
+                tmp_path = tmp.name
+                tmp.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry: {e}")
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+            return
+
+        self._prune()
+
+    def _prune(self) -> None:
+        """Delete the oldest entry files beyond max_entries."""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except OSError:
+                            pass
+        except OSError as e:
+            logger.warning(f"Could not prune cache directory {self.cache_dir}: {e}")
+            return
+
+        if len(entries) <= self._max_entries:
+            return
+
+        entries.sort()
+        for _, path in entries[:len(entries) - self._max_entries]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+_global_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the global ResponseCache instance.
+
+    Returns:
+        ResponseCache instance.
+    """
+    global _global_cache
+    if _global_cache is None:
+        _global_cache = ResponseCache()
+    return _global_cache
+
+
+__all__ = [
+    "ResponseCache",
+    "DiskResponseCache",
+    "get_response_cache",
+    "make_cache_key",
+    "normalize_prompt",
+    "DEFAULT_TTL_SECONDS",
+]
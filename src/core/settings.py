@@ -13,7 +13,7 @@ Storage Locations (via platformdirs):
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from platformdirs import user_config_dir
 
 logger = logging.getLogger(__name__)
@@ -48,7 +48,14 @@ class SettingsManager:
         "preferences": {
             "theme": "dark",
             "enable_autogen": True,
-            "enable_crew": True
+            "enable_crew": True,
+            "crew_runtime": "direct",
+            "disable_crew_cache": False,
+            "crew_cache_ttl": 3600,
+            "context_budget_tokens": 1500,
+            "skip_reviewer_on_clean_syntax": True,
+            "fuse_simple_requests": True,
+            "rate_limits": {}
         }
     }
 
@@ -65,23 +72,42 @@ class SettingsManager:
         # Ensure config directory exists
         self.config_dir.mkdir(parents=True, exist_ok=True)
 
+        # Last parsed config file, keyed by its (mtime_ns, size) stat signature
+        self._cache: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None
+
         logger.info(f"Settings config directory: {self.config_dir}")
 
     def load_settings(self) -> Dict[str, Any]:
         """
         Load settings from config file.
 
+        The file is only re-read and re-parsed when its mtime or size
+        changes; otherwise the last parsed contents are reused. Every call
+        returns a fresh dict, so callers may mutate it.
+
         Returns:
             Dict with settings (uses defaults if file doesn't exist).
         """
-        if not self.config_file.exists():
+        try:
+            stat = self.config_file.stat()
+        except FileNotFoundError:
             logger.info("Config file not found, using defaults")
             return self.DEFAULT_SETTINGS.copy()
+        except OSError as e:
+            logger.error(f"Failed to load settings: {e}")
+            return self.DEFAULT_SETTINGS.copy()
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cache = self._cache
+        if cache is not None and cache[0] == signature:
+            return self._merge_with_defaults(cache[1])
 
         try:
             with self.config_file.open("r", encoding="utf-8") as f:
                 settings = json.load(f)
 
+            self._cache = (signature, settings)
+
             # Merge with defaults to handle missing keys
             merged_settings = self._merge_with_defaults(settings)
 
@@ -118,6 +144,7 @@ class SettingsManager:
 
             # Atomic rename
             temp_file.replace(self.config_file)
+            self._cache = None
 
             logger.info("Settings saved successfully")
             return True
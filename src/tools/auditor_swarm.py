@@ -20,11 +20,16 @@ Multi-Provider Support:
 """
 
 import asyncio
+import concurrent.futures
+import copy
+import functools
 import json
 import logging
 import os
+import re
+import threading
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 
 # AutoGen imports - PERMANENT FIX: Prioritize pyautogen 0.2.x (pinned version)
 # We pin to pyautogen==0.2.35 in requirements.txt for stable GroupChat API
@@ -73,9 +78,13 @@ logger = logging.getLogger(__name__)
 # MULTI-PROVIDER LLM CONFIG FACTORY
 # ============================================================================
 
+@functools.lru_cache(maxsize=32)
 def _get_provider(model: str) -> str:
     """
     Determine LLM provider from model name.
+
+    Memoized on the raw model string, so repeated runs with the same model
+    skip the lowercase/prefix checks (and warn about unknown models once).
     
     Args:
         model: Model identifier (e.g., "gpt-4o", "claude-sonnet-4.5", "gemini-3-pro")
@@ -85,7 +94,7 @@ def _get_provider(model: str) -> str:
     """
     model_lower = model.lower()
     
-    if model_lower.startswith("gpt") or model_lower.startswith("o1") or model_lower.startswith("o3"):
+    if model_lower.startswith(("gpt", "o1", "o3")):
         return "openai"
     elif model_lower.startswith("claude"):
         return "anthropic"
@@ -176,7 +185,35 @@ def _create_llm_config(model: str, settings: Dict[str, Any]) -> Optional[Dict[st
 
 # Safe defaults for bounded execution
 MAX_AUTOGEN_ROUNDS = 5  # Maximum rounds for AutoGen debate
-MAX_TOKENS_PER_MESSAGE = 2000  # Token limit per agent message
+
+# Token limit per debate agent message. The Moderator never calls the LLM,
+# so whichever of Auditor/Hacker/Defender speaks last produces the findings
+# JSON parsed by _extract_json_from_chat; each needs room for the whole object.
+MAX_TOKENS_PER_MESSAGE = 2000
+
+
+def _bounded_llm_config(llm_config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy the base AutoGen LLM config with MAX_TOKENS_PER_MESSAGE applied.
+
+    Args:
+        llm_config: Base config from _create_llm_config.
+
+    Returns:
+        New config dict (the base config is not modified).
+    """
+    return {**llm_config, "max_tokens": MAX_TOKENS_PER_MESSAGE}
+
+
+# ============================================================================
+# IN-FLIGHT COALESCING
+# ============================================================================
+
+# Stage B debates currently running, keyed by (focus_area, project_root).
+# A concurrent.futures.Future is used (not asyncio.Future) because the tool
+# registry drives each diagnosis through its own asyncio.run() event loop.
+_INFLIGHT: Dict[Tuple[Optional[str], str], concurrent.futures.Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
 
 
 # ============================================================================
@@ -194,6 +231,9 @@ async def diagnose_project(
     This is the main entry point called by the Master Agent.
     Offloads blocking AutoGen work to a background thread.
 
+    Waits for the final result of diagnose_project_streamed(); callers that
+    want to render Stage A before Stage B finishes should use that instead.
+
     Args:
         focus_area: Optional focus area (e.g., "safety logic", "file structure").
         project_root: Project root directory (for file scanning).
@@ -217,7 +257,37 @@ async def diagnose_project(
         >>> len(result["findings"])
         3
     """
-    logger.info(f"diagnose_project called: focus_area={focus_area}")
+    result = None
+    async for result in diagnose_project_streamed(focus_area, project_root, context):
+        pass
+    return result
+
+
+async def diagnose_project_streamed(
+    focus_area: Optional[str] = None,
+    project_root: Optional[Path] = None,
+    context: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Diagnose project health, yielding Stage A before the Stage B debate.
+
+    When AutoGen is enabled this yields twice: first the deterministic
+    Stage A result (metadata.stage_b_pending = True), then the final result
+    once the debate completes. When AutoGen is disabled it yields once.
+
+    Args:
+        focus_area: Optional focus area (e.g., "safety logic", "file structure").
+        project_root: Project root directory (for file scanning).
+        context: Optional context dict (workspace_summary, active_files, etc.).
+
+    Yields:
+        Dicts in the same format as diagnose_project() returns.
+
+    Example:
+        >>> async for result in diagnose_project_streamed(project_root=Path("/workspace")):
+        ...     render(result)
+    """
+    logger.info("diagnose_project called: focus_area=%s", focus_area)
 
     # Load settings
     settings_manager = get_settings_manager()
@@ -233,27 +303,67 @@ async def diagnose_project(
         logger.info("AutoGen disabled by toggle, returning Stage A results only")
         stage_a_result["metadata"]["autogen_enabled"] = False
         stage_a_result["metadata"]["budget_mode"] = "disabled"
-        return stage_a_result
+        yield stage_a_result
+        return
+
+    # Hand Stage A to the caller right away. A copy is yielded because the
+    # Stage B fallback paths annotate stage_a_result in place.
+    preview = copy.deepcopy(stage_a_result)
+    preview["metadata"]["stage_b_pending"] = True
+    yield preview
+
+    # Coalesce concurrent identical requests: only one Stage B debate runs,
+    # later callers await its result instead of starting their own.
+    key = (focus_area, str(project_root))
+    with _INFLIGHT_LOCK:
+        inflight = _INFLIGHT.get(key)
+        is_owner = inflight is None
+        if is_owner:
+            inflight = concurrent.futures.Future()
+            _INFLIGHT[key] = inflight
+
+    if not is_owner:
+        logger.info("Stage B already in flight for this request, awaiting shared result")
+        shared = await asyncio.wrap_future(inflight)
+        yield copy.deepcopy(shared)
+        return
 
     # Offload Stage B (AutoGen debate) to background thread
     logger.info("Offloading AutoGen debate (Stage B) to background thread")
-    result = await asyncio.to_thread(
-        _run_autogen_sync,
-        stage_a_result=stage_a_result,
-        project_root=project_root,
-        context=context or {},
-        settings=settings,
-        focus_area=focus_area
+    try:
+        result = await asyncio.to_thread(
+            _run_autogen_sync,
+            stage_a_result=stage_a_result,
+            project_root=project_root,
+            context=context or {},
+            settings=settings,
+            focus_area=focus_area
+        )
+        inflight.set_result(copy.deepcopy(result))
+    except BaseException as e:
+        inflight.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+
+    logger.info(
+        "Diagnosis complete: risk_level=%s, findings=%d",
+        result["risk_level"], len(result["findings"])
     )
-
-    logger.info(f"Diagnosis complete: risk_level={result['risk_level']}, findings={len(result['findings'])}")
-    return result
+    yield result
 
 
 # ============================================================================
 # STAGE A: DETERMINISTIC CHECKS (always runs)
 # ============================================================================
 
+# Opening (VAR, VAR_INPUT, VAR_IN_OUT, ...) and closing (END_VAR) variable
+# block keywords, matched in a single pass. The word boundaries keep the VAR
+# inside END_VAR (and identifiers like MY_VAR) from counting as an opener.
+_VAR_BLOCK_RE = re.compile(r"\b(END_)?VAR(?:_[A-Z_]+)?\b")
+
+
 def _run_deterministic_checks(
     project_root: Optional[Path],
     context: Dict[str, Any],
@@ -337,7 +447,7 @@ def _run_deterministic_checks(
             "message": "No source files found in workspace"
         })
 
-    logger.info(f"Found {len(source_files)} source files for analysis")
+    logger.info("Found %d source files for analysis", len(source_files))
 
     # Check 3: Basic syntax validation (look for common patterns)
     for source_file in source_files[:20]:  # Limit to first 20 files for performance
@@ -347,8 +457,13 @@ def _run_deterministic_checks(
 
             # PLC-specific checks (.st, .scl)
             if file_ext in ['.st', '.scl']:
-                var_count = content.count("VAR")
-                end_var_count = content.count("END_VAR")
+                var_count = 0
+                end_var_count = 0
+                for end_prefix in _VAR_BLOCK_RE.findall(content):
+                    if end_prefix:
+                        end_var_count += 1
+                    else:
+                        var_count += 1
                 if var_count != end_var_count:
                     findings.append({
                         "severity": "ERROR",
@@ -398,7 +513,7 @@ def _run_deterministic_checks(
                     })
 
         except Exception as e:
-            logger.warning(f"Failed to read {source_file}: {e}")
+            logger.warning("Failed to read %s: %s", source_file, e)
             findings.append({
                 "severity": "WARNING",
                 "file": str(source_file.relative_to(project_root)),
@@ -477,15 +592,15 @@ def _run_autogen_sync(
         # Check if AutoGen is available
         if not AUTOGEN_AVAILABLE:
             logger.error(
-                f"AutoGen not available (package_info={AUTOGEN_PACKAGE_INFO}). "
-                f"Install with: pip install pyautogen"
+                "AutoGen not available (package_info=%s). Install with: pip install pyautogen",
+                AUTOGEN_PACKAGE_INFO
             )
             stage_a_result["metadata"]["autogen_enabled"] = False
             stage_a_result["metadata"]["error"] = "autogen_not_installed"
             stage_a_result["metadata"]["autogen_package_info"] = AUTOGEN_PACKAGE_INFO
             return stage_a_result
 
-        logger.info(f"AutoGen available via '{AUTOGEN_PACKAGE_INFO}' package")
+        logger.info("AutoGen available via '%s' package", AUTOGEN_PACKAGE_INFO)
         
         # Extract model settings
         model_name = settings.get("models", {}).get("autogen_auditor", "gpt-4o-mini")
@@ -503,19 +618,19 @@ def _run_autogen_sync(
         auditor = AssistantAgent(
             name="Auditor",
             system_message=AUTOGEN_AUDITOR_PROMPT + "\n\nYou are the Auditor. Review the deterministic findings and propose additional checks.",
-            llm_config=llm_config
+            llm_config=_bounded_llm_config(llm_config)
         )
 
         hacker = AssistantAgent(
             name="Hacker",
             system_message="You are the Hacker. Find security vulnerabilities, edge cases, and subtle bugs that deterministic checks might miss.",
-            llm_config=llm_config
+            llm_config=_bounded_llm_config(llm_config)
         )
 
         defender = AssistantAgent(
             name="Defender",
             system_message="You are the Defender. Propose fixes and mitigation strategies for identified issues. Prioritize by severity and impact.",
-            llm_config=llm_config
+            llm_config=_bounded_llm_config(llm_config)
         )
 
         moderator = UserProxyAgent(
@@ -550,6 +665,10 @@ Do NOT include any text outside the JSON block. Output ONLY valid JSON.""",
         manager = GroupChatManager(groupchat=groupchat, llm_config=llm_config)
 
         # Build initial message with Stage A results
+        stage_a_json = json.dumps(stage_a_result, separators=(",", ":"))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Stage A payload for debate: %s", stage_a_json)
+
         initial_message = f"""Project Diagnosis Debate:
 
 FOCUS AREA: {focus_area or "General project health"}
@@ -559,7 +678,7 @@ Risk Level: {stage_a_result['risk_level']}
 Findings: {len(stage_a_result['findings'])} issues found
 
 DETAILS:
-{json.dumps(stage_a_result, indent=2)}
+{stage_a_json}
 
 INSTRUCTIONS:
 1. Auditor: Review these findings and propose additional checks
@@ -571,7 +690,7 @@ Begin the debate. Moderator will produce final JSON after {MAX_AUTOGEN_ROUNDS} r
 """
 
         # Execute group chat (blocking)
-        logger.info(f"Executing AutoGen group chat (max {MAX_AUTOGEN_ROUNDS} rounds)")
+        logger.info("Executing AutoGen group chat (max %d rounds)", MAX_AUTOGEN_ROUNDS)
         moderator.initiate_chat(
             manager,
             message=initial_message
@@ -590,7 +709,7 @@ Begin the debate. Moderator will produce final JSON after {MAX_AUTOGEN_ROUNDS} r
                 "rounds_used": len(groupchat.messages),
                 "deterministic_checks": True
             }
-            logger.info(f"AutoGen debate complete: {final_json['risk_level']}")
+            logger.info("AutoGen debate complete: %s", final_json["risk_level"])
             return final_json
         else:
             logger.warning("Failed to extract JSON from AutoGen debate, falling back to Stage A")
@@ -599,7 +718,7 @@ Begin the debate. Moderator will produce final JSON after {MAX_AUTOGEN_ROUNDS} r
             return stage_a_result
 
     except Exception as e:
-        logger.error(f"AutoGen debate failed: {e}", exc_info=True)
+        logger.error("AutoGen debate failed: %s", e, exc_info=True)
         stage_a_result["metadata"]["autogen_enabled"] = True
         stage_a_result["metadata"]["error"] = str(e)
         return stage_a_result
@@ -628,7 +747,6 @@ def _extract_json_from_chat(messages: List[Dict[str, Any]]) -> Optional[Dict[str
         content = message.get("content", "")
 
         # Try to extract JSON block
-        import re
         json_match = re.search(r"\{[\s\S]*\}", content)
         if json_match:
             try:
@@ -646,4 +764,4 @@ def _extract_json_from_chat(messages: List[Dict[str, Any]]) -> Optional[Dict[str
     return None
 
 
-__all__ = ["diagnose_project"]
+__all__ = ["diagnose_project", "diagnose_project_streamed"]
@@ -11,41 +11,52 @@ Context Containment:
 - Only structured outputs (PatchPlan, summary, verification) are returned
 
 UI Responsiveness:
-- Blocking CrewAI execution is offloaded via asyncio.to_thread
+- Default runtime makes non-blocking async LLM calls (no worker thread)
+- Opt-in CrewAI runtime (preferences.crew_runtime = "crewai") uses the
+  crew's native async kickoff
+- implement_feature_sync() bridges synchronous callers (tool registry)
+- Blocking work uses a dedicated crew executor, and concurrent runs are
+  capped at MAX_CONCURRENT_CREW_RUNS process-wide
 
 Multi-Provider Support:
 - Supports OpenAI, Anthropic Claude, and Google Gemini models
 - Provider is auto-detected from model name
 """
 
+import ast
 import asyncio
+import atexit
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
+import importlib
 import logging
 import os
+import re
+import threading
+import time
+import weakref
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 
-from crewai import Agent, Task, Crew, Process
-
-# LangChain LLM imports - lazy loaded to avoid import errors if not installed
-try:
-    from langchain_openai import ChatOpenAI
-    LANGCHAIN_OPENAI_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_OPENAI_AVAILABLE = False
-
-try:
-    from langchain_anthropic import ChatAnthropic
-    LANGCHAIN_ANTHROPIC_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_ANTHROPIC_AVAILABLE = False
-
-try:
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    LANGCHAIN_GOOGLE_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_GOOGLE_AVAILABLE = False
+from langchain_core.messages import SystemMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
 
 from src.core.settings import get_settings_manager
+from src.core.response_cache import (
+    DEFAULT_TTL_SECONDS,
+    DiskResponseCache,
+    get_response_cache,
+    make_cache_key,
+)
+from src.core.rate_limiter import (
+    configure_rate_limits,
+    estimate_tokens,
+    get_concurrency_controller,
+    get_rate_limiter,
+)
 from src.core.prompts import CREW_PLANNER_PROMPT, CREW_CODER_PROMPT, CREW_REVIEWER_PROMPT
 
 logger = logging.getLogger(__name__)
@@ -55,9 +66,13 @@ logger = logging.getLogger(__name__)
 # MULTI-PROVIDER LLM FACTORY
 # ============================================================================
 
+@functools.lru_cache(maxsize=32)
 def _get_provider(model: str) -> str:
     """
     Determine LLM provider from model name.
+
+    Memoized on the raw model string, so repeated runs with the same model
+    skip the lowercase/prefix checks (and warn about unknown models once).
     
     Args:
         model: Model identifier (e.g., "gpt-4o", "claude-sonnet-4.5", "gemini-3-pro")
@@ -67,7 +82,7 @@ def _get_provider(model: str) -> str:
     """
     model_lower = model.lower()
     
-    if model_lower.startswith("gpt") or model_lower.startswith("o1") or model_lower.startswith("o3"):
+    if model_lower.startswith(("gpt", "o1", "o3")):
         return "openai"
     elif model_lower.startswith("claude"):
         return "anthropic"
@@ -75,16 +90,94 @@ def _get_provider(model: str) -> str:
         return "google"
     else:
         # Default to OpenAI for unknown models
-        logger.warning(f"Unknown model '{model}', defaulting to OpenAI provider")
+        logger.warning("Unknown model '%s', defaulting to OpenAI provider", model)
         return "openai"
 
 
+# Constructed chat models per event loop, each keyed by (provider, model,
+# api key digest) in least- to most-recently used order. The async HTTP
+# clients inside a chat model pool connections bound to the loop that
+# opened them, and every builder run gets a fresh loop from asyncio.run, so
+# instances are only reused within the loop that created them. Entries go
+# away with their loop.
+_LLM_CACHE: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str, str], Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+_LLM_CACHE_LOCK = threading.Lock()
+_LLM_CACHE_MAX_ENTRIES = 16
+
+# Provider → (module, chat model class, pip package). Modules are imported
+# on first use only, so a session that only talks to one provider never
+# pays the import cost of the others.
+_PROVIDER_PACKAGES = {
+    "openai": ("langchain_openai", "ChatOpenAI", "langchain-openai"),
+    "anthropic": ("langchain_anthropic", "ChatAnthropic", "langchain-anthropic"),
+    "google": ("langchain_google_genai", "ChatGoogleGenerativeAI", "langchain-google-genai"),
+}
+
+_PROVIDER_LABELS = {
+    "openai": "OpenAI",
+    "anthropic": "Anthropic",
+    "google": "Google",
+}
+
+# Resolved chat model classes (None if the package is not installed)
+_CHAT_MODEL_CLASSES: Dict[str, Optional[Any]] = {}
+
+
+def _load_chat_model_class(provider: str) -> Optional[Any]:
+    """
+    Import the LangChain chat model class for a provider on first use.
+
+    Args:
+        provider: Provider name from _get_provider().
+
+    Returns:
+        Chat model class, or None if its package is not installed.
+    """
+    if provider in _CHAT_MODEL_CLASSES:
+        return _CHAT_MODEL_CLASSES[provider]
+
+    module_name, class_name, package = _PROVIDER_PACKAGES[provider]
+    try:
+        chat_cls = getattr(importlib.import_module(module_name), class_name)
+    except ImportError:
+        logger.error("%s not installed. Run: pip install %s", module_name, package)
+        chat_cls = None
+
+    _CHAT_MODEL_CLASSES[provider] = chat_cls
+    return chat_cls
+
+
+def _instantiate_llm(provider: str, model: str, api_key: str) -> Any:
+    """
+    Construct a LangChain chat model (uncached).
+
+    Args:
+        provider: Provider name from _get_provider().
+        model: Model identifier.
+        api_key: Provider API key.
+
+    Returns:
+        LangChain chat model instance.
+    """
+    chat_cls = _load_chat_model_class(provider)
+    logger.info("Creating %s LLM: %s", _PROVIDER_LABELS[provider], model)
+    if provider == "google":
+        return chat_cls(model=model, google_api_key=api_key)
+    return chat_cls(model=model, api_key=api_key)
+
+
 def _create_llm(model: str, settings: Dict[str, Any]) -> Optional[Any]:
     """
     Create a LangChain LLM instance for the specified model.
     
     Automatically selects the correct provider (OpenAI, Anthropic, Google)
     based on the model name and configures it with the appropriate API key.
+    Instances are reused for the same provider, model and API key within
+    the running event loop; the key is resolved from settings on every call
+    so a changed key takes effect immediately. Outside an event loop a new
+    instance is returned each time.
     
     Args:
         model: Model identifier (e.g., "gpt-4o", "claude-sonnet-4.5", "gemini-3-pro")
@@ -94,56 +187,48 @@ def _create_llm(model: str, settings: Dict[str, Any]) -> Optional[Any]:
         LangChain LLM instance, or None if initialization fails
     """
     provider = _get_provider(model)
-    api_keys = settings.get("api_keys", {})
+
+    if provider not in _PROVIDER_PACKAGES:
+        logger.error("Unknown provider: %s", provider)
+        return None
+
+    if _load_chat_model_class(provider) is None:
+        return None
+
+    api_key = settings.get("api_keys", {}).get(provider, "")
+    if not api_key:
+        logger.error("%s API key not configured in Settings → API Keys", _PROVIDER_LABELS[provider])
+        return None
 
     try:
-        if provider == "openai":
-            if not LANGCHAIN_OPENAI_AVAILABLE:
-                logger.error("langchain_openai not installed. Run: pip install langchain-openai")
-                return None
-
-            api_key = api_keys.get("openai", "")
-            if not api_key:
-                logger.error("OpenAI API key not configured in Settings → API Keys")
-                return None
-
-            logger.info(f"Creating OpenAI LLM: {model}")
-            return ChatOpenAI(model=model, api_key=api_key)
-
-        elif provider == "anthropic":
-            if not LANGCHAIN_ANTHROPIC_AVAILABLE:
-                logger.error("langchain_anthropic not installed. Run: pip install langchain-anthropic")
-                return None
-
-            api_key = api_keys.get("anthropic", "")
-            if not api_key:
-                logger.error("Anthropic API key not configured in Settings → API Keys")
-                return None
-
-            logger.info(f"Creating Anthropic LLM: {model}")
-            return ChatAnthropic(model=model, api_key=api_key)
-
-        elif provider == "google":
-            if not LANGCHAIN_GOOGLE_AVAILABLE:
-                logger.error("langchain_google_genai not installed. Run: pip install langchain-google-genai")
-                return None
-
-            api_key = api_keys.get("google", "")
-            if not api_key:
-                logger.error("Google API key not configured in Settings → API Keys")
-                return None
-
-            logger.info(f"Creating Google Gemini LLM: {model}")
-            return ChatGoogleGenerativeAI(model=model, google_api_key=api_key)
-        
-        else:
-            logger.error(f"Unknown provider: {provider}")
-            return None
-            
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    cache_key = (provider, model, hashlib.blake2b(api_key.encode("utf-8"), digest_size=8).hexdigest())
+
+    if loop is not None:
+        with _LLM_CACHE_LOCK:
+            loop_cache = _LLM_CACHE.get(loop, {})
+            llm = loop_cache.pop(cache_key, None)
+            if llm is not None:
+                loop_cache[cache_key] = llm  # Re-insert as most recently used
+                return llm
+
+    try:
+        llm = _instantiate_llm(provider, model, api_key)
     except Exception as e:
-        logger.error(f"Failed to create LLM for {model}: {e}", exc_info=True)
+        logger.error("Failed to create LLM for %s: %s", model, e, exc_info=True)
         return None
 
+    if loop is not None:
+        with _LLM_CACHE_LOCK:
+            loop_cache = _LLM_CACHE.setdefault(loop, {})
+            if len(loop_cache) >= _LLM_CACHE_MAX_ENTRIES:
+                loop_cache.pop(next(iter(loop_cache)))
+            llm = loop_cache.setdefault(cache_key, llm)
+    return llm
+
 
 # ============================================================================
 # BUDGET CONTROLS
@@ -151,7 +236,192 @@ def _create_llm(model: str, settings: Dict[str, Any]) -> Optional[Any]:
 
 # Safe defaults for bounded execution
 MAX_CREW_ITERATIONS = 3  # Maximum rounds for crew execution
-MAX_TOKENS_PER_AGENT = 4000  # Token limit per agent response (not currently used)
+MAX_TOKENS_PER_AGENT = 4000  # Expected completion size, used for rate-limit token estimates
+MAX_PARALLEL_CODER_FILES = 8  # Above this, the Coder writes all files in one response
+DEFAULT_CONTEXT_BUDGET_TOKENS = 1500  # Workspace context cap per prompt (preferences.context_budget_tokens)
+MAX_PATCHES_FOR_REVIEW_SKIP = 2  # Reviewer may be skipped only for this many clean files
+SIMPLE_REQUEST_MAX_CHARS = 200  # Shorter single-file requests fuse Planner and Coder
+MAX_RESULT_CHARS = 256_000  # Only the tail of larger crew outputs is parsed
+MAX_PATCHES = 64  # Blocks past this in one output are treated as spurious
+MAX_VERIFICATION_STEPS = 32
+MAX_CONCURRENT_CREW_RUNS = 4  # implement_feature runs executing at once; others wait
+
+
+# ============================================================================
+# TASK DESCRIPTIONS (shared by both runtimes)
+# ============================================================================
+
+_CODE_TASK_DESCRIPTION = """Implement the plan step-by-step.
+
+For each file that needs to be created or modified, output the COMPLETE file content in this EXACT format:
+
+### FILE: path/to/filename.py
+```python
+# Complete file content here
+# Include ALL code, not just changes
+...
+```
+
+For example, if creating a snake game:
+### FILE: snake.py
+```python
+import pygame
+# ... complete implementation ...
+```
+
+IMPORTANT:
+- Always include the ### FILE: header with the EXACT filename from the plan
+- Output the FULL file content, NOT a diff
+- Use the correct file extension (.py, .js, .ts, .st, etc.)
+- Include clear variable names and comments
+- Consider edge cases (startup, shutdown, faults)
+- Implement safety interlocks where applicable for PLC code
+"""
+
+_REVIEW_TASK_DESCRIPTION = """Review the generated code for:
+1. Correctness (matches plan?)
+2. Safety (interlocks, fault handling?)
+3. Syntax (valid IEC 61131-3?)
+4. Clarity (names, comments?)
+5. Edge cases (startup, shutdown, errors?)
+
+Output format:
+- Approval: YES/NO
+- Issues Found: [list]
+- Suggestions: [list]
+- Risk Level: LOW/MEDIUM/HIGH
+"""
+
+
+# Task templates, built once at import and filled with str.format_map. The
+# static instructions lead each template so every call shares a
+# byte-identical, cacheable prefix. The two descriptions above contain no
+# braces, so they can be concatenated into templates as-is.
+_CODE_TASK_TEMPLATE = _CODE_TASK_DESCRIPTION + "\nPLAN:\n{plan}"
+
+_CODE_FILE_TASK_TEMPLATE = _CODE_TASK_TEMPLATE + """
+
+Output ONLY the file {file_path} (other files in the plan are generated separately).
+"""
+
+_REVIEW_TASK_TEMPLATE = _REVIEW_TASK_DESCRIPTION + "\nCODE:\n{code}"
+
+_PLAN_TASK_TEMPLATE = """Analyze the feature request at the end of this message and generate an implementation plan.
+
+Generate a structured plan with:
+1. Goal (one-sentence summary)
+2. Files Affected (list of files to create/modify)
+3. Implementation Steps (3-7 steps max)
+4. Verification (how to test)
+5. Dependencies (any external requirements)
+
+WORKSPACE CONTEXT:
+{context}
+
+REQUEST: {request}
+"""
+
+_FUSED_TASK_TEMPLATE = """Plan and implement the feature request at the end of this message in one response.
+
+Plan: start with a short plan:
+1. Goal (one-sentence summary)
+2. Files Affected (list of files to create/modify)
+3. Implementation Steps (3-7 steps max)
+4. Verification (how to test)
+
+Then output the code:
+""" + _CODE_TASK_DESCRIPTION + """
+WORKSPACE CONTEXT:
+{context}
+
+REQUEST: {request}
+"""
+
+
+def _code_task_description(plan_text: str) -> str:
+    """Build the Coder task for a whole plan."""
+    return _CODE_TASK_TEMPLATE.format_map({"plan": plan_text})
+
+
+def _code_file_task_description(plan_text: str, file_path: str) -> str:
+    """
+    Build a Coder task scoped to a single file from the plan.
+
+    The shared instructions and plan come first so parallel per-file calls
+    share a cacheable prefix; only the target file differs.
+    """
+    return _CODE_FILE_TASK_TEMPLATE.format_map({"plan": plan_text, "file_path": file_path})
+
+
+def _review_task_description(code_text: str) -> str:
+    """Build the Reviewer task for the generated code."""
+    return _REVIEW_TASK_TEMPLATE.format_map({"code": code_text})
+
+
+def _plan_task_description(request: str, context_str: str) -> str:
+    """
+    Build the Planner task description.
+
+    Prompt-cache friendly ordering: static instructions first, then the
+    workspace context (stable across a session), then the request last.
+    Providers cache on the longest byte-identical prefix; the agent
+    backstory is already the leading system message.
+    """
+    return _PLAN_TASK_TEMPLATE.format_map({"request": request, "context": context_str})
+
+
+def _fused_task_description(request: str, context_str: str) -> str:
+    """
+    Build a single Planner + Coder task for simple requests.
+
+    Same ordering as the Planner task: static instructions, then workspace
+    context, then the request.
+    """
+    return _FUSED_TASK_TEMPLATE.format_map({"request": request, "context": context_str})
+
+
+def _is_simple_request(request: str, context: Dict[str, Any]) -> bool:
+    """
+    Check whether a request is small enough to plan and code in one call.
+
+    Args:
+        request: User's feature request.
+        context: Workspace context dict (a plain string has no active files).
+
+    Returns:
+        True for short requests with at most one active file.
+    """
+    active_files = context.get("active_files") if isinstance(context, dict) else None
+    return len(request) < SIMPLE_REQUEST_MAX_CHARS and len(active_files or []) <= 1
+
+
+@functools.lru_cache(maxsize=16)
+def _step_prompt(system_prompt: str, provider: str) -> ChatPromptTemplate:
+    """
+    Build the prompt template for a direct-pipeline step.
+
+    The agent prompt is a fixed system message (not templated, so braces in
+    it are safe) and the task fills {task}. Static text always leads, so
+    OpenAI and Gemini prefix caching apply automatically; for Anthropic the
+    system block is also marked as an explicit ephemeral cache breakpoint.
+
+    Args:
+        system_prompt: Agent prompt (CREW_*_PROMPT).
+        provider: Provider name from _get_provider().
+
+    Returns:
+        ChatPromptTemplate with a {task} slot.
+    """
+    if provider == "anthropic":
+        system = SystemMessage(content=[
+            {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+        ])
+    else:
+        system = SystemMessage(content=system_prompt)
+    return ChatPromptTemplate.from_messages([system, ("human", "{task}")])
+
+
+_STR_PARSER = StrOutputParser()
 
 
 # ============================================================================
@@ -167,7 +437,12 @@ async def implement_feature(
     Implement a complex feature via CrewAI (Planner → Coder → Reviewer).
 
     This is the main entry point called by the Master Agent.
-    Offloads blocking CrewAI work to a background thread.
+    Runs the async pipeline by default; the opt-in CrewAI runtime uses the
+    crew's native async kickoff.
+
+    Waits for the final result of implement_feature_streaming(); callers
+    that want to show files as the Coder produces them should use that
+    instead.
 
     Args:
         request: User's feature request.
@@ -189,17 +464,48 @@ async def implement_feature(
         >>> result["patch_plans"]
         [{"file_path": "conveyor.st", "diff": "...", "rationale": "...", "action": "modify"}]
     """
-    logger.info(f"implement_feature called: {request[:50]}...")
+    result: Dict[str, Any] = {}
+    async for result in implement_feature_streaming(request, project_root, context):
+        pass
+    return result
+
+
+async def implement_feature_streaming(
+    request: str,
+    project_root: Path,
+    context: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Implement a feature, yielding patches as soon as each file is generated.
+
+    With the default runtime, every completed ### FILE: block from the
+    Coder is yielded as a partial result (metadata.generation_pending =
+    True) whose patch_plans holds the files finished so far. The final
+    result (same shape as implement_feature) is always yielded last, after
+    the Reviewer. The CrewAI runtime yields the Coder's files in one partial
+    result once its task completes. Disabled and cached runs yield only the
+    final result.
+
+    Args:
+        request: User's feature request.
+        project_root: Project root directory (for file operations).
+        context: Optional context dict (workspace_summary, active_files, etc.).
+
+    Yields:
+        Partial results, then the final result dict.
+    """
+    logger.info("implement_feature called: %.50s...", request)
 
     # Load settings
     settings_manager = get_settings_manager()
     settings = settings_manager.load_settings()
+    configure_rate_limits(settings.get("preferences", {}).get("rate_limits"))
 
     # Toggle gate: If CrewAI disabled, return immediately
     enable_crew = settings.get("preferences", {}).get("enable_crew", True)
     if not enable_crew:
         logger.info("CrewAI disabled by toggle, returning no-op response")
-        return {
+        yield {
             "patch_plans": [],
             "summary": "CrewAI builder is disabled in settings. Enable it to use autonomous feature implementation.",
             "verification_steps": [],
@@ -208,33 +514,159 @@ async def implement_feature(
                 "budget_mode": "disabled"
             }
         }
+        return
+
+    # Response cache: repeated requests against the same context, models and
+    # active file versions skip all three LLM round-trips. Checked in memory
+    # first, then on disk (.pulse/crew_cache/, survives restarts).
+    preferences = settings.get("preferences", {})
+    cache = get_response_cache()
+    disk_cache = DiskResponseCache(Path(project_root) / ".pulse" / "crew_cache")
+    cache_key = None
+    if not preferences.get("disable_crew_cache", False):
+        models = settings.get("models", {})
+        cache_key = make_cache_key(
+            request,
+            _workspace_context(project_root, context or {}, settings),
+            _active_files_fingerprint(project_root, context or {}),
+            models.get("autogen_auditor", ""),
+            models.get("crew_coder", ""),
+            # Pipeline toggles change which agents run and so the result
+            str(preferences.get("crew_runtime", "direct")),
+            str(preferences.get("fuse_simple_requests", True)),
+            str(preferences.get("skip_reviewer_on_clean_syntax", True)),
+        )
+        ttl = preferences.get("crew_cache_ttl", DEFAULT_TTL_SECONDS)
+        cached = cache.get(cache_key, ttl=ttl)
+        if cached is None:
+            cached = disk_cache.get(cache_key, ttl=ttl)
+            if cached is not None:
+                cache.set(cache_key, cached)
+        if cached is not None:
+            logger.info("CrewAI response cache hit, skipping crew execution")
+            cached["metadata"]["cache_hit"] = True
+            yield cached
+            return
+
+    if preferences.get("crew_runtime", "direct") == "crewai":
+        run = _run_crew_streamed
+    else:
+        run = _run_pipeline_streamed
 
-    # Offload to background thread to prevent UI freeze
-    logger.info("Offloading CrewAI execution to background thread")
-    result = await asyncio.to_thread(
-        _run_crew_sync,
-        request=request,
-        project_root=project_root,
-        context=context or {},
-        settings=settings
-    )
+    # Backpressure: at most MAX_CONCURRENT_CREW_RUNS runs at once
+    async with _crew_run_slot():
+        async for result in run(
+            request=request,
+            project_root=project_root,
+            context=context or {},
+            settings=settings
+        ):
+            if result["metadata"].get("generation_pending"):
+                yield result
 
-    logger.info(f"CrewAI execution complete: {len(result['patch_plans'])} patches generated")
-    return result
+    if cache_key is not None and result["patch_plans"] and "error" not in result["metadata"]:
+        cache.set(cache_key, result)
+        await _run_in_crew_executor(disk_cache.set, cache_key, result)
+
+    logger.info("CrewAI execution complete: %d patches generated", len(result['patch_plans']))
+    yield result
+
+
+def implement_feature_sync(
+    request: str,
+    project_root: Path,
+    context: Optional[Dict[str, Any]] = None,
+    timeout: float = 300.0
+) -> Dict[str, Any]:
+    """
+    Synchronous shim around implement_feature for non-async callers.
+
+    Runs the coroutine with asyncio.run; if the caller is already inside an
+    event loop, the run happens on a helper thread with its own loop.
+
+    Args:
+        request: User's feature request.
+        project_root: Project root directory.
+        context: Optional workspace context.
+        timeout: Seconds to wait when bridging from a running loop.
+
+    Returns:
+        Dict with patch_plans, summary, verification_steps, metadata.
+    """
+    coro = implement_feature(request=request, project_root=project_root, context=context)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result(timeout=timeout)
+
+
+# ============================================================================
+# EXECUTION SLOTS
+# ============================================================================
+
+# Blocking work (output parsing, disk cache writes, legacy crew kickoff)
+# runs here instead of the loop's default executor, so other tools'
+# to_thread calls cannot starve it and vice versa.
+_CREW_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_CREW_RUNS, thread_name_prefix="crew"
+)
+atexit.register(_CREW_EXECUTOR.shutdown, wait=False)
+
+# Process-wide cap on concurrent runs. A threading semaphore (polled)
+# rather than asyncio.Semaphore, because the tool registry runs each call
+# in its own event loop.
+_CREW_RUN_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_CREW_RUNS)
+_CREW_SLOT_POLL_SECONDS = 0.05
+
+
+async def _run_in_crew_executor(func: Any, *args: Any) -> Any:
+    """Run a blocking function on the dedicated crew executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_CREW_EXECUTOR, functools.partial(func, *args))
+
+
+@contextlib.asynccontextmanager
+async def _crew_run_slot() -> AsyncIterator[None]:
+    """Hold one of the MAX_CONCURRENT_CREW_RUNS slots, waiting for one if needed."""
+    while not _CREW_RUN_SLOTS.acquire(blocking=False):
+        await asyncio.sleep(_CREW_SLOT_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        _CREW_RUN_SLOTS.release()
 
 
 # ============================================================================
-# SYNC CREW EXECUTION (runs in thread pool)
+# ASYNC PIPELINE (default runtime)
 # ============================================================================
 
-def _run_crew_sync(
+async def _run_pipeline_streamed(
     request: str,
     project_root: Path,
     context: Dict[str, Any],
     settings: Dict[str, Any]
-) -> Dict[str, Any]:
+) -> AsyncIterator[Dict[str, Any]]:
     """
-    Synchronous CrewAI execution (runs in background thread).
+    Run Planner → Coder → Reviewer as LCEL chains, yielding files as they finish.
+
+    Same roles and prompts as the CrewAI crew, without the framework or a
+    worker thread: each step is a ``prompt | llm | StrOutputParser()`` chain.
+    Steps are separate chains rather than one piped chain so each call can
+    go through the rate limiter and the Coder can fan out per file. The
+    Coder depends on the plan, so those two run in order; short single-file
+    requests (preferences.fuse_simple_requests) fuse them into one Coder
+    call that writes the plan and the code. The Reviewer runs concurrently
+    with output parsing; it is skipped when at most
+    MAX_PATCHES_FOR_REVIEW_SKIP files were generated and all pass a cheap
+    syntax check (preferences.skip_reviewer_on_clean_syntax).
+
+    A single Coder response is streamed and scanned incrementally for
+    complete ### FILE: blocks; parallel per-file calls report each file as
+    its call completes. Every new file yields a partial result.
 
     Args:
         request: User's feature request.
@@ -242,12 +674,256 @@ def _run_crew_sync(
         context: Workspace context dict.
         settings: User settings snapshot.
 
+    Yields:
+        Partial results (metadata.generation_pending = True), then the
+        final dict with patch_plans, summary, verification_steps, metadata.
+    """
+    logger.info("Starting async Planner → Coder → Reviewer pipeline")
+
+    try:
+        # Extract model settings
+        cheap_model = settings.get("models", {}).get("autogen_auditor", "gpt-4o-mini")
+        master_model = settings.get("models", {}).get("crew_coder", "gpt-4o")
+
+        cheap_llm = _create_llm(cheap_model, settings)
+        master_llm = _create_llm(master_model, settings)
+
+        if cheap_llm is None or master_llm is None:
+            yield {
+                "patch_plans": [],
+                "summary": "Error: Failed to initialize LLM. Check API key configuration in settings.",
+                "verification_steps": [],
+                "metadata": {"error": "llm_init_failed"}
+            }
+            return
+
+        context_str = _workspace_context(project_root, context, settings)
+
+        # Planner, or a single fused Planner + Coder call for simple requests
+        preferences = settings.get("preferences", {})
+        if preferences.get("fuse_simple_requests", True) and _is_simple_request(request, context):
+            logger.info("Simple request, fusing Planner and Coder into one call")
+            plan_text = ""
+            planned_files: List[str] = []
+            code_task = _fused_task_description(request, context_str)
+        else:
+            plan_text = await _run_step(
+                CREW_PLANNER_PROMPT, cheap_llm, cheap_model, _plan_task_description(request, context_str)
+            )
+            planned_files = _extract_planned_files(plan_text)
+            code_task = _code_task_description(plan_text)
+
+        # Coder (needs the plan). Multi-file plans get one call per file,
+        # in parallel, so a long response cannot truncate later files.
+        streamed: List[Dict[str, Any]] = []
+        if 2 <= len(planned_files) <= MAX_PARALLEL_CODER_FILES:
+            logger.info("Generating %d files in parallel", len(planned_files))
+            sections: Dict[str, str] = {}
+            async for file_path, text in _code_files_as_completed(
+                master_llm, master_model, plan_text, planned_files
+            ):
+                sections[file_path] = _as_file_section(file_path, text)
+                for block_path, code in _scan_file_blocks(sections[file_path]):
+                    if code.strip():
+                        streamed.append(_file_patch(block_path, code))
+                        yield _partial_result(streamed)
+            code_text = "\n\n".join(sections[file_path] for file_path in planned_files)
+        else:
+            code_text = ""
+            cursor = 0
+            async for chunk in _stream_step(CREW_CODER_PROMPT, master_llm, master_model, code_task):
+                code_text += chunk
+                while (block := _next_file_block(code_text, cursor)) is not None:
+                    block_path, code, cursor = block
+                    if code.strip():
+                        streamed.append(_file_patch(block_path, code))
+                        yield _partial_result(streamed)
+
+        # Reviewer, unless the output is small and syntactically clean. The
+        # streamed files predict the skip decision, so a review that will be
+        # needed starts right away, concurrently with parsing.
+        review_task = _review_task_description(code_text)
+        skip_review = preferences.get("skip_reviewer_on_clean_syntax", True)
+        if skip_review and streamed and _review_can_be_skipped(streamed):
+            parsed_result = await _run_in_crew_executor(_parse_crew_output, code_text, request)
+            review_text = None
+        else:
+            parsed_result, review_text = await asyncio.gather(
+                _run_in_crew_executor(_parse_crew_output, code_text, request),
+                _run_step(CREW_REVIEWER_PROMPT, master_llm, master_model, review_task),
+            )
+
+        if review_text is None and not _review_can_be_skipped(parsed_result["patch_plans"]):
+            review_text = await _run_step(CREW_REVIEWER_PROMPT, master_llm, master_model, review_task)
+
+        if review_text is None:
+            logger.info("Skipping Reviewer: generated files passed syntax checks")
+            parsed_result["metadata"].update({
+                "review_approved": True,
+                "review_risk_level": "LOW",
+                "review_skipped": True,
+            })
+        else:
+            parsed_result["metadata"].update(_parse_review(review_text))
+
+        parsed_result["metadata"]["runtime"] = "direct"
+
+        logger.info("Pipeline execution successful: %s", parsed_result['summary'])
+        yield parsed_result
+
+    except Exception as e:
+        logger.error("Pipeline execution failed: %s", e, exc_info=True)
+        yield {
+            "patch_plans": [],
+            "summary": f"Error during feature implementation: {str(e)}",
+            "verification_steps": [],
+            "metadata": {
+                "error": str(e),
+                "crew_enabled": True
+            }
+        }
+
+
+async def _code_files_as_completed(
+    llm: Any,
+    model: str,
+    plan_text: str,
+    file_paths: List[str]
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Run per-file Coder calls concurrently, yielding each as it completes.
+
+    Args:
+        llm: Coder chat model.
+        model: Coder model name.
+        plan_text: Planner output.
+        file_paths: Files to generate.
+
+    Yields:
+        (file_path, response_text) in completion order.
+    """
+    async def code_one_file(file_path: str) -> Tuple[str, str]:
+        text = await _run_step(
+            CREW_CODER_PROMPT, llm, model, _code_file_task_description(plan_text, file_path)
+        )
+        return file_path, text
+
+    tasks = [asyncio.ensure_future(code_one_file(file_path)) for file_path in file_paths]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _partial_result(patches: List[Dict[str, Any]], runtime: str = "direct") -> Dict[str, Any]:
+    """Build a partial result for the files generated so far."""
+    return {
+        "patch_plans": list(patches),
+        "summary": f"Generated {len(patches)} file(s) so far, review pending",
+        "verification_steps": [],
+        "metadata": {
+            "generation_pending": True,
+            "runtime": runtime
+        }
+    }
+
+
+# ============================================================================
+# CREWAI EXECUTION (opt-in runtime)
+# ============================================================================
+
+# Set once the shared rate-limit hook is registered with CrewAI
+_crew_hook_registered = False
+_CREW_HOOK_LOCK = threading.Lock()
+
+
+def _throttle_crew_llm_call(context: Any) -> None:
+    """
+    CrewAI before_llm_call hook: clear the shared provider limiter first.
+
+    Crew LLM calls then draw from the same process-wide RPM/TPM budget as
+    the direct pipeline and the other Tier 3 tools.
+
+    Args:
+        context: CrewAI LLMCallHookContext (llm, messages).
+    """
+    llm = context.llm
+    model = llm if isinstance(llm, str) else str(getattr(llm, "model", "") or "")
+    model = model.rsplit("/", 1)[-1]  # "openai/gpt-4o" -> "gpt-4o"
+    prompt = "".join(
+        str(message.get("content", "")) for message in context.messages if isinstance(message, dict)
+    )
+    estimated = _count_tokens(prompt, model) + MAX_TOKENS_PER_AGENT
+    get_rate_limiter(_get_provider(model)).acquire_blocking(estimated)
+
+
+def _register_crew_rate_limit_hook() -> bool:
+    """
+    Register _throttle_crew_llm_call as a global CrewAI hook (once).
+
     Returns:
-        Dict with patch_plans, summary, verification_steps, metadata.
+        True if the hook is active, False on CrewAI versions without hooks.
+    """
+    global _crew_hook_registered
+    with _CREW_HOOK_LOCK:
+        if not _crew_hook_registered:
+            try:
+                from crewai.hooks import register_before_llm_call_hook
+            except ImportError:
+                return False
+            register_before_llm_call_hook(_throttle_crew_llm_call)
+            _crew_hook_registered = True
+    return True
+
+
+async def _kickoff_crew(crew: Any) -> Any:
+    """
+    Run a crew without blocking the event loop.
+
+    Prefers CrewAI's native async kickoff (akickoff), then kickoff_async,
+    and only falls back to the crew executor on older CrewAI versions.
+    """
+    if hasattr(crew, "akickoff"):
+        return await crew.akickoff()
+    if hasattr(crew, "kickoff_async"):
+        return await crew.kickoff_async()
+    return await _run_in_crew_executor(crew.kickoff)
+
+
+async def _run_crew_streamed(
+    request: str,
+    project_root: Path,
+    context: Dict[str, Any],
+    settings: Dict[str, Any]
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    CrewAI execution (opt-in runtime), yielding files once the Coder finishes.
+
+    The Coder task's callback hands its output to the event loop through an
+    asyncio.Queue (call_soon_threadsafe, since CrewAI may invoke callbacks
+    from a worker thread). Its ### FILE: blocks are yielded as a partial
+    result while the Reviewer is still running. If the consumer stops
+    early, the kickoff is cancelled.
+
+    Args:
+        request: User's feature request.
+        project_root: Project root directory.
+        context: Workspace context dict.
+        settings: User settings snapshot.
+
+    Yields:
+        A partial result (metadata.generation_pending = True) after the
+        Coder, then the final dict with patch_plans, summary,
+        verification_steps, metadata.
     """
-    logger.info("Starting synchronous CrewAI execution")
+    logger.info("Starting CrewAI execution")
 
     try:
+        # Imported here: CrewAI is only needed for the opt-in runtime
+        from crewai import Agent, Task, Crew, Process
+
         # Extract model settings
         cheap_model = settings.get("models", {}).get("autogen_auditor", "gpt-4o-mini")
         master_model = settings.get("models", {}).get("crew_coder", "gpt-4o")
@@ -258,15 +934,24 @@ def _run_crew_sync(
         master_llm = _create_llm(master_model, settings)
         
         if cheap_llm is None or master_llm is None:
-            return {
+            yield {
                 "patch_plans": [],
                 "summary": "Error: Failed to initialize LLM. Check API key configuration in settings.",
                 "verification_steps": [],
                 "metadata": {"error": "llm_init_failed"}
             }
+            return
+
+        # Coder output is forwarded here as soon as its task completes
+        loop = asyncio.get_running_loop()
+        code_outputs: asyncio.Queue = asyncio.Queue()
+
+        def on_code_done(task_output: Any) -> None:
+            raw = getattr(task_output, "raw", None) or str(task_output)
+            loop.call_soon_threadsafe(code_outputs.put_nowait, raw)
 
         # Build context string for agents
-        context_str = _build_context_string(project_root, context)
+        context_str = _workspace_context(project_root, context, settings)
 
         # Create agents
         planner = Agent(
@@ -289,106 +974,90 @@ def _run_crew_sync(
 
         reviewer = Agent(
             role="Code Review Agent",
-            goal="Review generated code for quality, safety, and best practices",
-            backstory=CREW_REVIEWER_PROMPT,
-            llm=master_llm,
-            verbose=True,
-            allow_delegation=False
-        )
-
-        # Create tasks
-        plan_task = Task(
-            description=f"""Analyze this feature request and generate an implementation plan:
-
-REQUEST: {request}
-
-WORKSPACE CONTEXT:
-{context_str}
-
-Generate a structured plan with:
-1. Goal (one-sentence summary)
-2. Files Affected (list of files to create/modify)
-3. Implementation Steps (3-7 steps max)
-4. Verification (how to test)
-5. Dependencies (any external requirements)
-""",
-            agent=planner,
-            expected_output="Structured implementation plan with goal, files, steps, verification, and dependencies"
-        )
-
-        code_task = Task(
-            description="""Implement the plan step-by-step.
-
-For each file that needs to be created or modified, output the COMPLETE file content in this EXACT format:
-
-### FILE: path/to/filename.py
-```python
-# Complete file content here
-# Include ALL code, not just changes
-...
-```
-
-For example, if creating a snake game:
-### FILE: snake.py
-```python
-import pygame
-# ... complete implementation ...
-```
+            goal="Review generated code for quality, safety, and best practices",
+            backstory=CREW_REVIEWER_PROMPT,
+            llm=master_llm,
+            verbose=True,
+            allow_delegation=False
+        )
 
-IMPORTANT:
-- Always include the ### FILE: header with the EXACT filename from the plan
-- Output the FULL file content, NOT a diff
-- Use the correct file extension (.py, .js, .ts, .st, etc.)
-- Include clear variable names and comments
-- Consider edge cases (startup, shutdown, faults)
-- Implement safety interlocks where applicable for PLC code
-""",
-            agent=coder,
-            expected_output="Complete file contents for all affected files with ### FILE: headers",
-            context=[plan_task]
+        # Create tasks. Simple requests get one fused plan + code task on
+        # the Coder, so the crew makes two LLM calls instead of three.
+        fuse = (
+            settings.get("preferences", {}).get("fuse_simple_requests", True)
+            and _is_simple_request(request, context)
         )
+        if fuse:
+            agents = [coder, reviewer]
+            code_task = Task(
+                description=_fused_task_description(request, context_str),
+                agent=coder,
+                expected_output="Short plan, then complete file contents for all affected files with ### FILE: headers",
+                callback=on_code_done
+            )
+            tasks = [code_task]
+        else:
+            agents = [planner, coder, reviewer]
+            plan_task = Task(
+                description=_plan_task_description(request, context_str),
+                agent=planner,
+                expected_output="Structured implementation plan with goal, files, steps, verification, and dependencies"
+            )
+            code_task = Task(
+                description=_CODE_TASK_DESCRIPTION,
+                agent=coder,
+                expected_output="Complete file contents for all affected files with ### FILE: headers",
+                context=[plan_task],
+                callback=on_code_done
+            )
+            tasks = [plan_task, code_task]
 
         review_task = Task(
-            description="""Review the generated code for:
-1. Correctness (matches plan?)
-2. Safety (interlocks, fault handling?)
-3. Syntax (valid IEC 61131-3?)
-4. Clarity (names, comments?)
-5. Edge cases (startup, shutdown, errors?)
-
-Output format:
-- Approval: YES/NO
-- Issues Found: [list]
-- Suggestions: [list]
-- Risk Level: LOW/MEDIUM/HIGH
-""",
+            description=_REVIEW_TASK_DESCRIPTION,
             agent=reviewer,
             expected_output="Code review with approval status, issues, suggestions, and risk level",
             context=[code_task]
         )
+        tasks.append(review_task)
 
-        # Create crew with budget controls
+        # Create crew with budget controls. Provider limits are enforced
+        # process-wide by the before_llm_call hook; CrewAI versions without
+        # hooks fall back to the crew's own per-crew RPM cap.
         crew = Crew(
-            agents=[planner, coder, reviewer],
-            tasks=[plan_task, code_task, review_task],
+            agents=agents,
+            tasks=tasks,
             process=Process.sequential,
             verbose=True,
-            max_rpm=10,  # Rate limit to 10 requests per minute
+            max_rpm=None if _register_crew_rate_limit_hook() else 10,
         )
 
-        # Execute crew (blocking)
         logger.info("Executing CrewAI crew...")
-        crew_result = crew.kickoff()
+        kickoff = asyncio.ensure_future(_kickoff_crew(crew))
+        next_output = asyncio.ensure_future(code_outputs.get())
+        try:
+            await asyncio.wait({kickoff, next_output}, return_when=asyncio.FIRST_COMPLETED)
+            if next_output.done():
+                streamed = [
+                    _file_patch(block_path, code)
+                    for block_path, code in _scan_file_blocks(next_output.result())
+                    if code.strip()
+                ]
+                if streamed:
+                    yield _partial_result(streamed, runtime="crewai")
+            crew_result = await kickoff
+        finally:
+            next_output.cancel()
+            kickoff.cancel()
 
         # Parse crew output into structured format
-        parsed_result = _parse_crew_output(crew_result, request)
+        parsed_result = await _run_in_crew_executor(_parse_crew_output, crew_result, request)
 
-        logger.info(f"CrewAI execution successful: {parsed_result['summary']}")
-        return parsed_result
+        logger.info("CrewAI execution successful: %s", parsed_result['summary'])
+        yield parsed_result
 
     except Exception as e:
-        logger.error(f"CrewAI execution failed: {e}", exc_info=True)
-        return {
+        logger.error("CrewAI execution failed: %s", e, exc_info=True)
+        yield {
             "patch_plans": [],
             "summary": f"Error during feature implementation: {str(e)}",
             "verification_steps": [],
@@ -399,45 +1068,581 @@ Output format:
         }
 
 
+# ============================================================================
+# OUTPUT PARSING PATTERNS (compiled once at import)
+# ============================================================================
+
+# File extensions recognised in filename hints
+_FILENAME_EXT = r"(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h)"
+
+# Literals for the "### FILE:" header scan (plain str.find, no regex)
+_FILE_HEADER = "### FILE:"
+_FENCE = "```"
+
+# Default file extension per fence language (others use the language name)
+_LANG_EXTENSIONS = {
+    "python": "py",
+    "javascript": "js",
+    "typescript": "ts",
+    "java": "java",
+    "go": "go",
+    "rust": "rs",
+}
+
+# Diff header lines that can set a block's path or action (before the first hunk)
+_DIFF_HEADER_PREFIXES = ("@@", "--- ", "+++ ", "new file mode", "deleted file mode")
+
+# "# File: name.ext" / "# name.ext" hint on the first line of a code block
+_CODE_HINT_RE = re.compile(rf"#\s*(?:File:\s*)?([\w\./_-]+\.{_FILENAME_EXT})\s*$", re.IGNORECASE)
+
+# Any fenced code block (last-resort fallback in _parse_crew_output)
+_ANY_CODE_BLOCK_RE = re.compile(r"```\w*\s*\n(.*?)```", re.DOTALL)
+
+# Numbered verification steps after "Verification:" / "Test:" / "Testing:"
+_VERIFICATION_RE = re.compile(
+    r"(?:Verification|Test|Testing):?\s*\n((?:\d+\.\s+.+\n?)+)", re.IGNORECASE
+)
+_NUMBERED_STEP_RE = re.compile(r"\d+\.\s+(.+)")
+
+# Reviewer verdict fields
+_REVIEW_APPROVAL_RE = re.compile(r"Approval:\W*(YES|NO)", re.IGNORECASE)
+_REVIEW_RISK_RE = re.compile(r"Risk Level:\W*(LOW|MEDIUM|HIGH)", re.IGNORECASE)
+
+# ISO-8601 style timestamps, masked out of prompt context
+_TIMESTAMP_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"
+)
+
+# Syntax gate: string literals and comments stripped before brace counting
+_JS_NOISE_RE = re.compile(
+    r"//[^\n]*|/\*.*?\*/|`(?:\\.|[^`\\])*`|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'",
+    re.DOTALL,
+)
+_JS_BRACKET_PAIRS = {")": "(", "]": "[", "}": "{"}
+
+# Syntax gate: IEC 61131-3 block keywords and their END_ forms. VAR_INPUT,
+# VAR_OUTPUT etc. all close with END_VAR.
+_ST_NOISE_RE = re.compile(r"\(\*.*?\*\)|//[^\n]*|'[^'\n]*'", re.DOTALL)
+_ST_BLOCK_RE = re.compile(
+    r"\b(END_)?(VAR(?:_[A-Z_]+)?|IF|FOR|WHILE|REPEAT|CASE|PROGRAM|FUNCTION_BLOCK|FUNCTION|STRUCT|TYPE|METHOD)\b",
+    re.IGNORECASE,
+)
+
+# "Files Affected" section of the Planner output, up to the next plan heading
+_FILES_AFFECTED_RE = re.compile(
+    r"Files Affected(?P<section>.*?)"
+    r"(?=^\W*(?:\d+\.\s*)?\W*(?:Implementation Steps|Steps|Verification|Dependencies)\b|\Z)",
+    re.DOTALL | re.IGNORECASE | re.MULTILINE,
+)
+
+# File paths listed in the Planner output
+_PLAN_FILENAME_RE = re.compile(rf"[\w\./-]+\.{_FILENAME_EXT}\b")
+
+# Filename hints in a user request, in two passes:
+#   targeted: a filename after a leading verb/noun ("called snake.py",
+#             "create a simple game.js", "in conveyor.st")
+#   bare:     any filename (last resort; also used for the text just
+#             before an unnamed code block)
+_TARGETED_FILENAME_RE = re.compile(
+    r"\b(?:called|named|create|make|write|build|generate|script|file|in|to)\s+"
+    rf"(?:a\s+)?(?:\w+\s+)*?['\"]?([\w\._-]+\.{_FILENAME_EXT})['\"]?",
+    re.IGNORECASE,
+)
+_BARE_FILENAME_RE = re.compile(rf"['\"]?([\w\._-]+\.{_FILENAME_EXT})['\"]?", re.IGNORECASE)
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def _build_context_string(project_root: Path, context: Dict[str, Any]) -> str:
+def _step_chain(system_prompt: str, llm: Any, model: str, task: str) -> Tuple[str, int, Any]:
+    """
+    Build a step chain (``prompt | llm | StrOutputParser()``) and its token estimate.
+
+    Args:
+        system_prompt: Agent prompt (CREW_*_PROMPT).
+        llm: LangChain chat model.
+        model: Model name.
+        task: Task text for the human message.
+
+    Returns:
+        (provider, estimated_tokens, chain)
+    """
+    provider = _get_provider(model)
+    estimated = _count_tokens(system_prompt, model) + _count_tokens(task, model) + MAX_TOKENS_PER_AGENT
+    return provider, estimated, _step_prompt(system_prompt, provider) | llm | _STR_PARSER
+
+
+async def _run_step(system_prompt: str, llm: Any, model: str, task: str) -> str:
+    """
+    Run one pipeline step under the provider limits.
+
+    The call clears the provider's RPM/TPM budget first and holds a slot
+    from its AIMD concurrency controller, so concurrent implement_feature
+    runs back off together when the provider returns 429s.
+
+    Args:
+        system_prompt: Agent prompt (CREW_*_PROMPT).
+        llm: LangChain chat model.
+        model: Model name (used to pick the provider limiter).
+        task: Task text for the human message.
+
+    Returns:
+        Model response text.
+    """
+    provider, estimated, chain = _step_chain(system_prompt, llm, model, task)
+
+    async with get_concurrency_controller(provider).slot():
+        await get_rate_limiter(provider).wait_if_throttled(estimated)
+        return await chain.ainvoke({"task": task})
+
+
+async def _stream_step(system_prompt: str, llm: Any, model: str, task: str) -> AsyncIterator[str]:
+    """
+    Stream one pipeline step's text under the provider limits.
+
+    Same limits as _run_step; the concurrency slot is held until the
+    stream ends, and the time to first chunk is reported to the controller.
+
+    Args:
+        system_prompt: Agent prompt (CREW_*_PROMPT).
+        llm: LangChain chat model.
+        model: Model name (used to pick the provider limiter).
+        task: Task text for the human message.
+
+    Yields:
+        Response text chunks.
+    """
+    provider, estimated, chain = _step_chain(system_prompt, llm, model, task)
+
+    async with get_concurrency_controller(provider).slot() as record_first_token:
+        await get_rate_limiter(provider).wait_if_throttled(estimated)
+        sent_at = time.monotonic()
+        async for chunk in chain.astream({"task": task}):
+            record_first_token(time.monotonic() - sent_at)
+            yield chunk
+
+
+def _extract_planned_files(plan_text: str) -> List[str]:
+    """
+    List the files named in the Planner's "Files Affected" section.
+
+    Args:
+        plan_text: Raw Planner output.
+
+    Returns:
+        Unique file paths in order of appearance (empty if no section).
+    """
+    section = _FILES_AFFECTED_RE.search(plan_text)
+    if not section:
+        return []
+    return list(dict.fromkeys(_PLAN_FILENAME_RE.findall(section["section"])))
+
+
+def _as_file_section(file_path: str, text: str) -> str:
+    """
+    Ensure a per-file Coder response carries a ### FILE: header.
+
+    Responses that already contain a header are returned unchanged; otherwise
+    the first fenced block (or the whole text) is placed under a header for
+    the requested file.
+
+    Args:
+        file_path: File the response was generated for.
+        text: Coder response text.
+
+    Returns:
+        Text starting with a ### FILE: section.
+    """
+    if _FILE_HEADER in text:
+        return text
+
+    fence_start = text.find(_FENCE)
+    fence_end = text.find(_FENCE, text.find("\n", fence_start) + 1) if fence_start != -1 else -1
+    if fence_end == -1:
+        block = f"{_FENCE}\n{text.strip()}\n{_FENCE}"
+    else:
+        block = text[fence_start:fence_end + len(_FENCE)]
+    return f"{_FILE_HEADER} {file_path}\n{block}"
+
+
+def _python_syntax_ok(code: str) -> bool:
+    """Check Python source with ast.parse."""
+    try:
+        ast.parse(code)
+    except (SyntaxError, ValueError):
+        return False
+    return True
+
+
+def _brackets_balanced(code: str) -> bool:
+    """Check (), [] and {} nesting in JS/TS source, ignoring strings and comments."""
+    stack = []
+    for char in _JS_NOISE_RE.sub("", code):
+        if char in "([{":
+            stack.append(char)
+        elif char in _JS_BRACKET_PAIRS:
+            if not stack or stack.pop() != _JS_BRACKET_PAIRS[char]:
+                return False
+    return not stack
+
+
+def _st_blocks_balanced(code: str) -> bool:
+    """Check that every Structured Text block keyword has a matching END_ keyword."""
+    counts: Dict[str, int] = {}
+    for match in _ST_BLOCK_RE.finditer(_ST_NOISE_RE.sub("", code)):
+        keyword = match.group(2).upper()
+        if keyword.startswith("VAR"):
+            keyword = "VAR"
+        counts[keyword] = counts.get(keyword, 0) + (-1 if match.group(1) else 1)
+        if counts[keyword] < 0:
+            return False
+    return not any(counts.values())
+
+
+# File extension → syntax check used by the Reviewer gate
+_SYNTAX_CHECKS = {
+    ".py": _python_syntax_ok,
+    ".js": _brackets_balanced,
+    ".jsx": _brackets_balanced,
+    ".ts": _brackets_balanced,
+    ".tsx": _brackets_balanced,
+    ".st": _st_blocks_balanced,
+    ".scl": _st_blocks_balanced,
+}
+
+
+def _review_can_be_skipped(patches: List[Dict[str, Any]]) -> bool:
+    """
+    Decide whether the Reviewer call can be skipped.
+
+    Only small outputs (at most MAX_PATCHES_FOR_REVIEW_SKIP full-content
+    patches) qualify, and every file must have a known type that passes its
+    syntax check. Diffs and unknown file types always go to the Reviewer.
+
+    Args:
+        patches: Extracted patch plans.
+
+    Returns:
+        True if the Reviewer can be skipped.
+    """
+    if not patches or len(patches) > MAX_PATCHES_FOR_REVIEW_SKIP:
+        return False
+
+    for patch in patches:
+        content = patch.get("content")
+        check = _SYNTAX_CHECKS.get(os.path.splitext(patch["file_path"])[1].lower())
+        if content is None or check is None or not check(content):
+            return False
+    return True
+
+
+def _parse_review(review_text: str) -> Dict[str, Any]:
+    """
+    Extract the structured verdict from the Reviewer output.
+
+    Only the approval flag and risk level are kept; the review transcript
+    itself is not returned to the Master.
+
+    Args:
+        review_text: Raw Reviewer output.
+
+    Returns:
+        Dict with review_approved (bool | None) and review_risk_level (str | None).
+    """
+    approval = _REVIEW_APPROVAL_RE.search(review_text)
+    risk = _REVIEW_RISK_RE.search(review_text)
+    return {
+        "review_approved": approval.group(1).upper() == "YES" if approval else None,
+        "review_risk_level": risk.group(1).upper() if risk else None,
+    }
+
+
+@functools.lru_cache(maxsize=8)
+def _get_encoding(model: str) -> Optional[Any]:
+    """
+    Get the tiktoken encoding for a model (loaded once per model).
+
+    tiktoken is imported lazily; it ships with langchain-openai but is not
+    required. Non-OpenAI models use cl100k_base as an approximation.
+    Without tiktoken (or its encoding files), callers fall back to a
+    character-based estimate.
+
+    Args:
+        model: Model identifier.
+
+    Returns:
+        tiktoken Encoding, or None if tiktoken is not installed.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Encoding files are downloaded on first use; offline installs fall back
+        logger.warning("tiktoken encoding unavailable, estimating tokens: %s", e)
+        return None
+
+
+def _count_tokens(text: str, model: str) -> int:
+    """Count tokens with tiktoken, or estimate (~4 chars/token) without it."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _truncate_head_tail(text: str, max_tokens: int, model: str) -> str:
+    """
+    Trim text to a token budget, keeping its head and tail.
+
+    Args:
+        text: Text to trim.
+        max_tokens: Token budget.
+        model: Model identifier (selects the tokenizer).
+
+    Returns:
+        The text unchanged if it fits, otherwise head + marker + tail.
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        max_chars = max_tokens * 4
+        if len(text) <= max_chars:
+            return text
+        half = max_chars // 2
+        return f"{text[:half]}\n... [truncated] ...\n{text[-half:]}"
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    half = max_tokens // 2
+    return (
+        f"{encoding.decode(tokens[:half])}\n... [truncated] ...\n"
+        f"{encoding.decode(tokens[-half:])}"
+    )
+
+
+def _fit_items(items: List[str], max_tokens: int, model: str) -> List[str]:
+    """
+    Take items from the front of a list while they fit in a token budget.
+
+    Args:
+        items: Candidate items, highest priority first.
+        max_tokens: Token budget.
+        model: Model identifier (selects the tokenizer).
+
+    Returns:
+        Leading items that fit (at least one if items is non-empty).
+    """
+    kept = []
+    used = 0
+    for item in items:
+        used += _count_tokens(item, model) + 2  # "- " bullet + newline
+        if kept and used > max_tokens:
+            break
+        kept.append(item)
+    return kept
+
+
+def _file_mtime(project_root: Path, file_path: str) -> float:
+    """Modification time of a workspace file, or 0.0 if it cannot be read."""
+    try:
+        return (project_root / file_path).stat().st_mtime
+    except (OSError, ValueError):
+        return 0.0
+
+
+def _canonical_text(text: Any) -> str:
+    """
+    Normalize free text for byte-stable prompts.
+
+    Masks ISO-8601 timestamps and strips trailing whitespace per line.
+
+    Args:
+        text: Text to normalize (non-strings are converted with str()).
+
+    Returns:
+        Normalized text.
+    """
+    text = _TIMESTAMP_RE.sub("<timestamp>", str(text))
+    return "\n".join(line.rstrip() for line in text.splitlines())
+
+
+def _build_context_string(
+    project_root: Path,
+    context: Dict[str, Any],
+    budget_tokens: int = DEFAULT_CONTEXT_BUDGET_TOKENS,
+    model: str = "gpt-4o-mini"
+) -> str:
     """
     Build context string from workspace context dict.
 
+    The output is a pure function of the context content, not of its
+    enumeration order or volatile fields: active files are sorted,
+    unordered collections are sorted, timestamps are masked and trailing
+    whitespace is stripped. Provider prompt caches only hit on
+    byte-identical prefixes, so the same workspace must always render the
+    same string.
+
+    Each section is capped at a third of budget_tokens: the summary keeps
+    its head and tail, active files keep the most recently modified, and
+    recent changes keep the last entries.
+
+    The context is reduced to hashable values (including active file
+    mtimes, which decide trimming) and rendered through an LRU cache, so
+    repeated calls for an unchanged workspace skip tokenization.
+
     Args:
         project_root: Project root directory.
         context: Context dict with workspace_summary, active_files, etc.
                  May also be a string if LLM passes raw context.
+        budget_tokens: Token budget for the whole context.
+        model: Model identifier used for token counting.
 
     Returns:
         Formatted context string for agent prompts.
     """
-    parts = [f"Project Root: {project_root}"]
-
     # Handle case where context is passed as a string instead of dict
     if isinstance(context, str):
         # LLM might pass a raw string as context - just append it
         if context.strip():
-            parts.append(f"\nContext:\n{context}")
-        return "\n".join(parts)
-    
+            text = _truncate_head_tail(_canonical_text(context), budget_tokens, model)
+            return f"Project Root: {project_root}\n\nContext:\n{text}"
+        return f"Project Root: {project_root}"
+
     # Handle None case
     if not context:
-        return "\n".join(parts)
+        return f"Project Root: {project_root}"
+
+    workspace_summary = context.get("workspace_summary")
+    files = tuple(sorted(map(str, context.get("active_files") or ())))
+    recent_changes = context.get("recent_changes") or ()
+    # Keep list order (it carries recency); only unordered sets are sorted
+    if isinstance(recent_changes, (set, frozenset)):
+        recent_changes = sorted(map(str, recent_changes))
+
+    return _render_context(
+        str(project_root),
+        str(workspace_summary) if workspace_summary else "",
+        files,
+        tuple(_file_mtime(project_root, f) for f in files),
+        tuple(str(c).rstrip() for c in recent_changes),
+        budget_tokens,
+        model,
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _render_context(
+    project_root: str,
+    workspace_summary: str,
+    files: Tuple[str, ...],
+    mtimes: Tuple[float, ...],
+    changes: Tuple[str, ...],
+    budget_tokens: int,
+    model: str
+) -> str:
+    """
+    Render the context string from normalized, hashable inputs.
+
+    Args:
+        project_root: Project root directory.
+        workspace_summary: Raw workspace summary ("" if absent).
+        files: Active files, sorted.
+        mtimes: Modification time of each active file.
+        changes: Recent changes, most recent last.
+        budget_tokens: Token budget for the whole context.
+        model: Model identifier used for token counting.
+
+    Returns:
+        Formatted context string.
+    """
+    # One flat list of lines, joined once at the end
+    buf = [f"Project Root: {project_root}"]
+    section_budget = max(budget_tokens // 3, 1)
+
+    if workspace_summary:
+        summary = _canonical_text(workspace_summary)
+        trimmed = _truncate_head_tail(summary, section_budget, model)
+        if trimmed is not summary:
+            logger.debug("Trimmed workspace summary to %d tokens", section_budget)
+        buf.append("\nWorkspace Summary:")
+        buf.append(trimmed)
+
+    if files:
+        kept = _fit_items(list(files), section_budget, model)
+        if len(kept) < len(files):
+            # Over budget: keep the most recently modified files
+            mtime_of = dict(zip(files, mtimes))
+            by_recency = sorted(files, key=mtime_of.__getitem__, reverse=True)
+            kept = sorted(_fit_items(by_recency, section_budget, model))
+            logger.debug("Trimmed active files from %d to %d", len(files), len(kept))
+        buf.append("\nActive Files:")
+        buf.extend(f"- {f}" for f in kept)
+
+    if changes:
+        kept = _fit_items(list(changes[::-1]), section_budget, model)[::-1]
+        if len(kept) < len(changes):
+            logger.debug("Trimmed recent changes from %d to %d", len(changes), len(kept))
+        buf.append("\nRecent Changes:")
+        buf.extend(f"- {c}" for c in kept)
+
+    return "\n".join(buf)
+
+
+def _active_files_fingerprint(project_root: Path, context: Dict[str, Any]) -> str:
+    """
+    Fingerprint the modification times of the context's active files.
+
+    Part of the response cache key, so editing any active file invalidates
+    cached results for that workspace state.
+
+    Args:
+        project_root: Project root directory.
+        context: Workspace context dict (or raw string).
+
+    Returns:
+        "path:mtime_ns" entries joined by newlines (0 for unreadable files).
+    """
+    if not isinstance(context, dict):
+        return ""
+
+    entries = []
+    for file_path in sorted(map(str, context.get("active_files") or ())):
+        try:
+            mtime_ns = (Path(project_root) / file_path).stat().st_mtime_ns
+        except (OSError, ValueError):
+            mtime_ns = 0
+        entries.append(f"{file_path}:{mtime_ns}")
+    return "\n".join(entries)
 
-    if workspace_summary := context.get("workspace_summary"):
-        parts.append(f"\nWorkspace Summary:\n{workspace_summary}")
 
-    if active_files := context.get("active_files"):
-        parts.append("\nActive Files:\n" + "\n".join(f"- {f}" for f in active_files))
+def _workspace_context(project_root: Path, context: Dict[str, Any], settings: Dict[str, Any]) -> str:
+    """
+    Build the Planner context string within the configured token budget.
 
-    if recent_changes := context.get("recent_changes"):
-        parts.append("\nRecent Changes:\n" + "\n".join(f"- {c}" for c in recent_changes))
+    Args:
+        project_root: Project root directory.
+        context: Workspace context dict.
+        settings: User settings snapshot.
 
-    return "\n".join(parts)
+    Returns:
+        Formatted context string.
+    """
+    return _build_context_string(
+        project_root,
+        context,
+        budget_tokens=settings.get("preferences", {}).get(
+            "context_budget_tokens", DEFAULT_CONTEXT_BUDGET_TOKENS
+        ),
+        model=settings.get("models", {}).get("autogen_auditor", "gpt-4o-mini"),
+    )
 
 
 def _parse_crew_output(crew_result: Any, request: str) -> Dict[str, Any]:
@@ -445,6 +1650,8 @@ def _parse_crew_output(crew_result: Any, request: str) -> Dict[str, Any]:
     Parse CrewAI output into structured format.
 
     Extracts unified diffs from the coder's output and builds PatchPlan dicts.
+    Outputs longer than MAX_RESULT_CHARS are cut to their tail (from a line
+    boundary), where the final files and verification steps are.
 
     Args:
         crew_result: Raw CrewAI result object.
@@ -453,13 +1660,17 @@ def _parse_crew_output(crew_result: Any, request: str) -> Dict[str, Any]:
     Returns:
         Dict with patch_plans, summary, verification_steps, metadata.
     """
-    # Extract result text
-    if hasattr(crew_result, 'raw'):
-        result_text = str(crew_result.raw)
-    else:
-        result_text = str(crew_result)
+    # Extract result text (str() only for non-string results, to avoid a copy)
+    raw = getattr(crew_result, "raw", crew_result)
+    result_text = raw if isinstance(raw, str) else str(raw)
+
+    if len(result_text) > MAX_RESULT_CHARS:
+        cut = len(result_text) - MAX_RESULT_CHARS
+        newline = result_text.find("\n", cut)
+        logger.warning("Crew output is %d chars, parsing the last %d", len(result_text), MAX_RESULT_CHARS)
+        result_text = result_text[newline + 1 if newline != -1 else cut:]
 
-    logger.debug(f"Parsing crew result: {result_text[:200]}...")
+    logger.debug("Parsing crew result: %.200s...", result_text)
 
     # Parse diff blocks (with fallback to code blocks)
     patch_plans = _extract_patches_from_text(result_text, original_request=request)
@@ -472,13 +1683,13 @@ def _parse_crew_output(crew_result: Any, request: str) -> Dict[str, Any]:
         summary = f"Implemented feature: {request[:80]}... ({len(patch_plans)} files affected)"
     else:
         # FALLBACK: Try to extract ANY code block as a last resort
-        import re
-        any_code_pattern = r"```\w*\s*\n(.*?)```"
-        all_code_blocks = re.findall(any_code_pattern, result_text, re.DOTALL)
+        # Use the longest code block as the main output (streamed, not materialized)
+        longest_code = max(
+            (m.group(1) for m in _ANY_CODE_BLOCK_RE.finditer(result_text)), key=len, default=None
+        )
 
-        if all_code_blocks:
-            # Use the longest code block as the main output
-            longest_code = max(all_code_blocks, key=len).strip()
+        if longest_code is not None:
+            longest_code = longest_code.strip()
 
             if longest_code:
                 # Extract filename from request
@@ -492,13 +1703,13 @@ def _parse_crew_output(crew_result: Any, request: str) -> Dict[str, Any]:
                     "action": "create"
                 })
                 summary = f"Implemented feature: {request[:80]}... (1 file from fallback extraction)"
-                logger.info(f"Fallback extraction: found code block, using filename: {file_path}")
+                logger.info("Fallback extraction: found code block, using filename: %s", file_path)
             else:
                 summary = f"Feature implementation completed but no code patches were extracted. Review the output manually."
-                logger.warning(f"CrewAI completed but extracted 0 patches. Result text length: {len(result_text)}")
+                logger.warning("CrewAI completed but extracted 0 patches. Result text length: %d", len(result_text))
         else:
             summary = f"Feature implementation completed but no code patches were extracted. Review the output manually."
-            logger.warning(f"CrewAI completed but extracted 0 patches. Result text length: {len(result_text)}")
+            logger.warning("CrewAI completed but extracted 0 patches. Result text length: %d", len(result_text))
 
     return {
         "patch_plans": patch_plans,
@@ -514,6 +1725,189 @@ def _parse_crew_output(crew_result: Any, request: str) -> Dict[str, Any]:
     }
 
 
+def _next_file_block(text: str, pos: int = 0) -> Optional[Tuple[str, str, int]]:
+    """
+    Find the next complete "### FILE: path" header + fenced code block.
+
+    Uses str.find only, so scanning is linear even for very long Coder
+    outputs with unterminated or unusual fences. Safe to call on a
+    partially streamed buffer: an incomplete block returns None and is
+    found by a later call once more text has arrived.
+
+    Args:
+        text: Raw crew output text (possibly incomplete).
+        pos: Offset to start scanning from.
+
+    Returns:
+        (file_path, code, end_offset) for the next complete block, or None.
+    """
+    while (header_start := text.find(_FILE_HEADER, pos)) != -1:
+        line_end = text.find("\n", header_start)
+        if line_end == -1:
+            return None
+
+        file_path = text[header_start + len(_FILE_HEADER):line_end].strip()
+        fence_start = text.find(_FENCE, line_end)
+        if fence_start == -1:
+            return None
+
+        # The fence must directly follow the header (blank lines allowed)
+        if not file_path or text[line_end:fence_start].strip():
+            pos = line_end
+            continue
+
+        body_start = text.find("\n", fence_start) + 1
+        if body_start == 0:
+            return None
+        fence_end = text.find(_FENCE, body_start)
+        if fence_end == -1:
+            return None
+
+        return file_path, text[body_start:fence_end], fence_end + len(_FENCE)
+
+    return None
+
+
+def _scan_file_blocks(text: str, max_blocks: Optional[int] = None) -> List[Tuple[str, str]]:
+    """
+    Find all "### FILE: path" headers and the fenced code block under each.
+
+    Args:
+        text: Raw crew output text.
+        max_blocks: Stop scanning after this many blocks (None for no cap).
+
+    Returns:
+        List of (file_path, code) tuples in order of appearance.
+    """
+    blocks = []
+    pos = 0
+    while (block := _next_file_block(text, pos)) is not None:
+        if max_blocks is not None and len(blocks) >= max_blocks:
+            logger.warning("Truncating ### FILE: blocks at %d", max_blocks)
+            break
+        file_path, code, pos = block
+        blocks.append((file_path, code))
+    return blocks
+
+
+def _diff_header_path(value: str, prefix: str) -> Optional[str]:
+    """
+    Get the file path from a diff ---/+++ header value.
+
+    Args:
+        value: Header text after "--- " or "+++ ".
+        prefix: Git side prefix to strip ("a/" or "b/").
+
+    Returns:
+        File path, or None for /dev/null or an empty header.
+    """
+    path = value.split("\t", 1)[0].strip()
+    if not path or path == "/dev/null":
+        return None
+    return path[len(prefix):] if path.startswith(prefix) else path
+
+
+def _scan_fenced_blocks(
+    text: str,
+    max_blocks: int = MAX_PATCHES
+) -> Tuple[List[Tuple[Optional[str], str, str]], List[Tuple[str, str, str, int]]]:
+    """
+    Collect ```diff and ```<lang> fenced blocks in one line-oriented pass.
+
+    A small state machine walks the lines once: a line starting with ```
+    opens or closes a block. Inside a diff, the ---/+++ headers and
+    new/deleted file mode lines (before the first @@ hunk) give the path
+    and action. Other lines are rejected with one startswith(tuple) call,
+    and no block is rescanned.
+
+    Each list is capped at max_blocks: extra code blocks are dropped, and
+    the scan stops once max_blocks diffs were collected (diffs take
+    precedence over code blocks, so nothing later can matter).
+
+    Args:
+        text: Raw crew output text.
+        max_blocks: Cap per block kind.
+
+    Returns:
+        (diff_blocks, code_blocks) where diff_blocks are
+        (file_path or None, action, diff_text) and code_blocks are
+        (lang, file_hint, code, block_start_offset).
+    """
+    diff_blocks = []
+    code_blocks = []
+
+    kind = None  # None, "diff" or "code"
+    lines: List[str] = []
+    offset = 0
+    block_start = 0
+    lang = ""
+    file_path: Optional[str] = None
+    action = "modify"
+    in_hunk = False
+
+    for line in text.splitlines(keepends=True):
+        if kind is None:
+            if line.startswith(_FENCE):
+                info = line[len(_FENCE):].strip()
+                if info == "diff":
+                    kind, lines, file_path, action, in_hunk = "diff", [], None, "modify", False
+                elif info and info.replace("_", "").isalnum():
+                    kind, lines, lang, block_start = "code", [], info, offset
+        elif line.startswith(_FENCE):
+            if kind == "diff":
+                diff_blocks.append((file_path, action, "".join(lines)))
+                if len(diff_blocks) >= max_blocks:
+                    logger.warning("Truncating diff blocks at %d", max_blocks)
+                    break
+            elif len(code_blocks) < max_blocks:
+                body = "".join(lines)
+                hint = ""
+                if lines:
+                    hint_match = _CODE_HINT_RE.match(lines[0])
+                    if hint_match:
+                        hint = hint_match.group(1)
+                        body = "".join(lines[1:])
+                code_blocks.append((lang, hint, body, block_start))
+            kind = None
+        else:
+            lines.append(line)
+            if kind == "diff" and not in_hunk and line.startswith(_DIFF_HEADER_PREFIXES):
+                if line.startswith("@@"):
+                    in_hunk = True
+                elif line.startswith("--- "):
+                    source = _diff_header_path(line[4:], "a/")
+                    if source is None:
+                        action = "create"
+                    elif file_path is None:
+                        file_path = source
+                elif line.startswith("+++ "):
+                    target = _diff_header_path(line[4:], "b/")
+                    if target is None:
+                        if action != "create":
+                            action = "delete"
+                    elif file_path is None:
+                        file_path = target
+                elif line.startswith("new file mode"):
+                    action = "create"
+                elif line.startswith("deleted file mode") and action != "create":
+                    action = "delete"
+        offset += len(line)
+
+    return diff_blocks, code_blocks
+
+
+def _file_patch(file_path: str, code: str) -> Dict[str, Any]:
+    """Build a full-content create patch for a ### FILE: block."""
+    file_path = file_path.strip()
+    return {
+        "file_path": file_path,
+        "content": code.strip(),
+        "diff": None,
+        "rationale": f"Create {file_path} with generated code",
+        "action": "create"
+    }
+
+
 def _extract_patches_from_text(text: str, original_request: str = "") -> List[Dict[str, Any]]:
     """
     Extract unified diff patches OR code blocks from crew output text.
@@ -524,6 +1918,10 @@ def _extract_patches_from_text(text: str, original_request: str = "") -> List[Di
     2. Code blocks with file path hints (```python # filename.py)
     3. Code blocks after file path mentions
 
+    ### FILE: blocks are found with a plain str.find scan; the remaining
+    block kinds are collected in a single line-oriented pass, only when no
+    FILE headers are present.
+
     Args:
         text: Raw crew output text.
         original_request: Original user request (to extract filename hints).
@@ -531,56 +1929,30 @@ def _extract_patches_from_text(text: str, original_request: str = "") -> List[Di
     Returns:
         List of PatchPlan-compatible dicts.
     """
-    import re
-
     patches = []
 
     # =================================================================
     # Strategy 0 (NEW): Look for ### FILE: headers with code blocks
     # This is the preferred format from the updated Coder instructions
     # =================================================================
-    file_header_pattern = r"###\s*FILE:\s*([\w\./_-]+)\s*\n```\w*\s*\n(.*?)```"
-    file_blocks = re.findall(file_header_pattern, text, re.DOTALL | re.IGNORECASE)
-
-    for file_path, code in file_blocks:
+    for file_path, code in _scan_file_blocks(text, max_blocks=MAX_PATCHES):
         if code.strip():
-            patches.append({
-                "file_path": file_path.strip(),
-                "content": code.strip(),
-                "diff": None,
-                "rationale": f"Create {file_path.strip()} with generated code",
-                "action": "create"
-            })
+            patches.append(_file_patch(file_path, code))
 
     if patches:
-        logger.info(f"[FIX] Extracted {len(patches)} patches from ### FILE: headers")
+        logger.info("[FIX] Extracted %d patches from ### FILE: headers", len(patches))
         return patches
 
+    diff_blocks, code_blocks = _scan_fenced_blocks(text)
+
     # =================================================================
     # Strategy 1: Find proper diff blocks (```diff ... ```)
     # =================================================================
-    diff_pattern = r"```diff\s*\n(.*?)```"
-    diff_blocks = re.findall(diff_pattern, text, re.DOTALL)
-
-    for diff in diff_blocks:
-        # Extract file path from --- a/path/to/file
-        file_match = re.search(r"---\s+a/([\w\./_-]+)", diff)
-        if not file_match:
-            # Try alternative format: --- path/to/file
-            file_match = re.search(r"---\s+([\w\./_-]+)", diff)
-        if not file_match:
-            logger.warning(f"Could not extract file path from diff: {diff[:50]}...")
+    for file_path, action, diff in diff_blocks:
+        if not file_path:
+            logger.warning("Could not extract file path from diff: %.50s...", diff)
             continue
 
-        file_path = file_match.group(1)
-
-        # Determine action (heuristic)
-        action = "modify"
-        if "new file mode" in diff or "--- /dev/null" in diff:
-            action = "create"
-        elif "+++ /dev/null" in diff:
-            action = "delete"
-
         patches.append({
             "file_path": file_path,
             "diff": diff,
@@ -590,15 +1962,12 @@ def _extract_patches_from_text(text: str, original_request: str = "") -> List[Di
 
     # If we found proper diffs, return them
     if patches:
-        logger.info(f"Extracted {len(patches)} patches from diff blocks")
+        logger.info("Extracted %d patches from diff blocks", len(patches))
         return patches
 
     # Strategy 2: Look for code blocks with language hints and file path comments
     # Pattern: ```python\n# filename.py or ```python\n# File: filename.py
-    code_pattern = r"```(\w+)\s*\n(?:#\s*(?:File:\s*)?([\w\./_-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))\s*\n)?(.*?)```"
-    code_blocks = re.findall(code_pattern, text, re.DOTALL | re.IGNORECASE)
-
-    for lang, file_hint, code in code_blocks:
+    for lang, file_hint, code, block_start in code_blocks:
         if not code.strip():
             continue
 
@@ -609,55 +1978,45 @@ def _extract_patches_from_text(text: str, original_request: str = "") -> List[Di
         if file_hint:
             file_path = file_hint.strip()
         else:
-            # IMPROVED: Try multiple patterns to extract filename from original request
-            # Patterns ordered from most specific to least specific
-            filename_patterns = [
-                # "called snake.py", "named snake.py"
-                r"(?:called|named)\s+['\"]?([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))['\"]?",
-                # "create snake.py", "make snake.py", "write snake.py"
-                r"(?:create|make|write|build)\s+['\"]?([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))['\"]?",
-                # "in snake.py", "to snake.py", "file snake.py"
-                r"(?:in|to|file)\s+['\"]?([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))['\"]?",
-                # "snake.py" anywhere in the request (last resort)
-                r"['\"]?([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))['\"]?",
-            ]
-
-            for pattern in filename_patterns:
-                filename_match = re.search(pattern, original_request, re.IGNORECASE)
-                if filename_match:
-                    file_path = filename_match.group(1)
-                    break
+            # IMPROVED: Try targeted then bare filename hints in the original request
+            file_path = _find_filename_hint(original_request)
 
             if not file_path:
-                # Look for filename mention near this code block in the text
-                # Search backwards from code block position for filename
-                code_pos = text.find(code[:50]) if len(code) >= 50 else text.find(code)
-                if code_pos > 0:
-                    nearby_text = text[max(0, code_pos-500):code_pos]
-                    nearby_match = re.search(r"['\"]?([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))['\"]?", nearby_text)
-                    if nearby_match:
-                        file_path = nearby_match.group(1)
+                # Look for filename mention in the 500 chars before this
+                # code block (block position recorded during the scan)
+                nearby_match = _BARE_FILENAME_RE.search(
+                    text, max(0, block_start - 500), block_start
+                )
+                if nearby_match:
+                    file_path = nearby_match.group(1)
 
         if not file_path:
             # Default filename based on language
-            ext_map = {"python": "py", "javascript": "js", "typescript": "ts", "java": "java", "go": "go", "rust": "rs"}
-            ext = ext_map.get(lang.lower(), lang.lower())
-            file_path = f"generated_code.{ext}"
-            logger.warning(f"Could not determine filename, using default: {file_path}")
+            lang = lang.lower()
+            file_path = f"generated_code.{_LANG_EXTENSIONS.get(lang, lang)}"
+            logger.warning("Could not determine filename, using default: %s", file_path)
 
         # Create a "full file content" patch (for new file creation)
-        patches.append({
-            "file_path": file_path,
-            "content": code.strip(),  # Full content for direct write
-            "diff": None,  # No diff, use direct write
-            "rationale": f"Create {file_path} with generated code",
-            "action": "create"
-        })
+        patches.append(_file_patch(file_path, code))
 
-    logger.info(f"Extracted {len(patches)} patches from code blocks (fallback)")
+    logger.info("Extracted %d patches from code blocks (fallback)", len(patches))
     return patches
 
 
+def _find_filename_hint(text: str) -> Optional[str]:
+    """
+    Find a filename in free text: targeted phrasing first, then any filename.
+
+    Args:
+        text: Request or response text.
+
+    Returns:
+        Filename, or None if the text names no file.
+    """
+    match = _TARGETED_FILENAME_RE.search(text) or _BARE_FILENAME_RE.search(text)
+    return match.group(1) if match else None
+
+
 def _extract_filename_from_request(request: str) -> str:
     """
     Extract target filename from user request.
@@ -670,31 +2029,10 @@ def _extract_filename_from_request(request: str) -> str:
     Returns:
         Extracted filename or default "generated_code.py"
     """
-    import re
-
-    # PERMANENT FIX: Extended patterns to catch more filename variations
-    # Ordered from most specific to least specific
-    patterns = [
-        # "called snake_6.py", "named game.py"
-        r"(?:called|named)\s+['\"]?([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))['\"]?",
-        # "create snake.py", "make game.py", "write app.py", "build main.py"
-        r"(?:create|make|write|build|generate)\s+(?:a\s+)?(?:\w+\s+)*?['\"]?([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))['\"]?",
-        # "script called snake.py"
-        r"script\s+(?:called|named)\s+['\"]?([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))['\"]?",
-        # "file snake.py", "in snake.py", "to snake.py"
-        r"(?:file|in|to)\s+['\"]?([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))['\"]?",
-        # Any filename with extension at the end of request
-        r"([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))\s*$",
-        # Any filename with extension anywhere (last resort)
-        r"['\"]?([\w\._-]+\.(?:py|js|ts|tsx|jsx|st|scl|java|go|rs|rb|c|cpp|h))['\"]?",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, request, re.IGNORECASE)
-        if match:
-            filename = match.group(1)
-            logger.info(f"[FIX] Extracted filename '{filename}' from request using pattern")
-            return filename
+    filename = _find_filename_hint(request)
+    if filename:
+        logger.info("[FIX] Extracted filename '%s' from request using pattern", filename)
+        return filename
 
     # Default based on common keywords in request
     if any(kw in request.lower() for kw in ['python', 'py', 'snake', 'game']):
@@ -708,7 +2046,7 @@ def _extract_filename_from_request(request: str) -> str:
     else:
         default = "generated_code.py"
 
-    logger.warning(f"[FIX] Could not extract filename from request, using default: {default}")
+    logger.warning("[FIX] Could not extract filename from request, using default: %s", default)
     return default
 
 
@@ -722,16 +2060,18 @@ def _extract_verification_steps(text: str) -> List[str]:
     Returns:
         List of verification step strings.
     """
-    import re
-
     # Look for numbered lists after "Verification:" or "Test:"
-    verification_pattern = r"(?:Verification|Test|Testing):?\s*\n((?:\d+\.\s+.+\n?)+)"
-    match = re.search(verification_pattern, text, re.IGNORECASE)
+    match = _VERIFICATION_RE.search(text)
 
     if match:
-        steps_text = match.group(1)
-        steps = re.findall(r"\d+\.\s+(.+)", steps_text)
-        return [step.strip() for step in steps if step.strip()]
+        steps = []
+        for step_match in _NUMBERED_STEP_RE.finditer(match.group(1)):
+            step = step_match.group(1).strip()
+            if step:
+                steps.append(step)
+                if len(steps) >= MAX_VERIFICATION_STEPS:
+                    break
+        return steps
 
     # Fallback: generic verification steps
     return [
@@ -741,4 +2081,4 @@ def _extract_verification_steps(text: str) -> List[str]:
     ]
 
 
-__all__ = ["implement_feature"]
+__all__ = ["implement_feature", "implement_feature_streaming", "implement_feature_sync"]
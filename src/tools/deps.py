@@ -25,24 +25,69 @@ Output Format:
 }
 """
 
+import copy
+import functools
+import os
 import sys
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, FrozenSet, Optional, Tuple, Union
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Top-level entry names and directory names of a project root
+RootSnapshot = Tuple[FrozenSet[str], FrozenSet[str]]
+
+# Candidate virtual environment directories
+_VENV_DIR_NAMES = (".venv", "venv", "env")
+
+
+# ============================================================================
+# ROOT SCAN
+# ============================================================================
+
+def _scan_root(project_root: Union[str, Path]) -> RootSnapshot:
+    """
+    List the project root once for marker-file detection.
+
+    A single os.scandir pass replaces one stat() per marker file;
+    DirEntry.is_dir() uses the file type returned by the directory listing
+    on most platforms, so it does not stat either.
+
+    Args:
+        project_root: Project root directory
+
+    Returns:
+        (names, dirs): all top-level entry names, and those that are
+        directories. Both are empty if the root cannot be listed.
+    """
+    names = set()
+    dirs = set()
+    try:
+        with os.scandir(project_root) as entries:
+            for entry in entries:
+                names.add(entry.name)
+                try:
+                    if entry.is_dir():
+                        dirs.add(entry.name)
+                except OSError:
+                    pass
+    except OSError as e:
+        logger.warning(f"Could not list project root {project_root}: {e}")
+    return frozenset(names), frozenset(dirs)
+
 
 # ============================================================================
 # PYTHON DETECTION
 # ============================================================================
 
-def detect_python_tooling(project_root: Path) -> Dict[str, Any]:
+def detect_python_tooling(project_root: Path, snapshot: Optional[RootSnapshot] = None) -> Dict[str, Any]:
     """
     Detect Python project tooling and venv status.
 
     Args:
         project_root: Project root directory
+        snapshot: Pre-scanned root listing from _scan_root (scanned if None)
 
     Returns:
         Dict with keys:
@@ -67,20 +112,17 @@ def detect_python_tooling(project_root: Path) -> Dict[str, Any]:
         "proposals": [],
     }
 
+    names, dirs = snapshot if snapshot is not None else _scan_root(project_root)
+
     # Check for venv directory
-    venv_paths = [
-        project_root / ".venv",
-        project_root / "venv",
-        project_root / "env",
-    ]
-    result["has_venv"] = any(p.exists() and p.is_dir() for p in venv_paths)
+    result["has_venv"] = any(name in dirs for name in _VENV_DIR_NAMES)
 
     # Check if venv is active (compare sys.prefix and sys.base_prefix)
     result["venv_active"] = sys.prefix != sys.base_prefix
 
     # Check for Python dependency files
-    result["has_requirements_txt"] = (project_root / "requirements.txt").exists()
-    result["has_pyproject_toml"] = (project_root / "pyproject.toml").exists()
+    result["has_requirements_txt"] = "requirements.txt" in names
+    result["has_pyproject_toml"] = "pyproject.toml" in names
 
     # ========================================================================
     # FAIL FAST: Python deps without active venv
@@ -121,12 +163,13 @@ def detect_python_tooling(project_root: Path) -> Dict[str, Any]:
 # NODE DETECTION
 # ============================================================================
 
-def detect_node_tooling(project_root: Path) -> Dict[str, Any]:
+def detect_node_tooling(project_root: Path, snapshot: Optional[RootSnapshot] = None) -> Dict[str, Any]:
     """
     Detect Node.js project tooling.
 
     Args:
         project_root: Project root directory
+        snapshot: Pre-scanned root listing from _scan_root (scanned if None)
 
     Returns:
         Dict with keys:
@@ -146,10 +189,12 @@ def detect_node_tooling(project_root: Path) -> Dict[str, Any]:
         "proposals": [],
     }
 
+    names, _ = snapshot if snapshot is not None else _scan_root(project_root)
+
     # Check for Node.js files
-    result["has_package_json"] = (project_root / "package.json").exists()
-    result["has_package_lock"] = (project_root / "package-lock.json").exists()
-    result["has_yarn_lock"] = (project_root / "yarn.lock").exists()
+    result["has_package_json"] = "package.json" in names
+    result["has_package_lock"] = "package-lock.json" in names
+    result["has_yarn_lock"] = "yarn.lock" in names
 
     # ========================================================================
     # PROPOSE INSTALL COMMANDS
@@ -178,12 +223,13 @@ def detect_node_tooling(project_root: Path) -> Dict[str, Any]:
 # JAVA DETECTION
 # ============================================================================
 
-def detect_java_tooling(project_root: Path) -> Dict[str, Any]:
+def detect_java_tooling(project_root: Path, snapshot: Optional[RootSnapshot] = None) -> Dict[str, Any]:
     """
     Detect Java project tooling.
 
     Args:
         project_root: Project root directory
+        snapshot: Pre-scanned root listing from _scan_root (scanned if None)
 
     Returns:
         Dict with keys:
@@ -204,12 +250,11 @@ def detect_java_tooling(project_root: Path) -> Dict[str, Any]:
         "proposals": [],
     }
 
+    names, _ = snapshot if snapshot is not None else _scan_root(project_root)
+
     # Check for Java build files
-    result["has_maven"] = (project_root / "pom.xml").exists()
-    result["has_gradle"] = (
-        (project_root / "build.gradle").exists()
-        or (project_root / "build.gradle.kts").exists()
-    )
+    result["has_maven"] = "pom.xml" in names
+    result["has_gradle"] = "build.gradle" in names or "build.gradle.kts" in names
 
     # ========================================================================
     # FUTURE: Propose build commands (Phase 6+)
@@ -229,6 +274,12 @@ def dependency_manager(project_root: Path) -> Dict[str, Any]:
     """
     Detect all project tooling and propose safe install commands.
 
+    Results are memoized per project root and the root directory's
+    mtime. Detection only looks at top-level entries, and adding,
+    removing or renaming one updates that mtime, so an unchanged root
+    skips all filesystem work. Call dependency_manager.cache_clear() to
+    drop cached results.
+
     Args:
         project_root: Project root directory
 
@@ -256,16 +307,43 @@ def dependency_manager(project_root: Path) -> Dict[str, Any]:
         >>> result["proposals"]
         [{'tool': 'run_terminal_cmd', 'command': 'pip install -r requirements.txt', ...}]
     """
-    project_root = Path(project_root).resolve()
-    logger.info(f"Running dependency detection for: {project_root}")
+    # Resolve as a string: the cache key and scandir both take str
+    root_str = os.path.realpath(project_root)
+
+    try:
+        root_mtime_ns = os.stat(root_str).st_mtime_ns
+    except OSError:
+        root_mtime_ns = -1
+
+    # Deep copy so callers cannot mutate the cached result
+    return copy.deepcopy(_detect_uncached(root_str, root_mtime_ns))
+
+
+@functools.lru_cache(maxsize=128)
+def _detect_uncached(project_root_str: str, root_mtime_ns: int) -> Dict[str, Any]:
+    """
+    Run detection for a project root (memoized by dependency_manager).
+
+    Args:
+        project_root_str: Resolved project root path
+        root_mtime_ns: Root directory mtime, part of the cache key only
+
+    Returns:
+        dependency_manager result dict.
+    """
+    project_root = Path(project_root_str)
+    logger.info(f"Running dependency detection for: {project_root_str}")
 
     # ========================================================================
     # DETECT ALL TOOLING
     # ========================================================================
 
-    python_result = detect_python_tooling(project_root)
-    node_result = detect_node_tooling(project_root)
-    java_result = detect_java_tooling(project_root)
+    # One directory listing shared by all detectors (no per-marker path joins)
+    snapshot = _scan_root(project_root_str)
+
+    python_result = detect_python_tooling(project_root, snapshot)
+    node_result = detect_node_tooling(project_root, snapshot)
+    java_result = detect_java_tooling(project_root, snapshot)
 
     # ========================================================================
     # AGGREGATE RESULTS
@@ -311,6 +389,10 @@ def dependency_manager(project_root: Path) -> Dict[str, Any]:
     return result
 
 
+# Invalidation hook (tests, or after external changes to marker files)
+dependency_manager.cache_clear = _detect_uncached.cache_clear
+
+
 __all__ = [
     "dependency_manager",
     "detect_python_tooling",
@@ -10,8 +10,12 @@ Safety: Project-root validation, denylist enforcement, RAG integration
 """
 
 from pathlib import Path
-from typing import Dict, Any, Literal, Optional
+from typing import Dict, Any, List, Literal, Optional, Tuple
+import functools
+import heapq
 import logging
+import os
+import stat
 
 from src.core.file_manager import FileManager
 from src.core.guardrails import (
@@ -23,6 +27,344 @@ from src.core.guardrails import (
 
 logger = logging.getLogger(__name__)
 
+# Maximum entries rendered by the list operation
+LIST_MAX_ITEMS = 100
+
+
+# ============================================================================
+# FILE MANAGER CACHE
+# ============================================================================
+
+@functools.lru_cache(maxsize=8)
+def _get_file_manager(root_str: str) -> FileManager:
+    """
+    Get a FileManager for a project root, reused across calls.
+
+    FileManager only holds its resolved base path and has no other state,
+    so one instance can be shared safely between calls and threads.
+
+    Args:
+        root_str: Project root directory.
+
+    Returns:
+        FileManager for the root.
+    """
+    return FileManager(root_str)
+
+
+@functools.lru_cache(maxsize=512)
+def _is_binary_cached(path_str: str, mtime_ns: int, size: int) -> bool:
+    """
+    Memoized is_file_binary keyed by path and file signature.
+
+    A changed mtime or size produces a new key, so edited files are
+    re-sniffed without explicit invalidation.
+
+    Args:
+        path_str: Resolved file path.
+        mtime_ns: File mtime, part of the cache key only.
+        size: File size, part of the cache key only.
+
+    Returns:
+        True if the file appears to be binary.
+    """
+    return is_file_binary(Path(path_str))
+
+
+def clear_file_manager_cache() -> None:
+    """Drop cached FileManager instances and binary-sniff results."""
+    _get_file_manager.cache_clear()
+    _is_binary_cached.cache_clear()
+
+
+def _stat_or_none(path: Path) -> Optional[os.stat_result]:
+    """
+    Stat a path once for both existence and type checks.
+
+    Args:
+        path: Path to stat (symlinks followed).
+
+    Returns:
+        stat result, or None if the path does not exist.
+    """
+    try:
+        return path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _content_unchanged(path: Path, content: str) -> bool:
+    """
+    Check whether writing content would leave the file byte-identical.
+
+    Compares against what FileManager.write_file would produce (UTF-8,
+    newlines translated to os.linesep). A size check rejects most changed
+    files without reading them.
+
+    Args:
+        path: Target file path.
+        content: Content about to be written.
+
+    Returns:
+        True if the file exists and already holds exactly this content.
+    """
+    expected = content if os.linesep == "\n" else content.replace("\n", os.linesep)
+
+    path_stat = _stat_or_none(path)
+    # UTF-8 needs at least one byte per character
+    if path_stat is None or not stat.S_ISREG(path_stat.st_mode) or path_stat.st_size < len(expected):
+        return False
+
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return f.read() == expected
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+def _scan_dir(path: Path, limit: int = LIST_MAX_ITEMS) -> Tuple[int, List[Tuple[str, bool]]]:
+    """
+    List a directory in one os.scandir pass.
+
+    Entry types come from the directory listing itself (only symlinks are
+    stat'ed, so a symlinked directory is still listed as a directory),
+    and only the first ``limit`` names in sorted order are kept.
+
+    Args:
+        path: Directory to list.
+        limit: Maximum number of entries to return.
+
+    Returns:
+        (total, entries): total entry count, and up to ``limit``
+        (name, is_dir) tuples sorted by name.
+    """
+    total = 0
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            total += 1
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            entries.append((entry.name, is_dir))
+    return total, heapq.nsmallest(limit, entries)
+
+
+# ============================================================================
+# OPERATION HANDLERS
+# ============================================================================
+
+def _op_read(
+    operation: str,
+    resolved_path: Path,
+    rel_path_str: str,
+    file_manager: FileManager,
+    content: Optional[str],
+    rag_manager: Optional[Any],
+) -> Dict[str, Any]:
+    """Read a text file (binary files are rejected)."""
+    # One stat for existence and type
+    path_stat = _stat_or_none(resolved_path)
+    if path_stat is None:
+        return {
+            "operation": operation,
+            "path": rel_path_str,
+            "status": "error",
+            "summary": f"File not found: {resolved_path.name}",
+            "error": "FileNotFoundError",
+        }
+
+    if not stat.S_ISREG(path_stat.st_mode):
+        return {
+            "operation": operation,
+            "path": rel_path_str,
+            "status": "error",
+            "summary": f"Path is not a file: {resolved_path.name}",
+            "error": "NotAFileError",
+        }
+
+    # Check if binary
+    if _is_binary_cached(str(resolved_path), path_stat.st_mtime_ns, path_stat.st_size):
+        return {
+            "operation": operation,
+            "path": rel_path_str,
+            "status": "error",
+            "summary": f"Binary file cannot be read as text: {resolved_path.name}",
+            "error": "BinaryFileError",
+        }
+
+    # Read content
+    file_content = file_manager.read_file(rel_path_str)
+
+    # Truncate if too large
+    truncated_content = truncate_output(file_content, max_chars=GENERAL_OUTPUT_MAX_CHARS)
+
+    return {
+        "operation": operation,
+        "path": rel_path_str,
+        "status": "success",
+        "summary": f"Read {len(file_content)} characters from {resolved_path.name}",
+        "content": truncated_content,
+    }
+
+
+def _op_write(
+    operation: str,
+    resolved_path: Path,
+    rel_path_str: str,
+    file_manager: FileManager,
+    content: Optional[str],
+    rag_manager: Optional[Any],
+) -> Dict[str, Any]:
+    """Write content to a file atomically and refresh RAG."""
+    if content is None:
+        return {
+            "operation": operation,
+            "path": rel_path_str,
+            "status": "error",
+            "summary": "Write operation requires 'content' parameter",
+            "error": "MissingContentError",
+        }
+
+    # No-op write: skip the disk write and the RAG re-index
+    if _content_unchanged(resolved_path, content):
+        return {
+            "operation": operation,
+            "path": rel_path_str,
+            "status": "success",
+            "summary": f"No changes to {resolved_path.name} (content identical)",
+        }
+
+    # Write content atomically
+    file_manager.write_file(rel_path_str, content)
+
+    # Trigger RAG update
+    if rag_manager:
+        try:
+            rag_manager.update_file(resolved_path)
+            logger.info(f"RAG updated for: {resolved_path}")
+        except Exception as e:
+            logger.warning(f"RAG update failed for {resolved_path}: {e}")
+
+    return {
+        "operation": operation,
+        "path": rel_path_str,
+        "status": "success",
+        "summary": f"Wrote {len(content)} characters to {resolved_path.name}",
+    }
+
+
+def _op_delete(
+    operation: str,
+    resolved_path: Path,
+    rel_path_str: str,
+    file_manager: FileManager,
+    content: Optional[str],
+    rag_manager: Optional[Any],
+) -> Dict[str, Any]:
+    """Delete a file and remove it from RAG."""
+    # One stat for existence and type
+    path_stat = _stat_or_none(resolved_path)
+    if path_stat is None:
+        return {
+            "operation": operation,
+            "path": rel_path_str,
+            "status": "error",
+            "summary": f"File not found: {resolved_path.name}",
+            "error": "FileNotFoundError",
+        }
+
+    if not stat.S_ISREG(path_stat.st_mode):
+        return {
+            "operation": operation,
+            "path": rel_path_str,
+            "status": "error",
+            "summary": f"Path is not a file: {resolved_path.name}",
+            "error": "NotAFileError",
+        }
+
+    # Delete file
+    resolved_path.unlink()
+
+    # Trigger RAG removal
+    if rag_manager:
+        try:
+            rag_manager.remove_file(resolved_path)
+            logger.info(f"RAG entry removed for: {resolved_path}")
+        except Exception as e:
+            logger.warning(f"RAG removal failed for {resolved_path}: {e}")
+
+    return {
+        "operation": operation,
+        "path": rel_path_str,
+        "status": "success",
+        "summary": f"Deleted {resolved_path.name}",
+    }
+
+
+def _op_list(
+    operation: str,
+    resolved_path: Path,
+    rel_path_str: str,
+    file_manager: FileManager,
+    content: Optional[str],
+    rag_manager: Optional[Any],
+) -> Dict[str, Any]:
+    """List a directory as a bounded tree view."""
+    # One stat for existence and type
+    path_stat = _stat_or_none(resolved_path)
+    if path_stat is None:
+        return {
+            "operation": operation,
+            "path": rel_path_str,
+            "status": "error",
+            "summary": f"Directory not found: {resolved_path.name}",
+            "error": "DirectoryNotFoundError",
+        }
+
+    if not stat.S_ISDIR(path_stat.st_mode):
+        return {
+            "operation": operation,
+            "path": rel_path_str,
+            "status": "error",
+            "summary": f"Path is not a directory: {resolved_path.name}",
+            "error": "NotADirectoryError",
+        }
+
+    # List directory contents (types from the listing, no re-stat)
+    total, entries = _scan_dir(resolved_path)
+
+    # Build tree view (simple bounded format)
+    tree_lines = []
+    for item, is_dir in entries:
+        if is_dir:
+            tree_lines.append(f"📁 {item}/")
+        else:
+            tree_lines.append(f"📄 {item}")
+
+    tree_view = "\n".join(tree_lines)
+
+    if total > LIST_MAX_ITEMS:
+        tree_view += f"\n... ({total - LIST_MAX_ITEMS} more items)"
+
+    return {
+        "operation": operation,
+        "path": rel_path_str,
+        "status": "success",
+        "summary": f"Listed {total} items in {resolved_path.name}",
+        "content": tree_view,
+    }
+
+
+# Handlers by normalized operation name (all share one signature)
+_OPS = {
+    "read": _op_read,
+    "write": _op_write,
+    "delete": _op_delete,
+    "list": _op_list,
+}
+
 
 # ============================================================================
 # TIER 1 TOOL: manage_file_ops
@@ -87,180 +429,18 @@ def manage_file_ops(
         # VALIDATION: Project-root boundary + denylist
         # ====================================================================
 
-        path_obj = Path(path)
-        validate_file_operation(operation_normalized, path_obj, project_root)
-
-        # Resolve to absolute path
-        if not path_obj.is_absolute():
-            resolved_path = project_root / path_obj
-        else:
-            resolved_path = path_obj
-
-        resolved_path = resolved_path.resolve()
+        # Validation resolves the path (symlinks included); reuse its result
+        resolved_path = validate_file_operation(operation_normalized, Path(path), project_root)
+        rel_path_str = str(resolved_path.relative_to(project_root))
 
         # ====================================================================
         # OPERATION EXECUTION
         # ====================================================================
 
-        file_manager = FileManager(str(project_root))
-
-        # READ operation
-        if operation_normalized == "read":
-            if not resolved_path.exists():
-                return {
-                    "operation": operation,
-                    "path": str(resolved_path.relative_to(project_root)),
-                    "status": "error",
-                    "summary": f"File not found: {resolved_path.name}",
-                    "error": "FileNotFoundError",
-                }
-
-            if not resolved_path.is_file():
-                return {
-                    "operation": operation,
-                    "path": str(resolved_path.relative_to(project_root)),
-                    "status": "error",
-                    "summary": f"Path is not a file: {resolved_path.name}",
-                    "error": "NotAFileError",
-                }
-
-            # Check if binary
-            if is_file_binary(resolved_path):
-                return {
-                    "operation": operation,
-                    "path": str(resolved_path.relative_to(project_root)),
-                    "status": "error",
-                    "summary": f"Binary file cannot be read as text: {resolved_path.name}",
-                    "error": "BinaryFileError",
-                }
-
-            # Read content
-            file_content = file_manager.read_file(str(resolved_path.relative_to(project_root)))
-
-            # Truncate if too large
-            truncated_content = truncate_output(file_content, max_chars=GENERAL_OUTPUT_MAX_CHARS)
+        file_manager = _get_file_manager(str(project_root))
 
-            return {
-                "operation": operation,
-                "path": str(resolved_path.relative_to(project_root)),
-                "status": "success",
-                "summary": f"Read {len(file_content)} characters from {resolved_path.name}",
-                "content": truncated_content,
-            }
-
-        # WRITE operation (create/update/write)
-        elif operation_normalized == "write":
-            if content is None:
-                return {
-                    "operation": operation,
-                    "path": str(resolved_path.relative_to(project_root)),
-                    "status": "error",
-                    "summary": "Write operation requires 'content' parameter",
-                    "error": "MissingContentError",
-                }
-
-            # Write content atomically
-            file_manager.write_file(str(resolved_path.relative_to(project_root)), content)
-
-            # Trigger RAG update
-            if rag_manager:
-                try:
-                    rag_manager.update_file(resolved_path)
-                    logger.info(f"RAG updated for: {resolved_path}")
-                except Exception as e:
-                    logger.warning(f"RAG update failed for {resolved_path}: {e}")
-
-            return {
-                "operation": operation,
-                "path": str(resolved_path.relative_to(project_root)),
-                "status": "success",
-                "summary": f"Wrote {len(content)} characters to {resolved_path.name}",
-            }
-
-        # DELETE operation
-        elif operation_normalized == "delete":
-            if not resolved_path.exists():
-                return {
-                    "operation": operation,
-                    "path": str(resolved_path.relative_to(project_root)),
-                    "status": "error",
-                    "summary": f"File not found: {resolved_path.name}",
-                    "error": "FileNotFoundError",
-                }
-
-            if not resolved_path.is_file():
-                return {
-                    "operation": operation,
-                    "path": str(resolved_path.relative_to(project_root)),
-                    "status": "error",
-                    "summary": f"Path is not a file: {resolved_path.name}",
-                    "error": "NotAFileError",
-                }
-
-            # Delete file
-            resolved_path.unlink()
-
-            # Trigger RAG removal
-            if rag_manager:
-                try:
-                    rag_manager.remove_file(resolved_path)
-                    logger.info(f"RAG entry removed for: {resolved_path}")
-                except Exception as e:
-                    logger.warning(f"RAG removal failed for {resolved_path}: {e}")
-
-            return {
-                "operation": operation,
-                "path": str(resolved_path.relative_to(project_root)),
-                "status": "success",
-                "summary": f"Deleted {resolved_path.name}",
-            }
-
-        # LIST operation
-        elif operation_normalized == "list":
-            if not resolved_path.exists():
-                return {
-                    "operation": operation,
-                    "path": str(resolved_path.relative_to(project_root)),
-                    "status": "error",
-                    "summary": f"Directory not found: {resolved_path.name}",
-                    "error": "DirectoryNotFoundError",
-                }
-
-            if not resolved_path.is_dir():
-                return {
-                    "operation": operation,
-                    "path": str(resolved_path.relative_to(project_root)),
-                    "status": "error",
-                    "summary": f"Path is not a directory: {resolved_path.name}",
-                    "error": "NotADirectoryError",
-                }
-
-            # List directory contents
-            items = file_manager.list_files(str(resolved_path.relative_to(project_root)))
-
-            # Build tree view (simple bounded format)
-            tree_lines = []
-            for item in sorted(items)[:100]:  # Limit to 100 items
-                item_path = resolved_path / item
-                if item_path.is_dir():
-                    tree_lines.append(f"📁 {item}/")
-                else:
-                    tree_lines.append(f"📄 {item}")
-
-            tree_view = "\n".join(tree_lines)
-
-            if len(items) > 100:
-                tree_view += f"\n... ({len(items) - 100} more items)"
-
-            return {
-                "operation": operation,
-                "path": str(resolved_path.relative_to(project_root)),
-                "status": "success",
-                "summary": f"Listed {len(items)} items in {resolved_path.name}",
-                "content": tree_view,
-            }
-
-        else:
+        handler = _OPS.get(operation_normalized)
+        if handler is None:
             return {
                 "operation": operation,
                 "path": str(path),
@@ -269,6 +449,8 @@ def manage_file_ops(
                 "error": "InvalidOperationError",
             }
 
+        return handler(operation, resolved_path, rel_path_str, file_manager, content, rag_manager)
+
     except Exception as e:
         logger.error(f"File operation failed: {operation} {path} - {e}", exc_info=True)
         return {
@@ -280,4 +462,4 @@ def manage_file_ops(
         }
 
 
-__all__ = ["manage_file_ops"]
+__all__ = ["manage_file_ops", "clear_file_manager_cache"]
@@ -23,22 +23,26 @@ Safety:
 
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
+import functools
+import hashlib
 import logging
+import os
 import difflib
 import re
 import tempfile
-import shutil
 
 try:
     from unidiff import PatchSet
+    from unidiff.constants import LINE_TYPE_ADDED, LINE_TYPE_CONTEXT
     UNIDIFF_AVAILABLE = True
 except ImportError:
     UNIDIFF_AVAILABLE = False
     PatchSet = None
+    LINE_TYPE_ADDED = LINE_TYPE_CONTEXT = None
 
 from src.agents.state import PatchPlan
-from src.core.guardrails import validate_path
-from src.core.file_manager import FileManager
+from src.core.guardrails import validate_path, validate_paths
+from src.core.file_manager import WRITE_CHUNK_CHARS
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +51,67 @@ logger = logging.getLogger(__name__)
 # DIFF STATISTICS CALCULATION
 # ============================================================================
 
+# Texts up to this size have their normalized line split memoized
+SPLIT_CACHE_MAX_CHARS = 256_000
+
+# Line boundaries splitlines() recognizes besides \n and \r
+_OTHER_LINE_BREAKS_RE = re.compile('[\v\f\x1c\x1d\x1e\x85\u2028\u2029]')
+
+
+@functools.lru_cache(maxsize=64)
+def _split_normalized_cached(text: str) -> Tuple[str, ...]:
+    """Memoized body of _split_normalized."""
+    return tuple(text.replace('\r\n', '\n').replace('\r', '\n').splitlines())
+
+
+def _split_normalized(text: str) -> Tuple[str, ...]:
+    """
+    Split text into lines after normalizing CRLF/CR line endings.
+
+    Previews and execution compute stats for the same contents more than
+    once (preview, then execute after approval), so splits of texts up to
+    SPLIT_CACHE_MAX_CHARS are memoized.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Tuple of lines without line endings
+    """
+    if len(text) > SPLIT_CACHE_MAX_CHARS:
+        return _split_normalized_cached.__wrapped__(text)
+    return _split_normalized_cached(text)
+
+
+def _is_blank(text: str) -> bool:
+    """True if text is empty or whitespace-only (like `not text.strip()`, without copying)."""
+    return not text or text.isspace()
+
+
+def _count_lines(text: str) -> int:
+    """
+    Count lines as len(_split_normalized(text)) would.
+
+    Text with only \\n, \\r\\n and lone \\r line endings is counted
+    without normalizing or splitting it. Text containing any other
+    boundary splitlines() honours (form feed, \\x85, \\u2028, ...) falls
+    back to the split.
+
+    Args:
+        text: Non-empty text
+
+    Returns:
+        Number of lines
+    """
+    if _OTHER_LINE_BREAKS_RE.search(text):
+        return len(_split_normalized(text))
+
+    count = text.count('\n') + text.count('\r') - text.count('\r\n')
+    if not text.endswith(('\n', '\r')):
+        count += 1
+    return count
+
+
 def calculate_diff_stats(original: str, new_content: str) -> Tuple[int, int]:
     """
     Calculate accurate (+additions, -deletions) between two strings.
@@ -62,23 +127,38 @@ def calculate_diff_stats(original: str, new_content: str) -> Tuple[int, int]:
     Returns:
         Tuple of (additions, deletions)
     """
-    # Normalize line endings to avoid CRLF/LF mismatches
-    original_normalized = original.replace('\r\n', '\n').replace('\r', '\n') if original else ''
-    new_normalized = new_content.replace('\r\n', '\n').replace('\r', '\n') if new_content else ''
-
-    original_lines = original_normalized.splitlines() if original_normalized.strip() else []
-    new_lines = new_normalized.splitlines() if new_normalized.strip() else []
+    original_blank = _is_blank(original)
+    new_blank = _is_blank(new_content)
 
     # PERMANENT FIX: For new files, all lines are additions (use actual count)
-    if not original_lines and new_lines:
-        return (len(new_lines), 0)
+    if original_blank:
+        return (0 if new_blank else _count_lines(new_content), 0)
 
     # PERMANENT FIX: For clearing file, all original lines are deletions
-    if original_lines and not new_lines:
-        return (0, len(original_lines))
+    if new_blank:
+        return (0, _count_lines(original))
+
+    # Normalize line endings to avoid CRLF/LF mismatches
+    original_lines = _split_normalized(original)
+    new_lines = _split_normalized(new_content)
+
+    # Trim the common prefix and suffix so only the changed region is diffed
+    limit = min(len(original_lines), len(new_lines))
+    prefix = 0
+    while prefix < limit and original_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and original_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+    original_lines = original_lines[prefix:len(original_lines) - suffix]
+    new_lines = new_lines[prefix:len(new_lines) - suffix]
+
+    # Pure insertion or deletion (e.g. appending to a file)
+    if not original_lines or not new_lines:
+        return (len(new_lines), len(original_lines))
 
     # For modifications, use SequenceMatcher for accurate line-by-line comparison
-    matcher = difflib.SequenceMatcher(None, original_lines, new_lines)
+    matcher = difflib.SequenceMatcher(None, *_line_ids(original_lines, new_lines))
 
     additions = 0
     deletions = 0
@@ -96,6 +176,38 @@ def calculate_diff_stats(original: str, new_content: str) -> Tuple[int, int]:
     return (additions, deletions)
 
 
+def _line_ids(a: List[str], b: List[str]) -> Tuple[List[int], List[int]]:
+    """
+    Map each distinct line to a small integer id.
+
+    SequenceMatcher hashes and compares its elements repeatedly; lines from
+    two different splits are distinct str objects, so every equal-hash
+    lookup falls back to a full string compare. Diffing int ids instead
+    gives identical opcodes with cheap comparisons.
+
+    Args:
+        a: First sequence of lines
+        b: Second sequence of lines
+
+    Returns:
+        Tuple of (a_ids, b_ids)
+    """
+    ids: Dict[str, int] = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+    return a_ids, b_ids
+
+
+def _hunk_range(start: int, stop: int) -> str:
+    """Format a hunk line range (same as difflib's unified format)."""
+    length = stop - start
+    if length == 1:
+        return f'{start + 1}'
+    if not length:
+        return f'{start},0'
+    return f'{start + 1},{length}'
+
+
 def generate_unified_diff(original: str, new_content: str, file_path: str) -> str:
     """
     Generate a proper unified diff string from original and new content.
@@ -108,15 +220,44 @@ def generate_unified_diff(original: str, new_content: str, file_path: str) -> st
     Returns:
         Unified diff string
     """
+    # Identical contents: difflib would yield nothing
+    if original == new_content:
+        return ''
+
     original_lines = original.splitlines(keepends=True) if original else []
     new_lines = new_content.splitlines(keepends=True) if new_content else []
 
-    diff_lines = difflib.unified_diff(
-        original_lines,
-        new_lines,
-        fromfile=f'a/{file_path}',
-        tofile=f'b/{file_path}',
-    )
+    # New or cleared file: a single hunk, formatted as difflib would
+    if not original_lines or not new_lines:
+        if not original_lines:
+            hunk = f'@@ -0,0 +{_hunk_range(0, len(new_lines))} @@\n'
+            body = ''.join(['+' + line for line in new_lines])
+        else:
+            hunk = f'@@ -{_hunk_range(0, len(original_lines))} +0,0 @@\n'
+            body = ''.join(['-' + line for line in original_lines])
+        return f'--- a/{file_path}\n+++ b/{file_path}\n' + hunk + body
+
+    # Same output as difflib.unified_diff (3 context lines), diffing line ids
+    matcher = difflib.SequenceMatcher(None, *_line_ids(original_lines, new_lines))
+    diff_lines = [f'--- a/{file_path}\n', f'+++ b/{file_path}\n']
+
+    for group in matcher.get_grouped_opcodes(3):
+        first, last = group[0], group[-1]
+        diff_lines.append(
+            f'@@ -{_hunk_range(first[1], last[2])} +{_hunk_range(first[3], last[4])} @@\n'
+        )
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                diff_lines.extend([' ' + line for line in original_lines[i1:i2]])
+                continue
+            if tag in ('replace', 'delete'):
+                diff_lines.extend(['-' + line for line in original_lines[i1:i2]])
+            if tag in ('replace', 'insert'):
+                diff_lines.extend(['+' + line for line in new_lines[j1:j2]])
+
+    # Headers only: no hunks (difflib yields nothing)
+    if len(diff_lines) == 2:
+        return ''
 
     return ''.join(diff_lines)
 
@@ -125,6 +266,14 @@ def generate_unified_diff(original: str, new_content: str, file_path: str) -> st
 # SEARCH/REPLACE BLOCK PARSER (Aider-style)
 # ============================================================================
 
+# Search/replace block: captures filename, search content, replace content
+_SR_BLOCK_RE = re.compile(
+    r'^(\S+)\s*\n<<<<<<< SEARCH\n(.*?)\n=======\n(.*?)\n>>>>>>> REPLACE',
+    re.MULTILINE | re.DOTALL,
+)
+_SR_SEARCH_MARKER = "<<<<<<< SEARCH"
+
+
 def parse_search_replace_blocks(text: str) -> List[Dict[str, Any]]:
     """
     Parse Aider-style search/replace blocks from text.
@@ -143,15 +292,13 @@ def parse_search_replace_blocks(text: str) -> List[Dict[str, Any]]:
     Returns:
         List of dicts with {file_path, search, replace}
     """
-    blocks = []
-
-    # Pattern to match search/replace blocks
-    # Captures: filename, search content, replace content
-    pattern = r'^(\S+)\s*\n<<<<<<< SEARCH\n(.*?)\n=======\n(.*?)\n>>>>>>> REPLACE'
+    # Fast path: no markers, no blocks (skips the regex engine)
+    if _SR_SEARCH_MARKER not in text:
+        return []
 
-    matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL)
+    blocks = []
 
-    for match in matches:
+    for match in _SR_BLOCK_RE.finditer(text):
         blocks.append({
             'file_path': match.group(1).strip(),
             'search': match.group(2),
@@ -181,44 +328,40 @@ def apply_search_replace(
     Returns:
         Tuple of (new_content, success)
     """
-    # Try exact match first
-    if search in content:
+    # Try exact match first (one scan; fuzzy passes are skipped on a hit)
+    index = content.find(search)
+    if index != -1:
         # Replace only first occurrence to avoid unintended changes
-        new_content = content.replace(search, replace, 1)
+        new_content = content[:index] + replace + content[index + len(search):]
         return (new_content, True)
 
     if not fuzzy:
         return (content, False)
 
-    # Fuzzy matching: normalize whitespace and try again
-    def normalize_whitespace(s: str) -> str:
-        """Normalize whitespace while preserving structure."""
-        lines = s.splitlines()
-        return '\n'.join(line.rstrip() for line in lines)
-
-    normalized_search = normalize_whitespace(search)
-    normalized_content = normalize_whitespace(content)
-
-    if normalized_search in normalized_content:
-        # Found with normalized whitespace - need to find original position
-        # Use line-by-line matching
-        search_lines = search.splitlines()
-        content_lines = content.splitlines()
-
-        # Find the starting line
-        for i in range(len(content_lines) - len(search_lines) + 1):
-            match = True
-            for j, search_line in enumerate(search_lines):
-                if content_lines[i + j].rstrip() != search_line.rstrip():
-                    match = False
-                    break
-
-            if match:
+    # Fuzzy matching: normalize trailing whitespace and try again
+    search_lines = search.splitlines()
+    content_lines = content.splitlines()
+    search_stripped = [line.rstrip() for line in search_lines]
+    content_stripped = [line.rstrip() for line in content_lines]
+
+    if '\n'.join(search_stripped) in '\n'.join(content_stripped):
+        # Found with normalized whitespace - need to find original position.
+        # Only lines matching the first search line can start the block.
+        block_len = len(search_stripped)
+        last_start = len(content_stripped) - block_len
+        i = -1
+        while True:
+            try:
+                i = content_stripped.index(search_stripped[0], i + 1, last_start + 1)
+            except ValueError:
+                break
+
+            if content_stripped[i:i + block_len] == search_stripped:
                 # Found match at line i
                 new_lines = (
                     content_lines[:i] +
                     replace.splitlines() +
-                    content_lines[i + len(search_lines):]
+                    content_lines[i + block_len:]
                 )
                 return ('\n'.join(new_lines), True)
 
@@ -227,6 +370,66 @@ def apply_search_replace(
     return (content, False)
 
 
+# ============================================================================
+# FILE READ CACHE
+# ============================================================================
+
+# Files up to this size have their decoded text memoized
+READ_CACHE_MAX_BYTES = 1_000_000
+
+
+@functools.lru_cache(maxsize=32)
+def _read_text_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    """Memoized body of _read_text (mtime and size are cache key only)."""
+    return Path(path_str).read_text(encoding='utf-8')
+
+
+def _read_text(path: Path) -> Optional[str]:
+    """
+    Read a file as UTF-8 text, memoized by (path, mtime, size).
+
+    Preview and execute read the same file several times per approval
+    cycle; an unchanged stat signature reuses the decoded text. Writes
+    change the signature, so no explicit invalidation is needed.
+
+    Args:
+        path: File path
+
+    Returns:
+        File text, or None if the file does not exist
+
+    Raises:
+        OSError, UnicodeDecodeError: If the file exists but cannot be read
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if st.st_size > READ_CACHE_MAX_BYTES:
+        return path.read_text(encoding='utf-8')
+    return _read_text_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
+def _read_original(full_path: Path) -> Tuple[str, str]:
+    """
+    Read a patch target's current content for preview.
+
+    Args:
+        full_path: Target file path
+
+    Returns:
+        Tuple of (original_content, action): ('', "create") if the file does
+        not exist, else its content ('' if unreadable) and "modify"
+    """
+    try:
+        original_content = _read_text(full_path)
+    except Exception:
+        return ('', "modify")
+    if original_content is None:
+        return ('', "create")
+    return (original_content, "modify")
+
+
 # ============================================================================
 # PATCH PREVIEW
 # ============================================================================
@@ -267,13 +470,14 @@ def preview_patch(
     if content is not None and file_path is not None:
         return _preview_whole_file(content, file_path, project_root)
 
-    # Format 2: Search/Replace blocks
+    # Format 2: Search/Replace blocks (a marker substring check skips the
+    # regex scan for plain unified diffs)
     sr_blocks = parse_search_replace_blocks(diff)
     if sr_blocks:
         return _preview_search_replace(sr_blocks, project_root)
 
     # Format 3: Unified diff
-    if diff.strip():
+    if not _is_blank(diff):
         return _preview_unified_diff(diff, project_root)
 
     raise ValueError("Empty or unrecognized patch format")
@@ -292,21 +496,18 @@ def _preview_whole_file(
     full_path = project_root / file_path
 
     # Determine action and get original content
-    if full_path.exists():
-        try:
-            original_content = full_path.read_text(encoding='utf-8')
-        except Exception:
-            original_content = ''
-        action = "modify"
-    else:
-        original_content = ''
-        action = "create"
+    original_content, action = _read_original(full_path)
 
-    # Calculate diff stats
-    additions, deletions = calculate_diff_stats(original_content, content)
+    if action == "modify" and content == original_content:
+        # Unchanged re-emit of an existing file: no diff work needed
+        additions, deletions = 0, 0
+        diff_str = ''
+    else:
+        # Calculate diff stats
+        additions, deletions = calculate_diff_stats(original_content, content)
 
-    # Generate diff for preview
-    diff_str = generate_unified_diff(original_content, content, file_path)
+        # Generate diff for preview
+        diff_str = generate_unified_diff(original_content, content, file_path)
 
     changes_summary = f"+{additions} -{deletions} lines"
     rationale = f"{action.capitalize()} file: {changes_summary}"
@@ -342,15 +543,7 @@ def _preview_search_replace(
     full_path = project_root / file_path
 
     # Read original content
-    if full_path.exists():
-        try:
-            original_content = full_path.read_text(encoding='utf-8')
-        except Exception:
-            original_content = ''
-        action = "modify"
-    else:
-        original_content = ''
-        action = "create"
+    original_content, action = _read_original(full_path)
 
     # Apply all blocks for this file to generate preview
     patched_content = original_content
@@ -391,27 +584,19 @@ def _preview_unified_diff(
     project_root: Path
 ) -> PatchPlan:
     """Preview a unified diff."""
-    if not diff.strip():
+    if _is_blank(diff):
         raise ValueError("Empty diff provided")
 
     # Parse to extract file info and validate
     touched_files, primary_file, action = _parse_diff_metadata(diff)
 
-    # Validate all paths
-    for file_path in touched_files:
-        path_obj = Path(file_path)
-        validate_path(path_obj, project_root, allow_read_only=False)
+    # Validate all paths (project root resolved once for the batch)
+    validate_paths(touched_files, project_root, allow_read_only=False)
 
     full_path = project_root / primary_file
 
     # Read original content
-    if full_path.exists():
-        try:
-            original_content = full_path.read_text(encoding='utf-8')
-        except Exception:
-            original_content = ''
-    else:
-        original_content = ''
+    original_content, _ = _read_original(full_path)
 
     # Apply diff to generate patched content preview
     patched_content = _apply_diff_to_content(diff, original_content, primary_file)
@@ -434,6 +619,10 @@ def _preview_unified_diff(
     )
 
 
+# '--- path' / '+++ path' file headers: captures marker and first path token
+_DIFF_FILE_HEADER_RE = re.compile(r'^(---|\+\+\+) [^\S\n]*(\S+)', re.MULTILINE)
+
+
 def _parse_diff_metadata(diff: str) -> Tuple[List[str], str, str]:
     """
     Parse diff to extract file paths and action type.
@@ -445,18 +634,17 @@ def _parse_diff_metadata(diff: str) -> Tuple[List[str], str, str]:
     source_file = None
     target_file = None
 
-    for line in diff.split('\n'):
-        if line.startswith('--- '):
-            parts = line.split()
-            if len(parts) >= 2:
-                source_file = parts[1].lstrip('a/')
-        elif line.startswith('+++ '):
-            parts = line.split()
-            if len(parts) >= 2:
-                target_file = parts[1].lstrip('b/')
-                if target_file and target_file != '/dev/null':
-                    if target_file not in touched_files:
-                        touched_files.append(target_file)
+    for match in _DIFF_FILE_HEADER_RE.finditer(diff):
+        marker, header_path = match.groups()
+        if marker == '---':
+            source_file = header_path.removeprefix('a/')
+        else:
+            target_file = header_path.removeprefix('b/')
+            # Deleted files are touched via their source path
+            touched = source_file if target_file == '/dev/null' else target_file
+            if touched and touched != '/dev/null':
+                if touched not in touched_files:
+                    touched_files.append(touched)
 
     if not touched_files:
         raise ValueError("Could not parse file paths from diff")
@@ -499,57 +687,57 @@ def _apply_diff_unidiff(diff: str, original: str) -> str:
     patched_file = patchset[0]
 
     # Handle new file creation
-    source = patched_file.source_file.lstrip('a/') if hasattr(patched_file, 'source_file') else ''
-    if source == '/dev/null' or not original.strip():
+    source = patched_file.source_file.removeprefix('a/') if hasattr(patched_file, 'source_file') else ''
+    if source == '/dev/null' or _is_blank(original):
         # New file - extract all additions
-        lines = []
-        for hunk in patched_file:
-            for line in hunk:
-                if line.is_added:
-                    lines.append(line.value.rstrip('\n'))
-        return '\n'.join(lines)
-
-    # Apply hunks to existing content
-    original_lines = original.splitlines()
-    result_lines = original_lines.copy()
-
-    # Process hunks in reverse order to maintain line numbers
-    hunks = list(patched_file)
-    for hunk in reversed(hunks):
-        # Calculate the range to modify
-        start = max(0, hunk.source_start - 1)
-        length = hunk.source_length
-
-        # Build replacement lines
-        new_lines = []
-        for line in hunk:
-            if line.is_context or line.is_added:
-                new_lines.append(line.value.rstrip('\n'))
-
-        # Replace the range
-        result_lines[start:start + length] = new_lines
+        return '\n'.join([
+            line.value.rstrip('\n')
+            for hunk in patched_file
+            for line in hunk
+            if line.line_type == LINE_TYPE_ADDED
+        ])
+
+    # Apply hunks to existing content in one forward pass: copy the
+    # unchanged span before each hunk, then the hunk's new lines.
+    # split('\n') round-trips exactly through '\n'.join (keeps '\r' and
+    # the trailing newline), unlike splitlines()
+    original_lines = original.split('\n')
+    result_lines = []
+    cursor = 0
+
+    for hunk in sorted(patched_file, key=lambda h: h.source_start):
+        # Calculate the range to replace
+        start = max(cursor, hunk.source_start - 1)
+        result_lines.extend(original_lines[cursor:start])
+
+        # Append replacement lines (line_type compared directly instead of
+        # two is_context/is_added property calls per line)
+        result_lines.extend([
+            line.value.rstrip('\n')
+            for line in hunk
+            if line.line_type == LINE_TYPE_CONTEXT or line.line_type == LINE_TYPE_ADDED
+        ])
+
+        cursor = max(cursor, start + hunk.source_length)
+
+    result_lines.extend(original_lines[cursor:])
 
     return '\n'.join(result_lines)
 
 
+# Added lines ('+' but not the '+++' header) and context lines, sans prefix
+_ADDED_LINE_RE = re.compile(r'^\+(?!\+\+)(.*)$', re.MULTILINE)
+_ADDED_OR_CONTEXT_LINE_RE = re.compile(r'^(?:\+(?!\+\+)| )(.*)$', re.MULTILINE)
+
+
 def _apply_diff_simple(diff: str, original: str) -> str:
     """Simple diff application - extracts additions and context."""
-    lines = diff.split('\n')
-    content_lines = []
-
-    # For new files, just extract additions
-    if not original.strip():
-        for line in lines:
-            if line.startswith('+') and not line.startswith('+++'):
-                content_lines.append(line[1:])
-        return '\n'.join(content_lines) if content_lines else original
-
-    # For modifications, use additions + context
-    for line in lines:
-        if line.startswith('+') and not line.startswith('+++'):
-            content_lines.append(line[1:])
-        elif line.startswith(' '):
-            content_lines.append(line[1:])
+    # For new files, just extract additions; for modifications, use
+    # additions + context (one C-level regex scan instead of a line loop)
+    if _is_blank(original):
+        content_lines = _ADDED_LINE_RE.findall(diff)
+    else:
+        content_lines = _ADDED_OR_CONTEXT_LINE_RE.findall(diff)
 
     return '\n'.join(content_lines) if content_lines else original
 
@@ -558,10 +746,36 @@ def _apply_diff_simple(diff: str, original: str) -> str:
 # PATCH EXECUTION
 # ============================================================================
 
+# Block size for hashing written files during verification
+VERIFY_BLOCK_BYTES = 64 * 1024
+
+# Smaller writes skip verification by default: the atomic rename already
+# leaves either the old or the new file (set PULSE_VERIFY_WRITES to force)
+VERIFY_MIN_BYTES = 4096
+
+
+def _file_sha256(path: Path) -> bytes:
+    """
+    SHA-256 digest of a file, read in VERIFY_BLOCK_BYTES blocks.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Raw digest bytes
+    """
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(VERIFY_BLOCK_BYTES), b''):
+            hasher.update(block)
+    return hasher.digest()
+
+
 def execute_patch(
     plan: PatchPlan,
     project_root: Path,
-    rag_manager: Optional[Any] = None
+    rag_manager: Optional[Any] = None,
+    verify: Optional[bool] = None
 ) -> Dict[str, Any]:
     """
     Execute an approved patch plan.
@@ -573,6 +787,9 @@ def execute_patch(
         plan: Approved PatchPlan from preview_patch()
         project_root: Project root directory
         rag_manager: Optional RAGManager for freshness updates
+        verify: Re-read the written file and compare its hash with the
+            bytes written. None (default) verifies files of at least
+            VERIFY_MIN_BYTES, or all files when PULSE_VERIFY_WRITES is set
 
     Returns:
         Dict with keys:
@@ -585,7 +802,10 @@ def execute_patch(
 
     try:
         full_path = project_root / plan.file_path
-        file_manager = FileManager(str(project_root))
+
+        # The workspace must exist (parents of new files are created below)
+        if not project_root.is_dir():
+            raise ValueError(f"Base path is not a directory: {project_root}")
 
         # ====================================================================
         # GET CONTENT TO WRITE
@@ -596,20 +816,14 @@ def execute_patch(
             new_content = plan.patched_content
         else:
             # Fallback: apply diff to current content
-            if full_path.exists():
-                original = full_path.read_text(encoding='utf-8')
-            else:
-                original = ''
+            original = _read_text(full_path) or ''
             new_content = _apply_diff_to_content(plan.diff, original, plan.file_path)
 
         # ====================================================================
         # VERIFY CHANGE IS MEANINGFUL
         # ====================================================================
 
-        if full_path.exists():
-            current_content = full_path.read_text(encoding='utf-8')
-        else:
-            current_content = ''
+        current_content = _read_text(full_path) or ''
 
         if new_content == current_content:
             logger.warning(f"Patch would result in no change to {plan.file_path}")
@@ -648,18 +862,29 @@ def execute_patch(
 
         # Write to temp file first, then rename (atomic on most systems)
         temp_dir = full_path.parent
+        # Encoded by hand (UTF-8, newlines as in text mode) so the written
+        # bytes can be hashed in the same pass for verification
+        written_hash = hashlib.sha256()
+        written_bytes = 0
         with tempfile.NamedTemporaryFile(
-            mode='w',
-            encoding='utf-8',
+            mode='wb',
             dir=temp_dir,
             delete=False,
             suffix='.tmp'
         ) as tmp:
-            tmp.write(new_content)
+            # Chunked writes bound the transient encoded copy
+            for start in range(0, len(new_content), WRITE_CHUNK_CHARS):
+                chunk = new_content[start:start + WRITE_CHUNK_CHARS]
+                if os.linesep != '\n':
+                    chunk = chunk.replace('\n', os.linesep)
+                data = chunk.encode('utf-8')
+                written_hash.update(data)
+                written_bytes += len(data)
+                tmp.write(data)
             tmp_path = Path(tmp.name)
 
-        # Atomic rename
-        shutil.move(str(tmp_path), str(full_path))
+        # Atomic rename (temp file is in the same directory, so one rename(2))
+        os.replace(tmp_path, full_path)
 
         logger.info(f"Applied patch to {plan.file_path}")
 
@@ -667,8 +892,11 @@ def execute_patch(
         # VERIFY WRITE
         # ====================================================================
 
-        written_content = full_path.read_text(encoding='utf-8')
-        if written_content != new_content:
+        if verify is None:
+            verify = written_bytes >= VERIFY_MIN_BYTES or bool(os.environ.get("PULSE_VERIFY_WRITES"))
+
+        # Hash the file back in blocks (no decode, no second full copy)
+        if verify and _file_sha256(full_path) != written_hash.digest():
             logger.error("Written content doesn't match expected!")
             return {
                 "status": "error",
@@ -688,8 +916,16 @@ def execute_patch(
             except Exception as e:
                 logger.warning(f"RAG update failed: {e}")
 
-        # Calculate final stats
-        additions, deletions = calculate_diff_stats(current_content, new_content)
+        # Final stats: preview already counted them unless the file changed
+        # since (or the content came from the diff fallback)
+        if (
+            plan.original_content is not None
+            and new_content is plan.patched_content
+            and current_content == plan.original_content
+        ):
+            additions, deletions = plan.additions, plan.deletions
+        else:
+            additions, deletions = calculate_diff_stats(current_content, new_content)
 
         return {
             "status": "success",
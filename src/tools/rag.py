@@ -11,11 +11,17 @@ Tool: search_workspace
 Database: .pulse/chroma_db/ (vector store) + .pulse/history.sqlite (freshness metadata)
 """
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 import logging
 import hashlib
+import os
 import sqlite3
+import threading
+import time
 from datetime import datetime
 
 try:
@@ -31,6 +37,27 @@ from src.core.guardrails import is_path_safe
 
 logger = logging.getLogger(__name__)
 
+# Freshness record per indexed file:
+# (content_hash, last_mtime, chunk_count, file_size)
+IndexRecord = Tuple[str, float, int, Optional[int]]
+
+# File ready to store: (rel_path, chunks, content_hash, file_stat)
+PreparedFile = Tuple[str, List[Dict[str, Any]], str, os.stat_result]
+
+# Worker threads reading, hashing and chunking files in index_workspace
+INDEX_MAX_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# Files prepared ahead of the (slower) Chroma writes in index_workspace;
+# bounds how many chunk lists sit in finished futures at once
+INDEX_MAX_IN_FLIGHT = 2 * INDEX_MAX_WORKERS
+
+# Chunks accumulated across files before one Chroma upsert in index_workspace
+UPSERT_BATCH_CHUNKS = 512
+
+# Files up to this size are read once for both hashing and chunking; larger
+# files are hashed by streaming so raw bytes and text are not both held
+SINGLE_READ_MAX_BYTES = 16 * 1024 * 1024
+
 
 # ============================================================================
 # RAG MANAGER WITH FRESHNESS TRACKING
@@ -84,6 +111,13 @@ class RAGManager:
         self.chroma_dir = self.pulse_dir / "chroma_db"
         self.db_path = self.pulse_dir / "history.sqlite"
 
+        # time.monotonic() of the last completed index_workspace pass
+        self.last_indexed_at: Optional[float] = None
+
+        # Serializes index_workspace passes on this manager (searches run
+        # on executor threads, and a timed-out pass keeps running)
+        self._index_lock = threading.Lock()
+
         # Ensure directories exist
         self.pulse_dir.mkdir(parents=True, exist_ok=True)
         self.chroma_dir.mkdir(parents=True, exist_ok=True)
@@ -177,25 +211,51 @@ class RAGManager:
                 content_hash TEXT NOT NULL,
                 last_mtime REAL NOT NULL,
                 last_indexed_at TEXT NOT NULL,
-                chunk_count INTEGER DEFAULT 0
+                chunk_count INTEGER DEFAULT 0,
+                file_size INTEGER
             )
         """)
 
+        # Databases created before file_size was tracked
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(file_index)")}
+        if "file_size" not in columns:
+            cursor.execute("ALTER TABLE file_index ADD COLUMN file_size INTEGER")
+
         conn.commit()
         conn.close()
 
     def _compute_file_hash(self, file_path: Path) -> str:
         """Compute SHA256 hash of file content."""
-        hasher = hashlib.sha256()
         try:
-            with file_path.open("rb") as f:
-                while chunk := f.read(8192):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
+            # file_digest does its own large-buffer reads (and releases the GIL)
+            with file_path.open("rb", buffering=0) as f:
+                return hashlib.file_digest(f, "sha256").hexdigest()
         except Exception as e:
             logger.warning(f"Could not hash file {file_path}: {e}")
             return ""
 
+    def _open_index_db(self) -> sqlite3.Connection:
+        """Open the freshness database for a bulk indexing pass."""
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _load_index_snapshot(self, conn: sqlite3.Connection) -> Dict[str, IndexRecord]:
+        """
+        Load every freshness record in one query.
+
+        Args:
+            conn: Open connection to the freshness database.
+
+        Returns:
+            Dict mapping relative file path to its IndexRecord.
+        """
+        rows = conn.execute(
+            "SELECT file_path, content_hash, last_mtime, chunk_count, file_size FROM file_index"
+        )
+        return {row[0]: row[1:] for row in rows}
+
     def _is_file_fresh(self, file_path: Path) -> bool:
         """
         Check if file is already indexed and fresh.
@@ -209,29 +269,90 @@ class RAGManager:
         rel_path = str(file_path.relative_to(self.project_root))
 
         cursor.execute(
-            "SELECT content_hash, last_mtime FROM file_index WHERE file_path = ?",
+            "SELECT content_hash, last_mtime, chunk_count, file_size FROM file_index WHERE file_path = ?",
             (rel_path,)
         )
         result = cursor.fetchone()
         conn.close()
 
-        if not result:
+        is_fresh, _ = self._check_freshness(file_path, result)
+        return is_fresh
+
+    def _check_freshness(
+        self,
+        file_path: Path,
+        record: Optional[IndexRecord],
+        file_stat: Optional[os.stat_result] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Check a file against its stored freshness record.
+
+        An exact mtime and size match is taken as proof the file is
+        unchanged; the content is only hashed when the mtime is within
+        tolerance but not identical.
+
+        Args:
+            file_path: Absolute path to file.
+            record: Stored IndexRecord, or None if the file was never indexed.
+            file_stat: Current stat of the file, if the caller has it.
+
+        Returns:
+            (is_fresh, current_hash): is_fresh is False if the file needs
+            re-indexing. current_hash is the content hash if it had to be
+            computed (so re-indexing can reuse it), else None.
+        """
+        if not record:
             # Not indexed yet
-            return False
+            return False, None
+
+        stored_hash, stored_mtime, _, stored_size = record
 
-        stored_hash, stored_mtime = result
+        # Same mtime and size: unchanged, no need to read the file
+        if file_stat is None:
+            file_stat = file_path.stat()
+        current_mtime = file_stat.st_mtime
+        if current_mtime == stored_mtime and file_stat.st_size == stored_size:
+            return True, None
 
         # Check if file modified
-        current_mtime = file_path.stat().st_mtime
         if abs(current_mtime - stored_mtime) > 1:  # 1 second tolerance
-            return False
+            return False, None
 
         # Check content hash
         current_hash = self._compute_file_hash(file_path)
-        if current_hash != stored_hash:
-            return False
+        return current_hash == stored_hash, current_hash
 
-        return True
+    def _walk(self) -> Iterator[Tuple[Path, os.stat_result]]:
+        """
+        Walk the project root for files with supported extensions.
+
+        An iterative os.scandir walk that never descends into IGNORE_DIRS,
+        and skips other extensions by name before touching the file.
+        Symlinked directories are not followed.
+
+        Yields:
+            (file_path, file_stat) for each candidate regular file.
+        """
+        stack = [str(self.project_root)]
+
+        while stack:
+            dir_path = stack.pop()
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in self.IGNORE_DIRS:
+                                    stack.append(entry.path)
+                            elif (
+                                os.path.splitext(entry.name)[1] in self.SUPPORTED_EXTENSIONS
+                                and entry.is_file()
+                            ):
+                                yield Path(entry.path), entry.stat()
+                        except OSError as e:
+                            logger.debug(f"Skipping {entry.path}: {e}")
+            except OSError as e:
+                logger.warning(f"Could not list directory {dir_path}: {e}")
 
     def _should_process_file(self, file_path: Path) -> bool:
         """Check if file should be processed for indexing."""
@@ -263,7 +384,19 @@ class RAGManager:
             logger.warning(f"Could not read file {file_path}: {e}")
             return []
 
-        rel_path = str(file_path.relative_to(self.project_root))
+        return self._chunk_text(content, str(file_path.relative_to(self.project_root)))
+
+    def _chunk_text(self, content: str, rel_path: str) -> List[Dict[str, Any]]:
+        """
+        Chunk already-read file content for embedding.
+
+        Args:
+            content: File text with universal newlines.
+            rel_path: File path relative to project root (for metadata).
+
+        Returns:
+            List of chunks with metadata.
+        """
         chunks = []
 
         if len(content) <= self.MAX_CHUNK_SIZE:
@@ -277,40 +410,43 @@ class RAGManager:
                 }
             })
         else:
-            # Split by lines
-            lines = content.split('\n')
-            current_chunk_lines = []
-            current_size = 0
+            # Split at line boundaries by offset (no per-line strings)
+            content_len = len(content)
+            chunk_start = 0  # Offset of the current chunk's first line
+            line_start = 0
             chunk_index = 0
 
-            for line in lines:
-                line_size = len(line) + 1  # +1 for newline
+            while True:
+                line_end = content.find('\n', line_start)
+                if line_end == -1:
+                    line_end = content_len
+                line_size = line_end - line_start + 1  # +1 for newline
 
-                if current_size + line_size > self.MAX_CHUNK_SIZE and current_chunk_lines:
-                    # Save current chunk
+                # Current chunk size is line_start - chunk_start
+                if line_start - chunk_start + line_size > self.MAX_CHUNK_SIZE and line_start > chunk_start:
+                    # Save current chunk (without its trailing newline)
                     chunks.append({
-                        "content": '\n'.join(current_chunk_lines),
+                        "content": content[chunk_start:line_start - 1],
                         "metadata": {
                             "file_path": rel_path,
                             "chunk_index": chunk_index,
                         }
                     })
-                    current_chunk_lines = []
-                    current_size = 0
+                    chunk_start = line_start
                     chunk_index += 1
 
-                current_chunk_lines.append(line)
-                current_size += line_size
+                if line_end == content_len:
+                    break
+                line_start = line_end + 1
 
             # Last chunk
-            if current_chunk_lines:
-                chunks.append({
-                    "content": '\n'.join(current_chunk_lines),
-                    "metadata": {
-                        "file_path": rel_path,
-                        "chunk_index": chunk_index,
-                    }
-                })
+            chunks.append({
+                "content": content[chunk_start:],
+                "metadata": {
+                    "file_path": rel_path,
+                    "chunk_index": chunk_index,
+                }
+            })
 
             # Update total_chunks in all chunks
             for chunk in chunks:
@@ -318,12 +454,17 @@ class RAGManager:
 
         return chunks
 
-    def update_file(self, file_path: Path) -> None:
+    def update_file(self, file_path: Path, conn: Optional[sqlite3.Connection] = None) -> int:
         """
         Incrementally update embeddings for a single file.
 
         Args:
             file_path: Absolute path to file.
+            conn: Open freshness database connection to write through
+                (the caller commits). A new connection is used if None.
+
+        Returns:
+            Number of chunks indexed (0 if the file was skipped).
 
         Behavior:
             - Compute file hash
@@ -332,43 +473,102 @@ class RAGManager:
         """
         if not file_path.exists():
             logger.warning(f"File does not exist: {file_path}")
-            return
+            return 0
 
         if not self._should_process_file(file_path):
             logger.debug(f"Skipping file (unsupported or ignored): {file_path}")
-            return
+            return 0
 
         logger.info(f"Updating RAG index for: {file_path}")
 
+        return self._store_files([self._prepare_file(file_path)], conn=conn)
+
+    def _prepare_file(self, file_path: Path, known_hash: Optional[str] = None) -> PreparedFile:
+        """
+        Chunk and fingerprint a file without touching Chroma or SQLite.
+
+        Only reads the file, so index_workspace runs it on worker threads.
+        Files up to SINGLE_READ_MAX_BYTES are read once, and the same bytes
+        are hashed and decoded for chunking.
+
+        Args:
+            file_path: Absolute path to file.
+            known_hash: Content hash already computed by the freshness
+                check, reused instead of hashing the file again.
+
+        Returns:
+            PreparedFile for _store_files.
+        """
         rel_path = str(file_path.relative_to(self.project_root))
+        file_stat = file_path.stat()
+
+        if file_stat.st_size > SINGLE_READ_MAX_BYTES:
+            chunks = self._chunk_file(file_path)
+            content_hash = known_hash or self._compute_file_hash(file_path)
+            return rel_path, chunks, content_hash, file_stat
 
-        # Remove old chunks from Chroma
         try:
-            # Query for chunks with this file_path
-            existing = self.collection.get(where={"file_path": rel_path})
-            if existing and existing["ids"]:
-                self.collection.delete(ids=existing["ids"])
-                logger.debug(f"Removed {len(existing['ids'])} old chunks for {rel_path}")
-        except Exception as e:
-            logger.warning(f"Could not remove old chunks for {rel_path}: {e}")
+            raw = file_path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Could not read file {file_path}: {e}")
+            return rel_path, [], "", file_stat
+
+        content_hash = known_hash or hashlib.sha256(raw).hexdigest()
+        # Same text read_text() gives: decoded, universal newlines
+        content = raw.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+        return rel_path, self._chunk_text(content, rel_path), content_hash, file_stat
+
+    def _store_files(
+        self,
+        prepared_files: List[PreparedFile],
+        conn: Optional[sqlite3.Connection] = None
+    ) -> int:
+        """
+        Replace chunks for a batch of files in Chroma and record their freshness.
 
-        # Chunk file
-        chunks = self._chunk_file(file_path)
+        Old chunks are removed with one filtered delete and new chunks are
+        written with one upsert, however many files are in the batch.
 
-        if not chunks:
-            logger.warning(f"No chunks generated for {rel_path}")
-            return
+        Args:
+            prepared_files: Results of _prepare_file.
+            conn: Open freshness database connection to write through
+                (the caller commits). A new connection is used if None.
+
+        Returns:
+            Number of chunks indexed (0 if nothing was stored).
+        """
+        rel_paths = [prepared[0] for prepared in prepared_files]
+
+        # Remove old chunks from Chroma
+        try:
+            self.collection.delete(where={"file_path": {"$in": rel_paths}})
+        except Exception as e:
+            logger.warning(f"Could not remove old chunks for {', '.join(rel_paths)}: {e}")
 
         # Prepare for Chroma
         documents = []
         metadatas = []
         ids = []
+        records = []
+        indexed_at = datetime.now().isoformat()
 
-        for chunk in chunks:
-            chunk_id = f"{rel_path}::{chunk['metadata']['chunk_index']}"
-            documents.append(chunk["content"])
-            metadatas.append(chunk["metadata"])
-            ids.append(chunk_id)
+        for rel_path, chunks, content_hash, file_stat in prepared_files:
+            if not chunks:
+                logger.warning(f"No chunks generated for {rel_path}")
+                continue
+
+            for chunk in chunks:
+                chunk_id = f"{rel_path}::{chunk['metadata']['chunk_index']}"
+                documents.append(chunk["content"])
+                metadatas.append(chunk["metadata"])
+                ids.append(chunk_id)
+
+            records.append(
+                (rel_path, content_hash, file_stat.st_mtime, indexed_at, len(chunks), file_stat.st_size)
+            )
+
+        if not ids:
+            return 0
 
         # Upsert to Chroma
         try:
@@ -377,28 +577,36 @@ class RAGManager:
                 metadatas=metadatas,
                 ids=ids
             )
-            logger.debug(f"Upserted {len(chunks)} chunks for {rel_path}")
+            logger.debug(f"Upserted {len(ids)} chunks for {len(records)} files")
         except Exception as e:
-            logger.error(f"Chroma upsert failed for {rel_path}: {e}")
-            return
+            logger.error(f"Chroma upsert failed for {', '.join(rel_paths)}: {e}")
+            return 0
 
-        # Update freshness record in SQLite
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        # Update freshness records in SQLite (on failure the files stay
+        # stale and are re-indexed by the next pass)
+        own_conn = conn is None
+        try:
+            if own_conn:
+                conn = sqlite3.connect(str(self.db_path))
 
-        content_hash = self._compute_file_hash(file_path)
-        mtime = file_path.stat().st_mtime
-        indexed_at = datetime.now().isoformat()
+            conn.executemany("""
+                INSERT OR REPLACE INTO file_index (file_path, content_hash, last_mtime, last_indexed_at, chunk_count, file_size)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, records)
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO file_index (file_path, content_hash, last_mtime, last_indexed_at, chunk_count)
-            VALUES (?, ?, ?, ?, ?)
-        """, (rel_path, content_hash, mtime, indexed_at, len(chunks)))
+            if own_conn:
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Freshness update failed for {', '.join(rel_paths)}: {e}")
+            return 0
+        finally:
+            if own_conn and conn is not None:
+                conn.close()
 
-        conn.commit()
-        conn.close()
+        for record in records:
+            logger.info(f"RAG index updated for: {record[0]}")
 
-        logger.info(f"RAG index updated for: {rel_path}")
+        return len(ids)
 
     def remove_file(self, file_path: Path) -> None:
         """
@@ -433,47 +641,114 @@ class RAGManager:
         """
         Index entire workspace with freshness checks.
 
-        Only re-indexes files that have changed since last index.
+        Only re-indexes files that have changed since last index. The whole
+        pass shares one SQLite connection, and freshness records are loaded
+        up front in a single query instead of one lookup per file. Changed
+        files are read, hashed and chunked on a thread pool; Chroma and
+        SQLite writes stay on the calling thread, in walk order, batched
+        into one upsert per UPSERT_BATCH_CHUNKS chunks. Concurrent calls on
+        one manager run one after another.
 
         Returns:
             Dict with stats: files_processed, chunks_created, files_skipped.
         """
+        with self._index_lock:
+            return self._index_workspace()
+
+    def refresh_index(self, max_age_seconds: float) -> Optional[Dict[str, int]]:
+        """
+        Re-index the workspace if the last pass is older than max_age_seconds.
+
+        Does not wait for a pass already running on another thread: the
+        caller proceeds with the current index instead of queuing a second
+        full pass behind it.
+
+        Args:
+            max_age_seconds: Maximum age of the last completed pass.
+
+        Returns:
+            index_workspace stats, or None if no pass was started.
+        """
+        if self.last_indexed_at is not None and time.monotonic() - self.last_indexed_at <= max_age_seconds:
+            return None
+
+        if self._index_lock.locked():
+            logger.debug("Workspace indexing already in progress, using current index")
+            return None
+
+        return self.index_workspace()
+
+    def _index_workspace(self) -> Dict[str, int]:
+        """Body of index_workspace (caller holds _index_lock)."""
         logger.info("Starting workspace indexing...")
 
         files_processed = 0
         chunks_created = 0
         files_skipped = 0
 
-        for file_path in self.project_root.rglob("*"):
-            if not file_path.is_file():
-                continue
-
-            if not self._should_process_file(file_path):
-                continue
-
-            # Check if fresh
-            if self._is_file_fresh(file_path):
-                files_skipped += 1
-                logger.debug(f"Skipping fresh file: {file_path}")
-                continue
+        conn = self._open_index_db()
+        try:
+            snapshot = self._load_index_snapshot(conn)
+            stale_files = []
 
-            # Update file
-            try:
-                self.update_file(file_path)
-                files_processed += 1
+            for file_path, file_stat in self._walk():
+                if not self._should_process_file(file_path):
+                    continue
 
-                # Count chunks added
+                # Check if fresh
                 rel_path = str(file_path.relative_to(self.project_root))
-                conn = sqlite3.connect(str(self.db_path))
-                cursor = conn.cursor()
-                cursor.execute("SELECT chunk_count FROM file_index WHERE file_path = ?", (rel_path,))
-                result = cursor.fetchone()
-                conn.close()
-                if result:
-                    chunks_created += result[0]
+                is_fresh, known_hash = self._check_freshness(
+                    file_path, snapshot.get(rel_path), file_stat
+                )
+                if is_fresh:
+                    files_skipped += 1
+                    logger.debug(f"Skipping fresh file: {file_path}")
+                    continue
 
-            except Exception as e:
-                logger.error(f"Failed to index {file_path}: {e}")
+                stale_files.append((file_path, known_hash))
+
+            with ThreadPoolExecutor(max_workers=INDEX_MAX_WORKERS) as executor:
+                stale_iter = iter(stale_files)
+                pending = deque(
+                    (file_path, executor.submit(self._prepare_file, file_path, known_hash))
+                    for file_path, known_hash in islice(stale_iter, INDEX_MAX_IN_FLIGHT)
+                )
+
+                batch = []
+                batch_chunks = 0
+
+                # Submit one more file per file taken, so at most
+                # INDEX_MAX_IN_FLIGHT files are read ahead of the writes
+                while pending:
+                    file_path, future = pending.popleft()
+                    for next_path, next_hash in islice(stale_iter, 1):
+                        pending.append(
+                            (next_path, executor.submit(self._prepare_file, next_path, next_hash))
+                        )
+
+                    try:
+                        prepared = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to index {file_path}: {e}")
+                        continue
+
+                    batch.append(prepared)
+                    batch_chunks += len(prepared[1])
+                    files_processed += 1
+
+                    if batch_chunks >= UPSERT_BATCH_CHUNKS:
+                        chunks_created += self._store_files(batch, conn=conn)
+                        batch = []
+                        batch_chunks = 0
+
+                if batch:
+                    chunks_created += self._store_files(batch, conn=conn)
+
+            conn.commit()
+        finally:
+            conn.close()
+
+        self.last_indexed_at = time.monotonic()
 
         logger.info(
             f"Workspace indexing complete: {files_processed} processed, "
@@ -487,6 +762,48 @@ class RAGManager:
         }
 
 
+# ============================================================================
+# RAG MANAGER CACHE
+# ============================================================================
+
+# Minimum seconds between workspace re-scans triggered by search_workspace
+SEARCH_REINDEX_INTERVAL_SECONDS = 30.0
+
+# RAGManager per resolved project root, shared by search_workspace calls
+# (threading lock: searches run on executor threads)
+_rag_managers: Dict[str, RAGManager] = {}
+_rag_managers_lock = threading.Lock()
+
+
+def _get_cached_rag_manager(project_root: Path) -> RAGManager:
+    """
+    Get the RAGManager for a project root, creating it on first use.
+
+    Creating a manager opens the Chroma client, collection and SQLite
+    database, so it is done once per root rather than once per search.
+
+    Args:
+        project_root: Project root directory.
+
+    Returns:
+        RAGManager for the root.
+    """
+    root_str = str(Path(project_root).resolve())
+
+    with _rag_managers_lock:
+        rag = _rag_managers.get(root_str)
+        if rag is None:
+            rag = RAGManager(Path(root_str))
+            _rag_managers[root_str] = rag
+        return rag
+
+
+def clear_rag_manager_cache() -> None:
+    """Drop cached RAGManager instances (next search re-creates and re-indexes)."""
+    with _rag_managers_lock:
+        _rag_managers.clear()
+
+
 # ============================================================================
 # TIER 1 TOOL: search_workspace
 # ============================================================================
@@ -529,8 +846,11 @@ def search_workspace(
     
     def _do_search() -> List[Dict[str, Any]]:
         """Inner function for timeout-protected search."""
-        rag = RAGManager(project_root)
-        rag.index_workspace()
+        rag = _get_cached_rag_manager(project_root)
+
+        # Re-scan at most every SEARCH_REINDEX_INTERVAL_SECONDS; file_ops and
+        # patching keep changed files fresh through update_file in between
+        rag.refresh_index(SEARCH_REINDEX_INTERVAL_SECONDS)
         
         results = rag.collection.query(
             query_texts=[query],
@@ -655,4 +975,5 @@ def _simple_keyword_search(query: str, project_root: Path, k: int = 5) -> List[D
 __all__ = [
     "RAGManager",
     "search_workspace",
+    "clear_rag_manager_cache",
 ]
@@ -25,7 +25,7 @@ from datetime import datetime
 from src.agents.state import ToolOutput
 from src.tools.file_ops import manage_file_ops
 from src.tools.patching import preview_patch, execute_patch
-from src.tools.rag import search_workspace, RAGManager
+from src.tools.rag import search_workspace, RAGManager, _get_cached_rag_manager
 from src.core.analytics import log_tool_usage
 
 logger = logging.getLogger(__name__)
@@ -601,11 +601,14 @@ class ToolRegistry:
         """
         Get or create RAG manager singleton.
 
+        Shares the per-root instance search_workspace uses, so file updates
+        and searches go through one Chroma client.
+
         Returns:
             RAGManager instance for this project_root.
         """
         if self.rag_manager is None:
-            self.rag_manager = RAGManager(self.project_root)
+            self.rag_manager = _get_cached_rag_manager(self.project_root)
         return self.rag_manager
 
     # ========================================================================
@@ -751,8 +754,8 @@ class ToolRegistry:
         """
         Wrapper for implement_feature tool (CrewAI).
 
-        The implement_feature function is async, but invoke_tool is sync.
-        We need to run it synchronously using asyncio.run() in a new event loop.
+        The implement_feature function is async, but invoke_tool is sync,
+        so it is driven through implement_feature_sync().
 
         Post-processes results to automatically write files when patches have
         direct content (no diff required).
@@ -763,34 +766,16 @@ class ToolRegistry:
         Returns:
             Dict with patch_plans, summary, verification_steps, metadata.
         """
-        from src.tools.builder_crew import implement_feature
-        import asyncio
+        from src.tools.builder_crew import implement_feature_sync
 
-        # Always run in a new event loop since invoke_tool is synchronous
-        # and we need to await the async function
-        try:
-            # Try to get current loop - if one exists, use run_coroutine_threadsafe
-            asyncio.get_running_loop()
-            # We're in an async context but invoke_tool is sync
-            # Use asyncio.run in a thread to avoid nesting
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(
-                    asyncio.run,
-                    implement_feature(
-                        request=args["request"],
-                        project_root=self.project_root,
-                        context=args.get("context")
-                    )
-                )
-                result = future.result(timeout=300)  # 5 minute timeout
-        except RuntimeError:
-            # No running loop, we can use asyncio.run directly
-            result = asyncio.run(implement_feature(
-                request=args["request"],
-                project_root=self.project_root,
-                context=args.get("context")
-            ))
+        # invoke_tool is synchronous; the shim runs the coroutine in a new
+        # event loop (on a helper thread if one is already running)
+        result = implement_feature_sync(
+            request=args["request"],
+            project_root=self.project_root,
+            context=args.get("context"),
+            timeout=300  # 5 minute timeout
+        )
 
         # Post-process: Auto-write files that have direct content (no diff)
         result = self._process_implement_feature_patches(result)
@@ -13,6 +13,7 @@ from pathlib import Path
 
 from src.core.guardrails import (
     validate_path,
+    validate_paths,
     is_path_safe,
     validate_file_operation,
     truncate_output,
@@ -137,6 +138,25 @@ class TestDenylistPatterns:
             validate_path(Path("lib.dll"), project_root)
 
 
+class TestBatchPathValidation:
+    """Tests for validate_paths."""
+
+    def test_resolves_all_paths_in_order(self, temp_workspace):
+        result = validate_paths(["src/utils.st", Path("main.st")], temp_workspace)
+
+        assert result == [
+            (temp_workspace / "src" / "utils.st").resolve(),
+            (temp_workspace / "main.st").resolve(),
+        ]
+
+    def test_any_violation_raises(self, temp_workspace):
+        with pytest.raises(PathViolationError):
+            validate_paths(["main.st", "../outside.st"], temp_workspace)
+
+        with pytest.raises(PathViolationError):
+            validate_paths(["main.st", ".env"], temp_workspace)
+
+
 class TestFileOperationValidation:
     """Tests for validate_file_operation function."""
 
@@ -145,7 +165,8 @@ class TestFileOperationValidation:
         project_root = temp_workspace
 
         # Regular file read should work
-        validate_file_operation("read", Path("main.st"), project_root)
+        resolved = validate_file_operation("read", Path("main.st"), project_root)
+        assert resolved == (project_root / "main.st").resolve()
 
     def test_write_operation_validated(self, temp_workspace):
         """Test that write operations are validated."""
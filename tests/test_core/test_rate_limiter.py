@@ -0,0 +1,144 @@
+"""
+Tests for the RPM + TPM sliding-window rate limiter.
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.core.rate_limiter import (
+    PROVIDER_LIMITS,
+    ConcurrencyController,
+    RateLimiter,
+    configure_rate_limits,
+    get_rate_limiter,
+)
+
+
+class TestRateLimiter:
+    def test_request_limit(self):
+        """The rpm+1th request in a window is told to wait."""
+        limiter = RateLimiter(rpm=2, tpm=1_000)
+
+        assert limiter.try_acquire(10) == 0.0
+        assert limiter.try_acquire(10) == 0.0
+        assert limiter.try_acquire(10) > 0
+
+    def test_token_limit(self):
+        """A request that would exceed the token budget waits even under rpm."""
+        limiter = RateLimiter(rpm=100, tpm=1_000)
+
+        assert limiter.try_acquire(800) == 0.0
+        assert limiter.try_acquire(300) > 0
+        assert limiter.try_acquire(200) == 0.0
+
+    def test_oversized_request_admitted_when_window_empty(self):
+        """A single request larger than tpm does not wait forever."""
+        limiter = RateLimiter(rpm=10, tpm=100)
+
+        assert limiter.try_acquire(500) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_wait_until_window_slides(self):
+        """wait_if_throttled returns once old requests leave the window."""
+        limiter = RateLimiter(rpm=1, tpm=1_000, window_seconds=0.1)
+        await limiter.wait_if_throttled(10)
+
+        start = time.monotonic()
+        await limiter.wait_if_throttled(10)
+
+        assert time.monotonic() - start >= 0.05
+
+    def test_acquire_blocking_waits_for_window(self):
+        limiter = RateLimiter(rpm=1, tpm=1_000, window_seconds=0.1)
+        limiter.acquire_blocking(10)
+
+        start = time.monotonic()
+        limiter.acquire_blocking(10)
+
+        assert time.monotonic() - start >= 0.05
+
+    def test_shared_per_provider(self):
+        assert get_rate_limiter("openai") is get_rate_limiter("openai")
+        assert get_rate_limiter("openai") is not get_rate_limiter("anthropic")
+
+    def test_settings_override_limits(self):
+        """Overrides apply to existing limiters and clearing them restores defaults."""
+        limiter = get_rate_limiter("anthropic")
+        try:
+            configure_rate_limits({"anthropic": {"rpm": 1000}, "google": "fast"})
+            assert (limiter.rpm, limiter.tpm) == (1000, PROVIDER_LIMITS["anthropic"][1])
+            assert get_rate_limiter("google").rpm == PROVIDER_LIMITS["google"][0]
+        finally:
+            configure_rate_limits(None)
+
+        assert (limiter.rpm, limiter.tpm) == PROVIDER_LIMITS["anthropic"]
+
+
+class TestConcurrencyController:
+    def test_additive_increase_on_fast_calls(self):
+        controller = ConcurrencyController(initial=2, target_latency=1.0)
+
+        assert controller.try_enter()
+        controller.exit(latency=0.1)
+
+        assert controller.limit == 2.5
+        assert controller.in_flight == 0
+
+    def test_multiplicative_decrease_on_overload(self):
+        controller = ConcurrencyController(initial=8, target_latency=1.0)
+
+        controller.try_enter()
+        controller.exit(latency=0.1, overloaded=True)
+        assert controller.limit == 4
+
+        for _ in range(5):
+            controller.try_enter()
+            controller.exit(latency=0.1, overloaded=True)
+        assert controller.limit == 1
+
+    def test_slots_bounded_by_limit(self):
+        controller = ConcurrencyController(initial=1)
+
+        assert controller.try_enter()
+        assert not controller.try_enter()
+
+    @pytest.mark.asyncio
+    async def test_slot_shrinks_limit_on_429(self):
+        controller = ConcurrencyController(initial=4)
+
+        with pytest.raises(RuntimeError):
+            async with controller.slot():
+                raise RuntimeError("Error code: 429 - rate limit exceeded")
+
+        assert controller.limit == 2
+        assert controller.in_flight == 0
+
+    def test_slow_first_token_shrinks_limit(self):
+        controller = ConcurrencyController(initial=4, target_latency=1.0)
+
+        controller.try_enter()
+        controller.exit(latency=5.0)
+
+        assert controller.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_call_duration_alone_does_not_shrink_limit(self):
+        """A long non-streaming call reports no first-token time and still grows the limit."""
+        controller = ConcurrencyController(initial=2, target_latency=0.01)
+
+        async with controller.slot():
+            await asyncio.sleep(0.05)
+
+        assert controller.limit == 2.5
+
+    @pytest.mark.asyncio
+    async def test_slot_uses_reported_first_token_time(self):
+        controller = ConcurrencyController(initial=4, target_latency=1.0)
+
+        async with controller.slot() as record_first_token:
+            record_first_token(3.0)
+            record_first_token(0.1)
+
+        assert controller.avg_latency == 3.0
+        assert controller.limit == 2
@@ -0,0 +1,89 @@
+"""
+Tests for the Tier 3 response cache.
+"""
+import os
+
+from src.core.response_cache import DiskResponseCache, ResponseCache, make_cache_key, normalize_prompt
+
+
+class TestResponseCache:
+    def test_normalized_prompts_share_key(self):
+        """Whitespace differences do not change the key."""
+        assert normalize_prompt("  Add a   TIMER.\n") == "Add a TIMER."
+        assert make_cache_key("Add a timer", "ctx") == make_cache_key(" Add  a\ttimer\n", "ctx")
+        assert make_cache_key("Add a timer", "ctx") != make_cache_key("Add a timer", "other")
+
+    def test_case_changes_the_key(self):
+        """Prompts differing only in case (identifiers, file names) do not collide."""
+        assert make_cache_key("Rename variable Count to count in Main.st", "ctx") != make_cache_key(
+            "rename variable count to Count in main.st", "ctx"
+        )
+
+    def test_hit_returns_independent_copy(self):
+        """Mutating a returned value does not affect the cached entry."""
+        cache = ResponseCache()
+        cache.set("k", {"patch_plans": [{"file_path": "a.py"}]})
+
+        first = cache.get("k")
+        first["patch_plans"].clear()
+
+        assert cache.get("k") == {"patch_plans": [{"file_path": "a.py"}]}
+
+    def test_ttl_expiry(self):
+        """Entries older than the TTL are treated as misses."""
+        cache = ResponseCache()
+        cache.set("k", {"v": 1})
+        assert cache.get("k", ttl=0) is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Least recently used entries are evicted past max_entries."""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+
+class TestDiskResponseCache:
+    def test_round_trip_across_instances(self, tmp_path):
+        """Entries written by one instance are read by another (persistence)."""
+        DiskResponseCache(tmp_path / "crew_cache").set("k", {"patch_plans": [{"file_path": "a.py"}]})
+
+        assert DiskResponseCache(tmp_path / "crew_cache").get("k") == {"patch_plans": [{"file_path": "a.py"}]}
+        assert [p.name for p in (tmp_path / "crew_cache").iterdir()] == ["k.json"]
+
+    def test_expired_entry_removed(self, tmp_path):
+        cache = DiskResponseCache(tmp_path)
+        cache.set("k", {"v": 1})
+        os.utime(tmp_path / "k.json", (0, 0))
+
+        assert cache.get("k", ttl=60) is None
+        assert not (tmp_path / "k.json").exists()
+
+    def test_oldest_entries_pruned_on_write(self, tmp_path):
+        cache = DiskResponseCache(tmp_path, max_entries=2)
+        for i, key in enumerate(["a", "b", "c"]):
+            cache.set(key, {"v": key})
+            os.utime(tmp_path / f"{key}.json", (i, i))
+        cache.set("d", {"v": "d"})
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["c.json", "d.json"]
+
+    def test_failed_write_leaves_no_temp_file(self, tmp_path, monkeypatch):
+        def fail_write(self, data):
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr("tempfile._TemporaryFileWrapper.write", fail_write, raising=False)
+        DiskResponseCache(tmp_path).set("k", {"v": 1})
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        (tmp_path / "k.json").write_text("{not json")
+
+        assert DiskResponseCache(tmp_path).get("k") is None
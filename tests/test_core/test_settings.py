@@ -6,6 +6,7 @@ Tests:
 - Default values
 - Preference getters/setters
 - Reset to defaults
+- Parsed config reuse until the file changes
 """
 
 
@@ -173,3 +174,32 @@ class TestRealSettingsManager:
         assert loaded["api_keys"]["openai"] == "test-key-123"
         assert loaded["models"]["master_agent"] == "custom-model"
         assert loaded["preferences"]["theme"] == "light"
+
+    def test_load_settings_reuses_parse_until_file_changes(self, tmp_path, monkeypatch):
+        """Unchanged config is parsed once; edits on disk are picked up."""
+        import json
+        import os
+
+        from src.core import settings as settings_module
+        from src.core.settings import SettingsManager
+
+        manager = SettingsManager()
+        manager.config_file = tmp_path / "config.json"
+        manager.config_file.write_text(json.dumps({"preferences": {"enable_crew": False}}))
+
+        parses = []
+        real_load = json.load
+        monkeypatch.setattr(settings_module.json, "load", lambda f: parses.append(1) or real_load(f))
+
+        first = manager.load_settings()
+        first["preferences"]["enable_crew"] = True
+        second = manager.load_settings()
+
+        assert len(parses) == 1
+        assert second["preferences"]["enable_crew"] is False
+
+        manager.config_file.write_text(json.dumps({"preferences": {"enable_crew": True}}))
+        os.utime(manager.config_file, ns=(0, 10**9))
+
+        assert manager.load_settings()["preferences"]["enable_crew"] is True
+        assert len(parses) == 2
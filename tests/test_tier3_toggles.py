@@ -9,8 +9,11 @@ Verifies that:
 Run with: pytest tests/test_tier3_toggles.py -v
 """
 
+import os
 import pytest
 import asyncio
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import RunnableLambda
 from src.tools.builder_crew import implement_feature
 from src.tools.auditor_swarm import diagnose_project
 
@@ -123,6 +126,350 @@ async def test_implement_feature_toggle_off(temp_workspace, settings_manager_moc
     print("✓ Test passed: enable_crew OFF → no spend")
 
 
+def test_implement_feature_sync_shim(temp_workspace, settings_manager_mock):
+    """
+    Test: implement_feature_sync runs the coroutine for non-async callers.
+
+    Expected:
+    - Works with and without a running event loop
+    """
+    from src.tools.builder_crew import implement_feature_sync
+
+    settings_manager_mock.set_preference("enable_crew", False)
+
+    result = implement_feature_sync("Add a timer", project_root=temp_workspace)
+    assert result["metadata"]["crew_enabled"] is False
+
+    async def from_running_loop():
+        return implement_feature_sync("Add a timer", project_root=temp_workspace)
+
+    assert asyncio.run(from_running_loop())["metadata"]["crew_enabled"] is False
+
+
+@pytest.mark.asyncio
+async def test_implement_feature_cache_hit(temp_workspace, settings_manager_mock, monkeypatch):
+    """
+    Test: Repeated implement_feature request is served from the response cache.
+
+    Expected:
+    - Crew runs once for two equivalent requests
+    - Second result is marked as a cache hit
+    - Changing a pipeline toggle misses the cache
+    - disable_crew_cache bypasses the cache
+    """
+    from src.tools import builder_crew
+    from src.core.response_cache import get_response_cache
+
+    get_response_cache().clear()
+    calls = []
+
+    async def fake_pipeline(**kwargs):
+        calls.append(1)
+        yield {
+            "patch_plans": [{"file_path": "timer.st", "content": "x", "diff": None}],
+            "summary": "ok",
+            "verification_steps": [],
+            "metadata": {"crew_enabled": True},
+        }
+
+    monkeypatch.setattr(builder_crew, "_run_pipeline_streamed", fake_pipeline)
+
+    first = await implement_feature("Add a timer", project_root=temp_workspace)
+    second = await implement_feature("  Add a   timer\n", project_root=temp_workspace)
+
+    assert len(calls) == 1
+    assert "cache_hit" not in first["metadata"]
+    assert second["metadata"]["cache_hit"] is True
+    assert second["patch_plans"] == first["patch_plans"]
+
+    # Persisted on disk: survives a cleared in-memory cache
+    get_response_cache().clear()
+    third = await implement_feature("Add a timer", project_root=temp_workspace)
+    assert len(calls) == 1
+    assert third["metadata"]["cache_hit"] is True
+
+    # Editing an active file invalidates the entry
+    context = {"active_files": ["test.st"]}
+    await implement_feature("Add a timer", project_root=temp_workspace, context=context)
+    assert len(calls) == 2
+    target = temp_workspace / "test.st"
+    os.utime(target, ns=(target.stat().st_atime_ns, target.stat().st_mtime_ns + 10**9))
+    await implement_feature("Add a timer", project_root=temp_workspace, context=context)
+    assert len(calls) == 3
+
+    # Changing a pipeline toggle misses the entry made with the old setting
+    settings_manager_mock.set_preference("skip_reviewer_on_clean_syntax", False)
+    await implement_feature("Add a timer", project_root=temp_workspace)
+    assert len(calls) == 4
+
+    settings_manager_mock.set_preference("disable_crew_cache", True)
+    await implement_feature("Add a timer", project_root=temp_workspace)
+    assert len(calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_implement_feature_caps_concurrent_runs(temp_workspace, settings_manager_mock, monkeypatch):
+    """
+    Test: Runs beyond the concurrency cap wait for a free slot.
+
+    Expected:
+    - With one slot, two simultaneous requests never overlap
+    - Both still complete
+    """
+    import threading
+    from src.tools import builder_crew
+    from src.core.response_cache import get_response_cache
+
+    get_response_cache().clear()
+    settings_manager_mock.set_preference("disable_crew_cache", True)
+    active = []
+    peak = []
+
+    async def fake_pipeline(**kwargs):
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.05)
+        active.pop()
+        yield {"patch_plans": [], "summary": "ok", "verification_steps": [], "metadata": {}}
+
+    monkeypatch.setattr(builder_crew, "_run_pipeline_streamed", fake_pipeline)
+    monkeypatch.setattr(builder_crew, "_CREW_RUN_SLOTS", threading.BoundedSemaphore(1))
+
+    results = await asyncio.gather(
+        implement_feature("Add a timer", project_root=temp_workspace),
+        implement_feature("Add a counter", project_root=temp_workspace),
+    )
+
+    assert max(peak) == 1
+    assert [r["summary"] for r in results] == ["ok", "ok"]
+
+
+@pytest.mark.asyncio
+async def test_implement_feature_async_pipeline(temp_workspace, settings_manager_mock, monkeypatch):
+    """
+    Test: Default runtime runs Planner → Coder → Reviewer via ainvoke.
+
+    Expected:
+    - Coder prompt includes the plan, Reviewer prompt includes the code
+    - Patches are extracted from the Coder output
+    - Reviewer verdict is reduced to structured metadata
+    """
+    from src.tools import builder_crew
+    from src.core.response_cache import get_response_cache
+
+    get_response_cache().clear()
+    prompts = []
+    replies = iter([
+        "1. Goal: add timer\n2. Files Affected: timer.st",
+        "### FILE: timer.st\n```st\nVAR\n    T1 : TON;\nEND_VAR\n```\n",
+        "- Approval: YES\n- Risk Level: LOW",
+    ])
+
+    async def fake_llm(prompt_value):
+        prompts.append(prompt_value.to_messages()[-1].content)
+        return AIMessage(content=next(replies))
+
+    monkeypatch.setattr(builder_crew, "_create_llm", lambda model, settings: RunnableLambda(fake_llm))
+    settings_manager_mock.set_preference("skip_reviewer_on_clean_syntax", False)
+    settings_manager_mock.set_preference("fuse_simple_requests", False)
+
+    result = await implement_feature("Add a timer", project_root=temp_workspace)
+
+    assert "REQUEST: Add a timer" in prompts[0]
+    assert "Files Affected: timer.st" in prompts[1]
+    assert "### FILE: timer.st" in prompts[2]
+    assert [p["file_path"] for p in result["patch_plans"]] == ["timer.st"]
+    assert result["metadata"]["runtime"] == "direct"
+    assert result["metadata"]["review_approved"] is True
+    assert result["metadata"]["review_risk_level"] == "LOW"
+
+
+@pytest.mark.asyncio
+async def test_implement_feature_parallel_per_file_coder(temp_workspace, settings_manager_mock, monkeypatch):
+    """
+    Test: A plan listing several files gets one Coder call per file.
+
+    Expected:
+    - Each Coder prompt is scoped to one planned file
+    - Responses without a ### FILE: header are attributed to their file
+    """
+    from src.tools import builder_crew
+    from src.core.response_cache import get_response_cache
+
+    get_response_cache().clear()
+    prompts = []
+
+    async def fake_llm(prompt_value):
+        prompt = prompt_value.to_messages()[-1].content
+        prompts.append(prompt)
+        if "REQUEST:" in prompt:
+            content = "Goal: x\nFiles Affected:\n- a.py\n- b.py\nSteps:\n1. write"
+        elif "Output ONLY the file a.py" in prompt:
+            content = "### FILE: a.py\n```python\na = 1\n```"
+        elif "Output ONLY the file b.py" in prompt:
+            content = "```python\nb = 2\n```"
+        else:
+            content = "Approval: YES"
+        return AIMessage(content=content)
+
+    monkeypatch.setattr(builder_crew, "_create_llm", lambda model, settings: RunnableLambda(fake_llm))
+    settings_manager_mock.set_preference("skip_reviewer_on_clean_syntax", False)
+    settings_manager_mock.set_preference("fuse_simple_requests", False)
+
+    result = await implement_feature("Add two modules", project_root=temp_workspace)
+
+    assert len(prompts) == 4
+    assert {p["file_path"]: p["content"] for p in result["patch_plans"]} == {"a.py": "a = 1", "b.py": "b = 2"}
+
+
+@pytest.mark.asyncio
+async def test_implement_feature_streaming_yields_files_early(temp_workspace, settings_manager_mock, monkeypatch):
+    """
+    Test: implement_feature_streaming yields each file as the Coder stream completes it.
+
+    Expected:
+    - A partial result per completed ### FILE: block, before the final result
+    - Headers split across stream chunks are still found
+    - Final result is yielded last, after the Reviewer
+    """
+    from langchain_core.runnables import RunnableGenerator
+    from src.tools import builder_crew
+    from src.tools.builder_crew import implement_feature_streaming
+    from src.core.response_cache import get_response_cache
+
+    get_response_cache().clear()
+    coder_chunks = [
+        "### FILE: a.st\n```st\nVAR\nEND_", "VAR\n```\n\n### FI",
+        "LE: b.st\n```st\nx := 1;\n``", "`\n",
+    ]
+
+    async def fake_llm(inputs):
+        async for prompt_value in inputs:
+            prompt = prompt_value.to_messages()[-1].content
+            if "REQUEST:" in prompt:
+                yield AIMessageChunk(content="Goal: x\nFiles Affected: a.st")
+            elif "PLAN:" in prompt:
+                for chunk in coder_chunks:
+                    yield AIMessageChunk(content=chunk)
+            else:
+                yield AIMessageChunk(content="Approval: YES")
+
+    monkeypatch.setattr(builder_crew, "_create_llm", lambda model, settings: RunnableGenerator(fake_llm))
+    settings_manager_mock.set_preference("fuse_simple_requests", False)
+
+    results = [r async for r in implement_feature_streaming("Add timers", project_root=temp_workspace)]
+
+    assert [len(r["patch_plans"]) for r in results] == [1, 2, 2]
+    assert results[0]["metadata"]["generation_pending"] is True
+    assert results[0]["patch_plans"][0]["content"] == "VAR\nEND_VAR"
+    assert "generation_pending" not in results[-1]["metadata"]
+    assert results[-1]["metadata"]["review_approved"] is True
+
+
+@pytest.mark.asyncio
+async def test_implement_feature_fuses_simple_request(temp_workspace, settings_manager_mock, monkeypatch):
+    """
+    Test: A short single-file request plans and codes in one LLM call.
+
+    Expected:
+    - The Planner call is skipped; one Coder prompt carries the request
+    - A long or multi-file request still gets a separate Planner call
+    """
+    from src.tools import builder_crew
+    from src.core.response_cache import get_response_cache
+
+    get_response_cache().clear()
+    prompts = []
+
+    async def fake_llm(prompt_value):
+        prompts.append(prompt_value.to_messages()[-1].content)
+        if "Plan and implement" in prompts[-1] or "PLAN:" in prompts[-1]:
+            return AIMessage(content="Goal: delay\n### FILE: delay.st\n```st\nVAR\n    T1 : TON;\nEND_VAR\n```\n")
+        return AIMessage(content="Goal: delay\nFiles Affected: delay.st")
+
+    monkeypatch.setattr(builder_crew, "_create_llm", lambda model, settings: RunnableLambda(fake_llm))
+
+    result = await implement_feature("Add 5-second delay", project_root=temp_workspace)
+
+    assert len(prompts) == 1
+    assert "REQUEST: Add 5-second delay" in prompts[0]
+    assert [p["file_path"] for p in result["patch_plans"]] == ["delay.st"]
+
+    prompts.clear()
+    context = {"active_files": ["a.st", "b.st"]}
+    await implement_feature("Add 5-second delay", project_root=temp_workspace, context=context)
+    assert len(prompts) == 2
+
+
+@pytest.mark.asyncio
+async def test_implement_feature_crewai_runtime_streams_coder_output(temp_workspace, settings_manager_mock, monkeypatch):
+    """
+    Test: The CrewAI runtime yields the Coder's files before the crew finishes.
+
+    Expected:
+    - Coder task callback (fired from a worker thread) produces a partial result
+    - Final result is yielded last with the parsed crew output
+    """
+    from types import SimpleNamespace
+    from src.tools import builder_crew
+    from src.tools.builder_crew import implement_feature_streaming
+    from src.core.response_cache import get_response_cache
+
+    get_response_cache().clear()
+    settings_manager_mock.settings["preferences"]["crew_runtime"] = "crewai"
+    code_text = "### FILE: timer.st\n```st\nVAR\n    T1 : TON;\nEND_VAR\n```\n"
+
+    async def fake_kickoff(crew):
+        code_task = crew.tasks[-2]
+        await asyncio.to_thread(code_task.callback, SimpleNamespace(raw=code_text))
+        await asyncio.sleep(0)
+        return code_text
+
+    monkeypatch.setattr(builder_crew, "_create_llm", lambda model, settings: model)
+    monkeypatch.setattr(builder_crew, "_kickoff_crew", fake_kickoff)
+
+    results = [r async for r in implement_feature_streaming("Add a timer", project_root=temp_workspace)]
+
+    assert len(results) == 2
+    assert results[0]["metadata"] == {"generation_pending": True, "runtime": "crewai"}
+    assert results[0]["patch_plans"][0]["file_path"] == "timer.st"
+    assert results[-1]["patch_plans"][0]["content"] == "VAR\n    T1 : TON;\nEND_VAR"
+
+
+@pytest.mark.asyncio
+async def test_implement_feature_skips_reviewer_on_clean_syntax(temp_workspace, settings_manager_mock, monkeypatch):
+    """
+    Test: A small, syntactically clean output skips the Reviewer call.
+
+    Expected:
+    - Only Planner and Coder are called
+    - Review metadata is synthesized and marked as skipped
+    """
+    from src.tools import builder_crew
+    from src.core.response_cache import get_response_cache
+
+    get_response_cache().clear()
+    prompts = []
+    replies = iter([
+        "Goal: add timer\nFiles Affected: timer.st",
+        "### FILE: timer.st\n```st\nVAR\n    T1 : TON;\nEND_VAR\n```\n",
+    ])
+
+    async def fake_llm(prompt_value):
+        prompts.append(prompt_value.to_messages()[-1].content)
+        return AIMessage(content=next(replies))
+
+    monkeypatch.setattr(builder_crew, "_create_llm", lambda model, settings: RunnableLambda(fake_llm))
+    settings_manager_mock.set_preference("fuse_simple_requests", False)
+
+    result = await implement_feature("Add a timer", project_root=temp_workspace)
+
+    assert len(prompts) == 2
+    assert result["metadata"]["review_skipped"] is True
+    assert result["metadata"]["review_approved"] is True
+    assert result["metadata"]["review_risk_level"] == "LOW"
+
+
 @pytest.mark.skip(reason="Test design issue: mock provides API key so this test cannot simulate missing key scenario")
 @pytest.mark.asyncio
 async def test_implement_feature_toggle_on_no_api_key(temp_workspace, settings_manager_mock):
@@ -265,6 +612,113 @@ async def test_diagnose_project_stage_a_only(temp_workspace, settings_manager_mo
     print("✓ Test passed: Stage A produces valid output structure")
 
 
+@pytest.mark.asyncio
+async def test_diagnose_project_coalesces_concurrent_calls(
+    temp_workspace, settings_manager_mock, monkeypatch
+):
+    """
+    Test: Concurrent identical diagnose_project calls share one Stage B run.
+
+    Expected:
+    - _run_autogen_sync is invoked exactly once
+    - Both callers receive equal (but independent) results
+    """
+    import threading
+    import time
+    from src.tools import auditor_swarm
+
+    settings_manager_mock.set_preference("enable_autogen", True)
+    calls = []
+    started = threading.Event()
+
+    def fake_autogen_sync(stage_a_result, **kwargs):
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        stage_a_result["metadata"]["stage"] = "A_and_B"
+        return stage_a_result
+
+    monkeypatch.setattr(auditor_swarm, "_run_autogen_sync", fake_autogen_sync)
+
+    async def second_call():
+        await asyncio.to_thread(started.wait, 5)
+        return await diagnose_project(focus_area="safety logic", project_root=temp_workspace)
+
+    first, second = await asyncio.gather(
+        diagnose_project(focus_area="safety logic", project_root=temp_workspace),
+        second_call(),
+    )
+
+    assert len(calls) == 1
+    assert first == second
+    assert first is not second
+    assert auditor_swarm._INFLIGHT == {}
+
+
+@pytest.mark.asyncio
+async def test_diagnose_project_streamed_yields_stage_a_first(
+    temp_workspace, settings_manager_mock, monkeypatch
+):
+    """
+    Test: diagnose_project_streamed yields Stage A before Stage B completes.
+
+    Expected:
+    - First result is Stage A with metadata.stage_b_pending = True
+    - Second result is the Stage B output
+    """
+    from src.tools import auditor_swarm
+    from src.tools.auditor_swarm import diagnose_project_streamed
+
+    settings_manager_mock.set_preference("enable_autogen", True)
+
+    def fake_autogen_sync(stage_a_result, **kwargs):
+        stage_a_result["metadata"]["stage"] = "A_and_B"
+        return stage_a_result
+
+    monkeypatch.setattr(auditor_swarm, "_run_autogen_sync", fake_autogen_sync)
+
+    results = [r async for r in diagnose_project_streamed(project_root=temp_workspace)]
+
+    assert len(results) == 2
+    assert results[0]["metadata"]["stage"] == "A_only"
+    assert results[0]["metadata"]["stage_b_pending"] is True
+    assert results[1]["metadata"]["stage"] == "A_and_B"
+    assert "stage_b_pending" not in results[1]["metadata"]
+
+
+@pytest.mark.asyncio
+async def test_diagnose_project_var_block_balance(temp_workspace, settings_manager_mock):
+    """
+    Test: VAR/END_VAR balance check counts block keywords, not substrings.
+
+    Expected:
+    - Balanced blocks (including VAR_INPUT and identifiers containing VAR)
+      produce no ERROR finding
+    - A missing END_VAR is reported as unbalanced
+    """
+    settings_manager_mock.set_preference("enable_autogen", False)
+
+    (temp_workspace / "fb.st").write_text("""
+FUNCTION_BLOCK FB_Motor
+VAR_INPUT
+    bStart : BOOL;
+END_VAR
+VAR
+    MY_VAR : INT;
+END_VAR
+""")
+    (temp_workspace / "broken.st").write_text("""
+VAR
+    bRun : BOOL;
+""")
+
+    result = await diagnose_project(project_root=temp_workspace)
+
+    errors = [f for f in result["findings"] if f["severity"] == "ERROR"]
+    assert [f["file"] for f in errors] == ["broken.st"]
+    assert "(1 VAR, 0 END_VAR)" in errors[0]["message"]
+
+
 
 
 if __name__ == "__main__":
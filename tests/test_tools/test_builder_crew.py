@@ -0,0 +1,403 @@
+"""
+Tests for src/tools/builder_crew.py - Crew output parsing helpers.
+
+Tests:
+- ### FILE: header extraction
+- Unified diff block extraction and action detection
+- Code block fallback with filename hints
+- Filename extraction from user requests
+- Verification step extraction
+- Context string construction
+- LLM instance reuse
+- Reviewer syntax gate
+- Simple request detection
+- Step prompt cache breakpoints
+- CrewAI rate-limit hook
+"""
+
+import asyncio
+import weakref
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.tools import builder_crew
+from src.tools.builder_crew import (
+    _build_context_string,
+    _create_llm,
+    _extract_filename_from_request,
+    _extract_patches_from_text,
+    _extract_verification_steps,
+    _is_simple_request,
+    _parse_crew_output,
+    _review_can_be_skipped,
+    _step_prompt,
+    _throttle_crew_llm_call,
+)
+
+
+class TestExtractPatches:
+    """Tests for _extract_patches_from_text."""
+
+    def test_file_headers(self):
+        """### FILE: headers yield one create patch per file."""
+        text = (
+            "Here you go.\n\n"
+            "### FILE: src/timer.st\n```st\nVAR\n    T1 : TON;\nEND_VAR\n```\n\n"
+            "### FILE: main.py\n```python\nprint('hi')\n```\n"
+        )
+
+        patches = _extract_patches_from_text(text)
+
+        assert [p["file_path"] for p in patches] == ["src/timer.st", "main.py"]
+        assert patches[0]["content"] == "VAR\n    T1 : TON;\nEND_VAR"
+        assert patches[1]["content"] == "print('hi')"
+        assert all(p["action"] == "create" and p["diff"] is None for p in patches)
+
+    def test_file_headers_take_priority(self):
+        """When headers are present, other code blocks are ignored."""
+        text = (
+            "```python\nimport os\n```\n"
+            "### FILE: app.py\n```python\nx = 1\n```\n"
+        )
+
+        patches = _extract_patches_from_text(text)
+
+        assert [p["file_path"] for p in patches] == ["app.py"]
+
+    def test_file_header_without_fence_is_skipped(self):
+        """A header followed by prose instead of a fence does not steal a later block."""
+        text = (
+            "### FILE: notes.md\nSee below.\n\n"
+            "### FILE: app.py\n```python\nx = 1\n```\n"
+            "### FILE: broken.py\n```python\nunterminated"
+        )
+
+        patches = _extract_patches_from_text(text)
+
+        assert [p["file_path"] for p in patches] == ["app.py"]
+
+    def test_diff_blocks(self):
+        """```diff blocks yield patches with actions from their headers."""
+        text = (
+            "```diff\n--- a/src/main.st\n+++ b/src/main.st\n@@ -1 +1 @@\n-old\n+new\n```\n"
+            "```diff\n--- /dev/null\n+++ b/new.st\nnew file mode 100644\n@@ -0,0 +1 @@\n+x\n```\n"
+            "```diff\n--- a/old.st\n+++ /dev/null\n@@ -1 +0,0 @@\n-x\n```\n"
+        )
+
+        patches = _extract_patches_from_text(text)
+
+        assert [p["action"] for p in patches] == ["modify", "create", "delete"]
+        assert patches[0]["file_path"] == "src/main.st"
+        assert patches[1]["file_path"] == "new.st"
+        assert patches[2]["file_path"] == "old.st"
+        assert patches[0]["diff"].startswith("--- a/src/main.st")
+
+    def test_code_block_with_file_comment(self):
+        """A leading '# File: name' comment names the file."""
+        text = "```python\n# File: utils.py\ndef f():\n    pass\n```\n"
+
+        patches = _extract_patches_from_text(text)
+
+        assert patches[0]["file_path"] == "utils.py"
+        assert patches[0]["content"] == "def f():\n    pass"
+
+    def test_code_block_filename_from_request(self):
+        """Without hints in the text, the filename comes from the request."""
+        text = "```python\nprint('snake')\n```\n"
+
+        patches = _extract_patches_from_text(text, original_request="Create a game called snake.py")
+
+        assert patches[0]["file_path"] == "snake.py"
+
+    def test_code_block_filename_near_block(self):
+        """A filename mentioned just before the block is used as a fallback."""
+        text = "Save this as `helper.js`:\n\n```javascript\nconsole.log('hello world');\n```\n"
+
+        patches = _extract_patches_from_text(text, original_request="Add logging")
+
+        assert patches[0]["file_path"] == "helper.js"
+
+    def test_nearby_filename_uses_each_block_position(self):
+        """Identical blocks still pick up the filename written before each one."""
+        block = "```python\nprint('same body')\n```\n"
+        text = "First, a.py:\n" + block + "\n" + "x" * 600 + "\nThen b.py:\n" + block
+
+        patches = _extract_patches_from_text(text, original_request="Add logging")
+
+        assert [p["file_path"] for p in patches] == ["a.py", "b.py"]
+
+    def test_code_block_default_filename(self):
+        """With no filename anywhere, a default is derived from the language."""
+        text = "```python\nx = 1\n```\n"
+
+        patches = _extract_patches_from_text(text, original_request="Add a variable")
+
+        assert patches[0]["file_path"] == "generated_code.py"
+
+    def test_patch_count_is_capped(self):
+        """Pathological outputs stop at MAX_PATCHES blocks."""
+        diff = "```diff\n--- a/f{0}.st\n+++ b/f{0}.st\n@@ -1 +1 @@\n-a\n+b\n```\n"
+        text = "".join(diff.format(i) for i in range(builder_crew.MAX_PATCHES + 10))
+
+        patches = _extract_patches_from_text(text)
+
+        assert len(patches) == builder_crew.MAX_PATCHES
+        assert patches[-1]["file_path"] == f"f{builder_crew.MAX_PATCHES - 1}.st"
+
+    def test_no_code(self):
+        """Plain prose yields no patches."""
+        assert _extract_patches_from_text("Nothing to see here.") == []
+
+
+class TestParseCrewOutput:
+    """Tests for _parse_crew_output."""
+
+    def test_oversized_output_keeps_tail(self):
+        text = (
+            "### FILE: early.py\n```python\ny = 2\n```\n"
+            + "noise line\n" * 30_000
+            + "### FILE: a.py\n```python\nx = 1\n```\n"
+        )
+
+        result = _parse_crew_output(SimpleNamespace(raw=text), "Add x")
+
+        assert [p["file_path"] for p in result["patch_plans"]] == ["a.py"]
+
+
+class TestExtractFilenameFromRequest:
+    """Tests for _extract_filename_from_request."""
+
+    def test_named_file(self):
+        assert _extract_filename_from_request("Write a script called snake_6.py") == "snake_6.py"
+
+    def test_verb_then_file(self):
+        assert _extract_filename_from_request("create a simple game.js for me") == "game.js"
+
+    def test_targeted_before_bare(self):
+        """A file after a leading verb wins over one mentioned earlier."""
+        assert _extract_filename_from_request("Like utils.py, write a small helper io.py") == "io.py"
+
+    def test_file_anywhere(self):
+        assert _extract_filename_from_request("Fix the bug in conveyor.st") == "conveyor.st"
+
+    def test_default_by_keyword(self):
+        assert _extract_filename_from_request("Build a react widget") == "generated_code.ts"
+        assert _extract_filename_from_request("Do something") == "generated_code.py"
+
+
+class TestExtractVerificationSteps:
+    """Tests for _extract_verification_steps."""
+
+    def test_numbered_steps(self):
+        text = "Verification:\n1. Run the tests\n2. Check the timer\n\nDone."
+
+        assert _extract_verification_steps(text) == ["Run the tests", "Check the timer"]
+
+    def test_step_count_is_capped(self):
+        text = "Verification:\n" + "".join(f"{i}. Step {i}\n" for i in range(1, 50))
+
+        assert len(_extract_verification_steps(text)) == builder_crew.MAX_VERIFICATION_STEPS
+
+    def test_fallback_steps(self):
+        steps = _extract_verification_steps("no steps")
+
+        assert len(steps) == 3
+
+
+class TestBuildContextString:
+    """Tests for _build_context_string."""
+
+    def test_stable_across_order_and_timestamps(self):
+        """Same logical context renders byte-identical output."""
+        first = _build_context_string(Path("/ws"), {
+            "workspace_summary": "Indexed at 2026-01-02T10:11:12Z  \n3 files",
+            "active_files": ["b.st", "a.st"],
+        })
+        second = _build_context_string(Path("/ws"), {
+            "workspace_summary": "Indexed at 2026-03-04 08:00:00\n3 files",
+            "active_files": ["a.st", "b.st"],
+        })
+
+        assert first == second
+        assert "Indexed at <timestamp>\n3 files" in first
+        assert first.index("- a.st") < first.index("- b.st")
+
+    def test_sections_trimmed_to_budget(self, tmp_path):
+        """Over budget: summary keeps head and tail, files keep the newest, changes keep the last."""
+        import os
+
+        for i in range(40):
+            path = tmp_path / f"module_{i:02d}.py"
+            path.write_text("")
+            os.utime(path, (i, i))
+
+        result = _build_context_string(tmp_path, {
+            "workspace_summary": "HEAD " + "filler words " * 500 + "TAIL",
+            "active_files": [f"module_{i:02d}.py" for i in range(40)],
+            "recent_changes": [f"change number {i}" for i in range(100)],
+        }, budget_tokens=150)
+
+        assert "HEAD" in result and "TAIL" in result and "[truncated]" in result
+        assert "- module_39.py" in result and "- module_00.py" not in result
+        assert "- change number 99" in result and "- change number 0\n" not in result
+
+    def test_cached_render_follows_file_edits(self, tmp_path):
+        """Repeated calls reuse the render, but a touched file is re-ranked."""
+        import os
+
+        for i in range(40):
+            path = tmp_path / f"module_{i:02d}.py"
+            path.write_text("")
+            os.utime(path, (i + 10, i + 10))
+        context = {"active_files": [f"module_{i:02d}.py" for i in range(40)]}
+
+        first = _build_context_string(tmp_path, context, budget_tokens=150)
+        assert _build_context_string(tmp_path, context, budget_tokens=150) is first
+
+        os.utime(tmp_path / "module_00.py", (1000, 1000))
+        assert "- module_00.py" in _build_context_string(tmp_path, context, budget_tokens=150)
+
+    def test_recent_changes_keep_order(self):
+        """Recent changes are listed in the order given."""
+        result = _build_context_string(Path("/ws"), {"recent_changes": ["second", "first"]})
+
+        assert result.index("- second") < result.index("- first")
+
+
+class TestCreateLLM:
+    """Tests for _create_llm instance reuse."""
+
+    def test_reuses_instance_per_model_and_key(self, monkeypatch):
+        """Same provider/model/key returns the same object; a new key does not."""
+        created = []
+
+        def fake_instantiate(provider, model, api_key):
+            created.append((provider, model, api_key))
+            return object()
+
+        monkeypatch.setattr(builder_crew, "_instantiate_llm", fake_instantiate)
+        monkeypatch.setattr(builder_crew, "_LLM_CACHE", weakref.WeakKeyDictionary())
+        settings = {"api_keys": {"openai": "sk-one"}}
+
+        async def run():
+            first = _create_llm("gpt-4o", settings)
+            second = _create_llm("gpt-4o", settings)
+            third = _create_llm("gpt-4o", {"api_keys": {"openai": "sk-two"}})
+            return first, second, third
+
+        first, second, third = asyncio.run(run())
+
+        assert first is second
+        assert third is not first
+        assert len(created) == 2
+
+    def test_not_shared_across_event_loops(self, monkeypatch):
+        """Each event loop gets its own instance, as do callers outside a loop."""
+        monkeypatch.setattr(builder_crew, "_instantiate_llm", lambda provider, model, api_key: object())
+        monkeypatch.setattr(builder_crew, "_LLM_CACHE", weakref.WeakKeyDictionary())
+        settings = {"api_keys": {"openai": "sk-one"}}
+
+        async def run():
+            return _create_llm("gpt-4o", settings)
+
+        assert asyncio.run(run()) is not asyncio.run(run())
+        assert _create_llm("gpt-4o", settings) is not _create_llm("gpt-4o", settings)
+
+    def test_evicts_least_recently_used(self, monkeypatch):
+        monkeypatch.setattr(builder_crew, "_instantiate_llm", lambda provider, model, api_key: object())
+        monkeypatch.setattr(builder_crew, "_LLM_CACHE", weakref.WeakKeyDictionary())
+        monkeypatch.setattr(builder_crew, "_LLM_CACHE_MAX_ENTRIES", 2)
+        settings = {"api_keys": {"openai": "sk-one"}}
+
+        async def run():
+            first = _create_llm("gpt-4o", settings)
+            _create_llm("gpt-4o-mini", settings)
+            _create_llm("gpt-4o", settings)
+            _create_llm("gpt-4.1", settings)
+
+            assert _create_llm("gpt-4o", settings) is first
+            loop_cache = builder_crew._LLM_CACHE[asyncio.get_running_loop()]
+            assert [key[1] for key in loop_cache] == ["gpt-4.1", "gpt-4o"]
+
+        asyncio.run(run())
+
+    def test_missing_key(self):
+        assert _create_llm("claude-sonnet-4.5", {"api_keys": {}}) is None
+
+
+class TestReviewGate:
+    """Tests for _review_can_be_skipped."""
+
+    @staticmethod
+    def _patch(file_path, content):
+        return {"file_path": file_path, "content": content, "diff": None, "action": "create"}
+
+    def test_clean_files_skip(self):
+        assert _review_can_be_skipped([
+            self._patch("a.py", "def f():\n    return 1\n"),
+            self._patch("b.ts", "const s = '}';\nfunction g() { return [1, 2]; }\n"),
+        ])
+
+    def test_structured_text_blocks(self):
+        good = "VAR_INPUT\n  x : INT;\nEND_VAR\nIF x > 0 THEN (* IF *)\n  y := 1;\nELSIF x < 0 THEN\n  y := 2;\nEND_IF;"
+        assert _review_can_be_skipped([self._patch("a.st", good)])
+        assert not _review_can_be_skipped([self._patch("a.st", "VAR\nIF x THEN\nEND_VAR")])
+
+    def test_suspect_output_is_reviewed(self):
+        assert not _review_can_be_skipped([self._patch("a.py", "def f(:\n")])
+        assert not _review_can_be_skipped([self._patch("a.js", "function f() {")])
+        assert not _review_can_be_skipped([self._patch("notes.md", "text")])
+        assert not _review_can_be_skipped([{"file_path": "a.st", "diff": "--- a/a.st", "action": "modify"}])
+        assert not _review_can_be_skipped([self._patch(f"m{i}.py", "x = 1") for i in range(3)])
+
+
+class TestIsSimpleRequest:
+    """Tests for _is_simple_request."""
+
+    def test_short_request_with_one_file(self):
+        assert _is_simple_request("Add a timer", {"active_files": ["main.st"]})
+        assert not _is_simple_request("Add a timer", {"active_files": ["a.st", "b.st"]})
+        assert not _is_simple_request("x" * builder_crew.SIMPLE_REQUEST_MAX_CHARS, {})
+
+    def test_string_context(self):
+        """A raw string context is treated as having no active files."""
+        assert _is_simple_request("Add a timer", "Project uses Structured Text")
+
+
+class TestStepPrompt:
+    """Tests for _step_prompt."""
+
+    def test_anthropic_system_prompt_is_cache_breakpoint(self):
+        messages = _step_prompt("SYSTEM", "anthropic").format_messages(task="do it")
+
+        assert messages[0].content == [
+            {"type": "text", "text": "SYSTEM", "cache_control": {"type": "ephemeral"}}
+        ]
+        assert messages[1].content == "do it"
+
+    def test_other_providers_use_plain_static_prefix(self):
+        messages = _step_prompt("SYSTEM {not a variable}", "openai").format_messages(task="do it")
+
+        assert messages[0].content == "SYSTEM {not a variable}"
+
+
+class TestCrewRateLimitHook:
+    """Tests for _throttle_crew_llm_call."""
+
+    def test_charges_provider_limiter(self, monkeypatch):
+        charged = []
+
+        class FakeLimiter:
+            def acquire_blocking(self, tokens):
+                charged.append(tokens)
+
+        monkeypatch.setattr(builder_crew, "get_rate_limiter", lambda provider: charged.append(provider) or FakeLimiter())
+        context = SimpleNamespace(
+            llm=SimpleNamespace(model="anthropic/claude-sonnet-4.5"),
+            messages=[{"role": "user", "content": "hello"}],
+        )
+
+        _throttle_crew_llm_call(context)
+
+        assert charged[0] == "anthropic"
+        assert charged[1] > builder_crew.MAX_TOKENS_PER_AGENT
@@ -0,0 +1,94 @@
+"""
+Tests for src/tools/deps.py - Dependency detection.
+
+Tests:
+- Marker file detection from a single root scan
+- Venv directory detection
+- Aggregated dependency_manager output
+- Result memoization per root mtime
+"""
+
+import os
+
+from src.tools import deps
+from src.tools.deps import (
+    _scan_root,
+    dependency_manager,
+    detect_java_tooling,
+    detect_node_tooling,
+    detect_python_tooling,
+)
+
+
+class TestScanRoot:
+    """Tests for _scan_root."""
+
+    def test_names_and_dirs(self, tmp_path):
+        (tmp_path / "package.json").write_text("{}")
+        (tmp_path / ".venv").mkdir()
+
+        names, dirs = _scan_root(tmp_path)
+
+        assert names == {"package.json", ".venv"}
+        assert dirs == {".venv"}
+
+    def test_missing_root_is_empty(self, tmp_path):
+        assert _scan_root(tmp_path / "missing") == (frozenset(), frozenset())
+
+
+class TestDetectors:
+    """Tests for the per-ecosystem detectors."""
+
+    def test_node_and_java_markers(self, tmp_path):
+        for name in ("package.json", "yarn.lock", "build.gradle.kts"):
+            (tmp_path / name).write_text("")
+
+        node = detect_node_tooling(tmp_path)
+        java = detect_java_tooling(tmp_path)
+
+        assert node["has_package_json"] and node["has_yarn_lock"]
+        assert node["proposals"][0]["command"] == "yarn install"
+        assert java["has_gradle"] and not java["has_maven"]
+
+    def test_venv_must_be_a_directory(self, tmp_path):
+        (tmp_path / "venv").write_text("not a directory")
+
+        assert detect_python_tooling(tmp_path)["has_venv"] is False
+
+    def test_snapshot_is_used_instead_of_scanning(self, tmp_path):
+        snapshot = (frozenset({"pom.xml"}), frozenset())
+
+        assert detect_java_tooling(tmp_path, snapshot)["has_maven"] is True
+
+
+class TestDependencyManager:
+    """Tests for dependency_manager."""
+
+    def test_detected_summary(self, tmp_path):
+        (tmp_path / "package.json").write_text("{}")
+        (tmp_path / "pom.xml").write_text("")
+
+        result = dependency_manager(tmp_path)
+
+        assert result["detected"] == {"python": False, "node": True, "java": True}
+        assert result["safe_to_install"] is True
+        assert [p["command"] for p in result["proposals"]] == ["npm install"]
+
+    def test_memoized_until_root_changes(self, tmp_path, monkeypatch):
+        dependency_manager.cache_clear()
+        scans = []
+        real_scan = deps._scan_root
+        monkeypatch.setattr(deps, "_scan_root", lambda root: scans.append(root) or real_scan(root))
+
+        first = dependency_manager(tmp_path)
+        first["proposals"].append("mutated")
+        second = dependency_manager(tmp_path)
+
+        assert len(scans) == 1
+        assert second["proposals"] == []
+
+        (tmp_path / "package.json").write_text("{}")
+        os.utime(tmp_path, ns=(0, tmp_path.stat().st_mtime_ns + 10**9))
+
+        assert dependency_manager(tmp_path)["detected"]["node"] is True
+        assert len(scans) == 2
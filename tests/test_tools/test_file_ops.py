@@ -7,11 +7,15 @@ Tests:
 - Delete file operations
 - List directory operations
 - Guardrail integration (boundary enforcement)
+- FileManager reuse per project root
 """
 
+import os
 from unittest.mock import MagicMock
 
-from src.tools.file_ops import manage_file_ops
+from src.core.file_manager import WRITE_CHUNK_CHARS
+from src.tools import file_ops
+from src.tools.file_ops import clear_file_manager_cache, manage_file_ops
 
 
 class TestReadOperations:
@@ -96,6 +100,20 @@ class TestWriteOperations:
         assert new_file.exists()
         assert "NewProgram" in new_file.read_text()
 
+    def test_write_large_content(self, temp_workspace):
+        """Test that content spanning several write chunks round-trips."""
+        content = "x" * (3 * WRITE_CHUNK_CHARS + 7) + "\n€"
+
+        result = manage_file_ops(
+            operation="write",
+            path="large.txt",
+            project_root=temp_workspace,
+            content=content
+        )
+
+        assert result["status"] == "success"
+        assert (temp_workspace / "large.txt").read_text(encoding="utf-8") == content
+
     def test_write_without_content_fails(self, temp_workspace):
         """Test that write without content returns error."""
         result = manage_file_ops(
@@ -149,6 +167,40 @@ class TestWriteOperations:
         assert result["status"] == "success"
         mock_rag.update_file.assert_called_once()
 
+    def test_identical_write_skips_disk_and_rag(self, temp_workspace):
+        """Test that rewriting identical content is a no-op."""
+        target = temp_workspace / "same.st"
+        target.write_bytes(b"PROGRAM Same\nEND_PROGRAM\n")
+        mtime_ns = target.stat().st_mtime_ns
+        mock_rag = MagicMock()
+
+        result = manage_file_ops(
+            operation="write",
+            path="same.st",
+            project_root=temp_workspace,
+            content="PROGRAM Same\nEND_PROGRAM\n",
+            rag_manager=mock_rag
+        )
+
+        assert result["status"] == "success"
+        assert "no changes" in result["summary"].lower()
+        assert target.stat().st_mtime_ns == mtime_ns
+        mock_rag.update_file.assert_not_called()
+
+    def test_line_ending_change_is_written(self, temp_workspace):
+        """Test that content differing only in line endings is still written."""
+        target = temp_workspace / "crlf.st"
+        target.write_bytes(b"a\r\nb\r\n")
+
+        manage_file_ops(
+            operation="write",
+            path="crlf.st",
+            project_root=temp_workspace,
+            content="a\nb\n"
+        )
+
+        assert target.read_bytes() == "a\nb\n".replace("\n", os.linesep).encode()
+
 
 class TestDeleteOperations:
     """Tests for file delete operations."""
@@ -239,6 +291,39 @@ class TestListOperations:
         assert result["status"] == "error"
         assert "not a directory" in result["summary"].lower()
 
+    def test_list_is_sorted_and_capped(self, temp_workspace):
+        """Test that only the first 100 names are shown, with a total count."""
+        big = temp_workspace / "big"
+        big.mkdir()
+        (big / "a_dir").mkdir()
+        for i in range(120):
+            (big / f"f{i:03d}.st").write_text("")
+
+        result = manage_file_ops(
+            operation="list",
+            path="big",
+            project_root=temp_workspace
+        )
+
+        lines = result["content"].splitlines()
+        assert lines[0] == "📁 a_dir/"
+        assert lines[1] == "📄 f000.st"
+        assert lines[99] == "📄 f098.st"
+        assert lines[100] == "... (21 more items)"
+        assert result["summary"] == "Listed 121 items in big"
+
+    def test_list_symlinked_directory_as_directory(self, temp_workspace):
+        """Test that a symlink to a directory is shown as a directory."""
+        (temp_workspace / "linked").symlink_to(temp_workspace / "src", target_is_directory=True)
+
+        result = manage_file_ops(
+            operation="list",
+            path=".",
+            project_root=temp_workspace
+        )
+
+        assert "📁 linked/" in result["content"].splitlines()
+
 
 class TestBoundaryEnforcement:
     """Tests for project-root boundary enforcement."""
@@ -278,3 +363,36 @@ class TestInvalidOperations:
 
         assert result["status"] == "error"
         assert "unknown operation" in result["summary"].lower()
+
+
+class TestFileManagerCache:
+    """Tests for FileManager reuse across operations."""
+
+    def test_one_manager_per_root(self, temp_workspace, monkeypatch):
+        clear_file_manager_cache()
+        created = []
+        real_cls = file_ops.FileManager
+        monkeypatch.setattr(file_ops, "FileManager", lambda root: created.append(root) or real_cls(root))
+
+        manage_file_ops(operation="read", path="main.st", project_root=temp_workspace)
+        manage_file_ops(operation="list", path=".", project_root=temp_workspace)
+
+        assert created == [str(temp_workspace)]
+        clear_file_manager_cache()
+
+    def test_binary_sniff_cached_until_file_changes(self, temp_workspace, monkeypatch):
+        clear_file_manager_cache()
+        sniffed = []
+        real_sniff = file_ops.is_file_binary
+        monkeypatch.setattr(file_ops, "is_file_binary", lambda p: sniffed.append(p) or real_sniff(p))
+
+        manage_file_ops(operation="read", path="main.st", project_root=temp_workspace)
+        manage_file_ops(operation="read", path="main.st", project_root=temp_workspace)
+        assert len(sniffed) == 1
+
+        (temp_workspace / "main.st").write_text("changed content, different size")
+        result = manage_file_ops(operation="read", path="main.st", project_root=temp_workspace)
+
+        assert len(sniffed) == 2
+        assert result["content"] == "changed content, different size"
+        clear_file_manager_cache()
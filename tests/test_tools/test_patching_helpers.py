@@ -0,0 +1,319 @@
+"""
+Tests for the helpers in src/tools/patching.py.
+
+Tests:
+- Search/replace block parsing
+- Fuzzy search/replace matching
+- Diff statistics
+- Unified diff generation
+- File read cache
+- Unified diff application
+- Diff header metadata
+- Patch execution writes
+"""
+
+import difflib
+
+from src.tools.patching import (
+    apply_search_replace,
+    calculate_diff_stats,
+    generate_unified_diff,
+    parse_search_replace_blocks,
+)
+from src.agents.state import PatchPlan
+from src.core.file_manager import WRITE_CHUNK_CHARS
+from src.tools import patching
+
+
+SAMPLE_SR_BLOCKS = """Some prose first.
+
+main.st
+<<<<<<< SEARCH
+    x : BOOL;
+=======
+    x : INT;
+>>>>>>> REPLACE
+
+src/utils.st
+<<<<<<< SEARCH
+old
+=======
+new
+>>>>>>> REPLACE
+"""
+
+
+class TestParseSearchReplaceBlocks:
+    """Tests for parse_search_replace_blocks."""
+
+    def test_parses_all_blocks(self):
+        blocks = parse_search_replace_blocks(SAMPLE_SR_BLOCKS)
+
+        assert [b["file_path"] for b in blocks] == ["main.st", "src/utils.st"]
+        assert blocks[0]["search"] == "    x : BOOL;"
+        assert blocks[0]["replace"] == "    x : INT;"
+
+    def test_text_without_markers(self):
+        assert parse_search_replace_blocks("--- a/main.st\n+++ b/main.st\n") == []
+
+
+class TestApplySearchReplace:
+    """Tests for apply_search_replace."""
+
+    def test_fuzzy_match_ignores_trailing_whitespace(self):
+        content = "x\nfoo  \nbar\nfoo\nbaz \n"
+
+        new_content, ok = apply_search_replace(content, "foo \nbaz", "Q")
+
+        assert ok is True
+        assert new_content == "x\nfoo  \nbar\nQ"
+
+    def test_fuzzy_match_skips_partial_candidates(self):
+        content = "\n".join(["a", "b", "a", "c"] * 3 + ["a ", "d"])
+
+        new_content, ok = apply_search_replace(content, "a\nd", "Q")
+
+        assert ok is True
+        assert new_content.endswith("c\nQ")
+
+    def test_exact_match_replaces_first_occurrence_only(self):
+        assert apply_search_replace("a b a", "a", "X") == ("X b a", True)
+
+    def test_no_match(self):
+        assert apply_search_replace("a\nb", "c", "Q") == ("a\nb", False)
+        assert apply_search_replace("a\nb", "a ", "Q", fuzzy=False) == ("a\nb", False)
+
+
+class TestCalculateDiffStats:
+    """Tests for calculate_diff_stats."""
+
+    def test_new_file_counts_all_line_endings(self):
+        assert calculate_diff_stats("", "a\nb\r\nc\rd") == (4, 0)
+        assert calculate_diff_stats("  \n", "a\nb\n") == (2, 0)
+
+    def test_cleared_file(self):
+        assert calculate_diff_stats("a\r\nb\r\n", "") == (0, 2)
+
+    def test_fast_paths_count_other_line_boundaries_like_splitlines(self):
+        text = "a\fb\nc\u2028d\x85e\n"
+        expected = len(text.splitlines())
+
+        assert calculate_diff_stats("", text) == (expected, 0)
+        assert calculate_diff_stats(text, "") == (0, expected)
+
+    def test_both_blank(self):
+        assert calculate_diff_stats("", "\n\n") == (0, 0)
+
+    def test_modification_ignores_crlf(self):
+        assert calculate_diff_stats("a\r\nb\r\nc\r\n", "a\nB\nc\nd\n") == (2, 1)
+
+    def test_append_only_skips_matcher(self, monkeypatch):
+        monkeypatch.setattr(difflib, "SequenceMatcher", None)
+        original = "".join(f"line {i}\n" for i in range(500))
+
+        assert calculate_diff_stats(original, original + "x\ny\n") == (2, 0)
+        assert calculate_diff_stats(original, original[:-len("line 499\n")]) == (0, 1)
+
+    def test_change_inside_common_prefix_and_suffix(self):
+        original = "a\nb\nc\nd\ne\n"
+        assert calculate_diff_stats(original, "a\nb\nX\nY\nd\ne\n") == (2, 1)
+        assert calculate_diff_stats("a\na\n", "a\na\na\n") == (1, 0)
+
+    def test_normalized_split_is_memoized(self):
+        patching._split_normalized_cached.cache_clear()
+        original, new = "a\r\nb\r\nc\r\n", "a\nB\nc\n"
+
+        assert calculate_diff_stats(original, new) == (1, 1)
+        assert calculate_diff_stats(original, new) == (1, 1)
+
+        info = patching._split_normalized_cached.cache_info()
+        assert (info.misses, info.hits) == (2, 2)
+
+
+class TestGenerateUnifiedDiff:
+    """Tests for generate_unified_diff."""
+
+    def _difflib_diff(self, original, new_content):
+        return "".join(difflib.unified_diff(
+            original.splitlines(keepends=True),
+            new_content.splitlines(keepends=True),
+            fromfile="a/f.st",
+            tofile="b/f.st",
+        ))
+
+    def test_new_and_cleared_files_match_difflib(self):
+        for original, new_content in [
+            ("", "a"),
+            ("", "a\nb\n"),
+            ("", "a\r\nb"),
+            ("x\n", ""),
+            ("x\ny", ""),
+            ("", ""),
+        ]:
+            assert generate_unified_diff(original, new_content, "f.st") == self._difflib_diff(original, new_content)
+
+    def test_modifications_match_difflib(self):
+        original = "".join(f"line {i}\n" for i in range(30))
+        for new_content in [
+            original.replace("line 3\n", "LINE 3\n").replace("line 25\n", ""),
+            "head\n" + original + "tail",
+            original.replace("line 10\n", "line 10\nline 10\n"),
+        ]:
+            assert generate_unified_diff(original, new_content, "f.st") == self._difflib_diff(original, new_content)
+
+    def test_identical_contents(self):
+        assert generate_unified_diff("a\nb\n", "a\nb\n", "f.st") == ""
+
+    def test_new_file_header(self):
+        assert generate_unified_diff("", "a\nb\n", "f.st") == (
+            "--- a/f.st\n+++ b/f.st\n@@ -0,0 +1,2 @@\n+a\n+b\n"
+        )
+
+
+class TestReadTextCache:
+    """Tests for the (path, mtime, size) file read cache."""
+
+    def test_reuses_text_until_file_changes(self, tmp_path):
+        patching._read_text_cached.cache_clear()
+        target = tmp_path / "main.st"
+        target.write_text("PROGRAM Main\n", encoding="utf-8")
+
+        assert patching._read_text(target) == "PROGRAM Main\n"
+        assert patching._read_text(target) == "PROGRAM Main\n"
+        assert patching._read_text_cached.cache_info().hits == 1
+
+        target.write_text("PROGRAM Main\nEND_PROGRAM\n", encoding="utf-8")
+        assert patching._read_text(target) == "PROGRAM Main\nEND_PROGRAM\n"
+
+    def test_missing_file(self, tmp_path):
+        assert patching._read_text(tmp_path / "missing.st") is None
+        assert patching._read_original(tmp_path / "missing.st") == ("", "create")
+
+
+class TestApplyDiffUnidiff:
+    """Tests for _apply_diff_unidiff."""
+
+    def test_multiple_hunks(self):
+        original = [f"line {i}\n" for i in range(40)]
+        new = list(original)
+        new[2] = "changed 2\n"
+        new.insert(20, "inserted\n")
+        del new[35]
+        diff = "".join(difflib.unified_diff(original, new, "a/f.st", "b/f.st"))
+
+        assert diff.count("@@ -") == 3
+        assert patching._apply_diff_unidiff(diff, "".join(original)) == "".join(new)
+
+    def test_new_file_takes_added_lines(self):
+        diff = "--- /dev/null\n+++ b/new.st\n@@ -0,0 +1,2 @@\n+PROGRAM New\n+END_PROGRAM\n"
+
+        assert patching._apply_diff_unidiff(diff, "") == "PROGRAM New\nEND_PROGRAM"
+
+    def test_crlf_lines_are_preserved(self):
+        original = ["a\r\n", "b\r\n", "c\r\n"]
+        new = ["a\r\n", "B\r\n", "c\r\n"]
+        diff = "".join(difflib.unified_diff(original, new, "a/f.st", "b/f.st"))
+
+        assert patching._apply_diff_unidiff(diff, "".join(original)) == "".join(new)
+
+
+class TestApplyDiffSimple:
+    """Tests for the _apply_diff_simple fallback."""
+
+    DIFF = "--- a/f.st\n+++ b/f.st\n@@ -1,2 +1,2 @@\n keep\n-old\n+new\n++plus\n"
+
+    def test_new_file_takes_additions_only(self):
+        assert patching._apply_diff_simple(self.DIFF, "") == "new\n+plus"
+
+    def test_modification_takes_additions_and_context(self):
+        assert patching._apply_diff_simple(self.DIFF, "keep\nold\n") == "keep\nnew\n+plus"
+
+
+class TestParseDiffMetadata:
+    """Tests for _parse_diff_metadata."""
+
+    def test_prefix_removed_once(self):
+        diff = "--- a/aardvark.st\n+++ b/b/bison.st\n@@ -1 +1 @@\n-x\n+y\n"
+
+        assert patching._parse_diff_metadata(diff) == (["b/bison.st"], "b/bison.st", "modify")
+
+    def test_create_and_delete(self):
+        create = "--- /dev/null\n+++ b/new.st\n@@ -0,0 +1 @@\n+x\n"
+        delete = "--- a/old.st\n+++ /dev/null\n@@ -1 +0,0 @@\n-x\n"
+
+        assert patching._parse_diff_metadata(create) == (["new.st"], "new.st", "create")
+        assert patching._parse_diff_metadata(delete) == (["old.st"], "old.st", "delete")
+
+
+class TestExecutePatchWrite:
+    """Tests for the write step of execute_patch."""
+
+    def _plan(self, file_path, new_content):
+        return PatchPlan(
+            file_path=file_path,
+            diff="",
+            rationale="test",
+            action="create",
+            patched_content=new_content,
+        )
+
+    def test_large_content_round_trips(self, temp_workspace):
+        new_content = "x" * (2 * WRITE_CHUNK_CHARS + 3) + "\nEND"
+        plan = self._plan("big.st", new_content)
+
+        result = patching.execute_patch(plan, temp_workspace)
+
+        assert result["status"] == "success"
+        assert (temp_workspace / "big.st").read_text(encoding="utf-8") == new_content
+
+    def test_verification_compares_written_hash(self, temp_workspace, monkeypatch):
+        monkeypatch.setattr(patching, "_file_sha256", lambda path: b"corrupted")
+
+        failed = patching.execute_patch(self._plan("a.st", "A\n"), temp_workspace, verify=True)
+        unverified = patching.execute_patch(self._plan("b.st", "B\n"), temp_workspace, verify=False)
+
+        assert failed["error"] == "Content mismatch after write"
+        assert unverified["status"] == "success"
+
+    def test_verification_default_by_size_and_env(self, temp_workspace, monkeypatch):
+        hashed = []
+        real_sha256 = patching._file_sha256
+        monkeypatch.setattr(patching, "_file_sha256", lambda path: hashed.append(path.name) or real_sha256(path))
+        monkeypatch.delenv("PULSE_VERIFY_WRITES", raising=False)
+
+        patching.execute_patch(self._plan("small.st", "x\n"), temp_workspace)
+        patching.execute_patch(self._plan("large.st", "x" * patching.VERIFY_MIN_BYTES), temp_workspace)
+        monkeypatch.setenv("PULSE_VERIFY_WRITES", "1")
+        patching.execute_patch(self._plan("forced.st", "x\n"), temp_workspace)
+
+        assert hashed == ["large.st", "forced.st"]
+
+    def test_missing_project_root_is_not_created(self, tmp_path):
+        missing_root = tmp_path / "missing"
+
+        result = patching.execute_patch(self._plan("a.st", "A\n"), missing_root)
+
+        assert result["status"] == "error"
+        assert not missing_root.exists()
+
+    def test_summary_reuses_preview_counts(self, temp_workspace, monkeypatch):
+        plan = patching.preview_patch("", temp_workspace, content="A\nB\n", file_path="new.st")
+        monkeypatch.setattr(patching, "calculate_diff_stats", None)
+
+        result = patching.execute_patch(plan, temp_workspace)
+
+        assert result["summary"] == "Applied patch to new.st (+2 -0)"
+
+
+class TestPreviewContentWrite:
+    """Tests for preview_content_write."""
+
+    def test_identical_content_skips_diff_work(self, temp_workspace, monkeypatch):
+        current = (temp_workspace / "main.st").read_text(encoding="utf-8")
+        monkeypatch.setattr(patching, "calculate_diff_stats", None)
+        monkeypatch.setattr(patching, "generate_unified_diff", None)
+
+        plan = patching.preview_content_write("main.st", current, temp_workspace)
+
+        assert (plan.diff, plan.additions, plan.deletions) == ("", 0, 0)
+        assert plan.action == "modify"
@@ -0,0 +1,340 @@
+"""
+Tests for src/tools/rag.py - Workspace RAG indexing.
+
+Tests:
+- File hashing
+- Line-boundary chunking
+- Freshness snapshot loading and schema migration
+- Incremental index_workspace passes (Chroma collection mocked)
+- RAGManager reuse across search_workspace calls
+"""
+
+import hashlib
+import os
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from src.tools import rag as rag_module
+from src.tools.rag import RAGManager, clear_rag_manager_cache, search_workspace
+
+
+@pytest.fixture
+def rag(temp_workspace):
+    """RAGManager over temp_workspace with the Chroma collection mocked."""
+    manager = RAGManager(temp_workspace)
+    manager.collection = MagicMock()
+    manager.collection.get.return_value = {"ids": []}
+    return manager
+
+
+class TestComputeFileHash:
+    """Tests for RAGManager._compute_file_hash."""
+
+    def test_matches_sha256_of_bytes(self, rag, temp_workspace):
+        path = temp_workspace / "big.txt"
+        path.write_bytes(b"line\n" * 100_000)
+
+        assert rag._compute_file_hash(path) == hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def test_unreadable_file_hashes_empty(self, rag, temp_workspace):
+        assert rag._compute_file_hash(temp_workspace / "missing.txt") == ""
+
+
+class TestWalk:
+    """Tests for RAGManager._walk."""
+
+    def test_prunes_ignored_dirs_and_extensions(self, rag, temp_workspace):
+        (temp_workspace / "node_modules" / "pkg").mkdir(parents=True)
+        (temp_workspace / "node_modules" / "pkg" / "index.md").write_text("ignored")
+        (temp_workspace / "src" / "notes.md").write_text("kept")
+        (temp_workspace / "src" / "image.png").write_bytes(b"\x89PNG")
+        (temp_workspace / ".pulse" / "cache.txt").write_text("ignored")
+
+        found = {
+            path.relative_to(temp_workspace).as_posix(): (file_stat.st_size, path.stat().st_size)
+            for path, file_stat in rag._walk()
+        }
+
+        assert set(found) == {"main.st", "src/utils.st", "src/notes.md"}
+        assert all(walked == actual for walked, actual in found.values())
+
+    def test_ignored_dirs_are_never_listed(self, rag, temp_workspace, monkeypatch):
+        (temp_workspace / ".git" / "objects").mkdir(parents=True)
+        listed = []
+        real_scandir = os.scandir
+        monkeypatch.setattr("src.tools.rag.os.scandir", lambda p: listed.append(p) or real_scandir(p))
+
+        list(rag._walk())
+
+        assert sorted(os.path.basename(p) for p in listed) == ["src", "workspace"]
+
+
+class TestChunkFile:
+    """Tests for RAGManager._chunk_file."""
+
+    def test_chunks_split_at_line_boundaries(self, rag, temp_workspace):
+        path = temp_workspace / "long.st"
+        content = "\n".join(f"x := {i};" + " " * 40 for i in range(200)) + "\n"
+        path.write_text(content)
+
+        chunks = rag._chunk_file(path)
+
+        assert "\n".join(chunk["content"] for chunk in chunks) == content
+        assert all(len(chunk["content"]) <= RAGManager.MAX_CHUNK_SIZE for chunk in chunks)
+        assert [chunk["metadata"]["chunk_index"] for chunk in chunks] == list(range(len(chunks)))
+        assert {chunk["metadata"]["total_chunks"] for chunk in chunks} == {len(chunks)}
+
+    def test_overlong_line_is_its_own_chunk(self, rag, temp_workspace):
+        path = temp_workspace / "wide.st"
+        path.write_text("a\n" + "b" * 2000 + "\nc")
+
+        chunks = rag._chunk_file(path)
+
+        assert [chunk["content"] for chunk in chunks] == ["a", "b" * 2000, "c"]
+
+
+class TestPrepareFile:
+    """Tests for RAGManager._prepare_file."""
+
+    def test_single_read_matches_separate_passes(self, rag, temp_workspace):
+        path = temp_workspace / "crlf.st"
+        path.write_bytes(b"PROGRAM P\r\n" + b"x := 1;\r\n" * 400 + b"END_PROGRAM\r")
+
+        rel_path, chunks, content_hash, _ = rag._prepare_file(path)
+
+        assert rel_path == "crlf.st"
+        assert chunks == rag._chunk_file(path)
+        assert content_hash == rag._compute_file_hash(path)
+
+    def test_large_file_is_hashed_by_streaming(self, rag, temp_workspace, monkeypatch):
+        monkeypatch.setattr("src.tools.rag.SINGLE_READ_MAX_BYTES", 10)
+        monkeypatch.setattr("pathlib.Path.read_bytes", lambda self: pytest.fail("read whole file"))
+
+        _, chunks, content_hash, _ = rag._prepare_file(temp_workspace / "main.st")
+
+        assert chunks[0]["content"].startswith("\nPROGRAM Main")
+        assert content_hash == rag._compute_file_hash(temp_workspace / "main.st")
+
+
+class TestIndexWorkspace:
+    """Tests for RAGManager.index_workspace."""
+
+    def test_second_pass_skips_fresh_files(self, rag):
+        first = rag.index_workspace()
+        second = rag.index_workspace()
+
+        assert first == {"files_processed": 2, "chunks_created": 2, "files_skipped": 0}
+        assert second == {"files_processed": 0, "chunks_created": 0, "files_skipped": 2}
+        assert rag.collection.upsert.call_count == 1
+
+    def test_snapshot_holds_every_record(self, rag):
+        rag.index_workspace()
+
+        conn = rag._open_index_db()
+        try:
+            snapshot = rag._load_index_snapshot(conn)
+        finally:
+            conn.close()
+
+        assert set(snapshot) == {"main.st", "src/utils.st"}
+        assert snapshot["main.st"][2] == 1
+
+    def test_changed_file_is_reindexed(self, rag, temp_workspace):
+        rag.index_workspace()
+        (temp_workspace / "main.st").write_text("PROGRAM Changed\nEND_PROGRAM\n")
+
+        stats = rag.index_workspace()
+
+        assert stats["files_processed"] == 1
+        assert stats["files_skipped"] == 1
+        assert rag.collection.delete.call_args.kwargs["where"] == {"file_path": {"$in": ["main.st"]}}
+
+    def test_unchanged_mtime_and_size_skip_hashing(self, rag, monkeypatch):
+        rag.index_workspace()
+        hashed = []
+        monkeypatch.setattr(rag, "_compute_file_hash", lambda path: hashed.append(path) or "")
+
+        stats = rag.index_workspace()
+
+        assert stats["files_skipped"] == 2
+        assert hashed == []
+
+    def test_freshness_hash_is_reused_for_reindex(self, rag, temp_workspace, monkeypatch):
+        rag.index_workspace()
+        path = temp_workspace / "main.st"
+        mtime_ns = path.stat().st_mtime_ns
+        path.write_text("PROGRAM Edited\nEND_PROGRAM\n")
+        os.utime(path, ns=(mtime_ns, mtime_ns + 500_000_000))
+        hashed = []
+        real_hash = rag._compute_file_hash
+        monkeypatch.setattr(rag, "_compute_file_hash", lambda p: hashed.append(p.name) or real_hash(p))
+
+        stats = rag.index_workspace()
+
+        assert stats["files_processed"] == 1
+        assert hashed == ["main.st"]
+
+    def test_failed_file_does_not_stop_the_pass(self, rag, monkeypatch):
+        real_prepare = rag._prepare_file
+
+        def prepare(file_path, known_hash=None):
+            if file_path.name == "main.st":
+                raise OSError("unreadable")
+            return real_prepare(file_path, known_hash)
+
+        monkeypatch.setattr(rag, "_prepare_file", prepare)
+
+        stats = rag.index_workspace()
+
+        assert stats["files_processed"] == 1
+        assert rag.collection.upsert.call_args.kwargs["ids"] == ["src/utils.st::0"]
+
+    def test_upserts_are_batched_across_files(self, rag, temp_workspace, monkeypatch):
+        monkeypatch.setattr("src.tools.rag.UPSERT_BATCH_CHUNKS", 2)
+        for i in range(3):
+            (temp_workspace / f"extra_{i}.st").write_text(f"PROGRAM P{i}\nEND_PROGRAM\n")
+
+        stats = rag.index_workspace()
+
+        batches = [call.kwargs["ids"] for call in rag.collection.upsert.call_args_list]
+        assert stats["chunks_created"] == 5
+        assert [len(ids) for ids in batches] == [2, 2, 1]
+
+    def test_read_ahead_is_bounded(self, rag, temp_workspace, monkeypatch):
+        monkeypatch.setattr("src.tools.rag.INDEX_MAX_IN_FLIGHT", 2)
+        monkeypatch.setattr("src.tools.rag.UPSERT_BATCH_CHUNKS", 1)
+        for i in range(8):
+            (temp_workspace / f"extra_{i}.st").write_text(f"PROGRAM P{i}\nEND_PROGRAM\n")
+        outstanding = []
+        real_prepare, real_store = rag._prepare_file, rag._store_files
+
+        def prepare(file_path, known_hash=None):
+            outstanding.append(file_path)
+            return real_prepare(file_path, known_hash)
+
+        def store(prepared_files, conn=None):
+            peak.append(len(outstanding))
+            del outstanding[:len(prepared_files)]
+            return real_store(prepared_files, conn=conn)
+
+        peak = []
+        monkeypatch.setattr(rag, "_prepare_file", prepare)
+        monkeypatch.setattr(rag, "_store_files", store)
+
+        stats = rag.index_workspace()
+
+        assert stats["files_processed"] == 10
+        assert max(peak) <= 3
+
+    def test_sqlite_failure_skips_only_that_batch(self, rag, temp_workspace, monkeypatch):
+        monkeypatch.setattr("src.tools.rag.UPSERT_BATCH_CHUNKS", 1)
+        real_open = rag._open_index_db
+
+        class LockedOnce:
+            """Connection whose first executemany fails like a locked database."""
+
+            def __init__(self, conn):
+                self._conn = conn
+                self.failed = False
+
+            def executemany(self, sql, params):
+                if not self.failed:
+                    self.failed = True
+                    raise sqlite3.OperationalError("database is locked")
+                return self._conn.executemany(sql, params)
+
+            def __getattr__(self, name):
+                return getattr(self._conn, name)
+
+        monkeypatch.setattr(rag, "_open_index_db", lambda: LockedOnce(real_open()))
+
+        stats = rag.index_workspace()
+        retry = rag.index_workspace()
+
+        assert stats["files_processed"] == 2
+        assert stats["chunks_created"] == 1
+        assert retry["files_processed"] == 1
+
+
+class TestFreshnessSchema:
+    """Tests for the file_index schema migration."""
+
+    def test_file_size_column_added_to_old_database(self, temp_workspace):
+        db_path = temp_workspace / ".pulse" / "history.sqlite"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("""
+            CREATE TABLE file_index (
+                file_path TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                last_mtime REAL NOT NULL,
+                last_indexed_at TEXT NOT NULL,
+                chunk_count INTEGER DEFAULT 0
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+        RAGManager(temp_workspace)
+
+        conn = sqlite3.connect(str(db_path))
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(file_index)")}
+        conn.close()
+        assert "file_size" in columns
+
+
+class TestSearchWorkspace:
+    """Tests for search_workspace manager caching."""
+
+    def test_manager_cached_per_root(self, temp_workspace):
+        clear_rag_manager_cache()
+        try:
+            first = rag_module._get_cached_rag_manager(temp_workspace)
+            second = rag_module._get_cached_rag_manager(temp_workspace / "src" / "..")
+        finally:
+            clear_rag_manager_cache()
+
+        assert first is second
+
+    def test_registry_shares_cached_manager(self, temp_workspace):
+        from src.tools.registry import ToolRegistry
+
+        clear_rag_manager_cache()
+        try:
+            registry_rag = ToolRegistry(temp_workspace).get_rag_manager()
+            assert registry_rag is rag_module._get_cached_rag_manager(temp_workspace)
+        finally:
+            clear_rag_manager_cache()
+
+    def test_reindex_only_after_interval(self, rag, temp_workspace, monkeypatch):
+        rag.collection.query.return_value = {
+            "documents": [["PROGRAM Main"]],
+            "metadatas": [[{"file_path": "main.st", "chunk_index": 0, "total_chunks": 1}]],
+            "distances": [[0.1]],
+        }
+        monkeypatch.setattr(rag_module, "_get_cached_rag_manager", lambda root: rag)
+        passes = []
+        real_index = rag.index_workspace
+        monkeypatch.setattr(rag, "index_workspace", lambda: passes.append(1) or real_index())
+
+        first = search_workspace("main", temp_workspace)
+        search_workspace("main", temp_workspace)
+        rag.last_indexed_at -= rag_module.SEARCH_REINDEX_INTERVAL_SECONDS + 1
+        search_workspace("main", temp_workspace)
+
+        assert first[0]["file_path"] == "main.st"
+        assert len(passes) == 2
+
+    def test_refresh_skips_while_a_pass_is_running(self, rag, monkeypatch):
+        passes = []
+        monkeypatch.setattr(rag, "_index_workspace", lambda: passes.append(1) or {})
+
+        with rag._index_lock:
+            assert rag.refresh_index(0) is None
+
+        assert passes == []
+        assert rag.refresh_index(0) == {}
+        assert passes == [1]